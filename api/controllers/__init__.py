@@ -1,3 +1,8 @@
 from .profile_controller import ProfileController
+from .memory_controller import MemoryController
+from .chat_controller import ChatController
+from .history_controller import HistoryController
+from .dashboard_controller import DashboardController
 
-__all__ = ["ProfileController"]
+__all__ = ["ProfileController", "MemoryController", "ChatController", "HistoryController",
+           "DashboardController"]
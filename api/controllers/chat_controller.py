@@ -0,0 +1,81 @@
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.access_index import access_index
+from services.chat_service import AsyncChatService
+from schemas.chat import (
+    ChatTurnBatch, ChatTurnBatchResponse, ActivityResultCreate, ActivityResultResponse,
+    MoodUpdate, MoodResponse)
+from sqlalchemy.engine import Row
+from uuid import UUID
+
+
+class ChatController:
+    """Controller layer for chat turns - handles HTTP logic and coordinates with services"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.chat_service = AsyncChatService(db)
+
+    async def _check_session_access(self, user_id: UUID, session_id: UUID) -> Row:
+        """
+        The session's (profile_id, start_time); 404 if it doesn't exist, 403
+        if its profile isn't accessible to the user
+        """
+        bounds = await self.chat_service.session_bounds(session_id)
+        if bounds is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Session not found"
+            )
+        if str(bounds.profile_id) not in await access_index.aget(self.db, user_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not allowed to access this profile"
+            )
+        return bounds
+
+    async def ingest_turns(self, user_id: UUID, session_id: UUID,
+                           batch: ChatTurnBatch) -> ChatTurnBatchResponse:
+        """Add a batch of turns to a session of a profile the user can access"""
+        try:
+            bounds = await self._check_session_access(user_id, session_id)
+            return await self.chat_service.ingest_turns(user_id, session_id, bounds.start_time, batch)
+        except HTTPException:
+            raise
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to save chat turns: {str(e)}"
+            )
+
+    async def record_activity(self, user_id: UUID, session_id: UUID,
+                              result: ActivityResultCreate) -> ActivityResultResponse:
+        """Save an activity result for a session of a profile the user can access"""
+        try:
+            await self._check_session_access(user_id, session_id)
+            return await self.chat_service.record_activity(user_id, session_id, result)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to save activity result: {str(e)}"
+            )
+
+    async def update_mood(self, user_id: UUID, session_id: UUID, mood: MoodUpdate) -> MoodResponse:
+        """Set the mood of a session of a profile the user can access"""
+        try:
+            await self._check_session_access(user_id, session_id)
+            return await self.chat_service.update_mood(user_id, session_id, mood)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to update mood: {str(e)}"
+            )
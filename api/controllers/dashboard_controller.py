@@ -0,0 +1,39 @@
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.access_index import access_index
+from services.dashboard_service import AsyncDashboardService
+from schemas.dashboard import MoodTrend
+from typing import Optional
+from datetime import date
+from uuid import UUID
+
+
+class DashboardController:
+    """Controller layer for the caregiver dashboard - handles HTTP logic and coordinates with services"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.dashboard_service = AsyncDashboardService(db)
+
+    async def mood_trend(self, user_id: UUID, profile_id: UUID, granularity: str,
+                         since: Optional[date], until: Optional[date]) -> MoodTrend:
+        """The mood trend of a profile the user can access"""
+        try:
+            if str(profile_id) not in await access_index.aget(self.db, user_id):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not allowed to access this profile"
+                )
+            return await self.dashboard_service.mood_trend(profile_id, granularity, since, until)
+        except HTTPException:
+            raise
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to load mood trend: {str(e)}"
+            )
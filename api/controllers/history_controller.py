@@ -0,0 +1,66 @@
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.access_index import access_index
+from services.history_service import AsyncHistoryService
+from schemas.history import SessionPage, TurnPage
+from typing import Optional
+from uuid import UUID
+
+
+class HistoryController:
+    """Controller layer for session and chat history - handles HTTP logic and coordinates with services"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.history_service = AsyncHistoryService(db)
+
+    async def _check_profile_access(self, user_id: UUID, profile_id: UUID):
+        if str(profile_id) not in await access_index.aget(self.db, user_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not allowed to access this profile"
+            )
+
+    async def list_sessions(self, user_id: UUID, profile_id: UUID, limit: int,
+                            cursor: Optional[str]) -> SessionPage:
+        """A page of sessions of a profile the user can access"""
+        try:
+            await self._check_profile_access(user_id, profile_id)
+            return await self.history_service.list_sessions(profile_id, limit, cursor)
+        except HTTPException:
+            raise
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to load session history: {str(e)}"
+            )
+
+    async def list_turns(self, user_id: UUID, session_id: UUID, limit: int,
+                         cursor: Optional[str]) -> TurnPage:
+        """A page of turns of a session of a profile the user can access"""
+        try:
+            bounds = await self.history_service.session_bounds(session_id)
+            if bounds is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Session not found"
+                )
+            await self._check_profile_access(user_id, bounds.profile_id)
+            return await self.history_service.list_turns(session_id, bounds.start_time, limit, cursor)
+        except HTTPException:
+            raise
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to load chat history: {str(e)}"
+            )
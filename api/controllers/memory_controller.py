@@ -0,0 +1,31 @@
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.access_index import access_index
+from services.memory_service import AsyncMemoryService
+from schemas.memory import RecallRequest, RecallResponse
+from uuid import UUID
+
+
+class MemoryController:
+    """Controller layer for memory recall - handles HTTP logic and coordinates with services"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.memory_service = AsyncMemoryService(db)
+
+    async def recall(self, user_id: UUID, request: RecallRequest) -> RecallResponse:
+        """Past chat turns of a profile the user can access, most similar first"""
+        try:
+            if str(request.profile_id) not in await access_index.aget(self.db, user_id):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not allowed to access this profile"
+                )
+            return await self.memory_service.recall(request)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to recall memories: {str(e)}"
+            )
@@ -1,28 +1,68 @@
-from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
-from services.profile_service import ProfileService
+from fastapi import HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.etag import make_etag, parse_etag, none_match, if_match_tags
+from services.profile_service import AsyncProfileService, ProfileVersionMismatch
 from schemas.profile import (
     ProfileUpdate,
     ProfileResponse,
     ProfileStatusResponse
 )
 from uuid import UUID
-from typing import Optional
+from datetime import datetime
+from typing import Optional, List, Union
+
+# Clients may keep the profile but must revalidate it with the ETag
+PROFILE_CACHE_CONTROL = "private, no-cache"
+
+
+def profile_etag(profile: ProfileResponse) -> Optional[str]:
+    """Strong ETag derived from the profile id and updated_at"""
+    if profile.updated_at is None:
+        return None
+    return make_etag(profile.id, profile.updated_at)
+
+
+def expected_profile_versions(user_id: UUID, if_match: Optional[str]) -> Optional[List[datetime]]:
+    """
+    Versions (updated_at values) the client's If-Match allows, or None when
+    any version is acceptable. Raises 412 if no listed tag can match.
+    """
+    tags = if_match_tags(if_match)
+    if tags is None:
+        return None
+
+    versions = []
+    for tag in tags:
+        parsed = parse_etag(tag)
+        if parsed is not None and parsed[0] == user_id:
+            versions.append(parsed[1])
+
+    if not versions:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Profile has been modified"
+        )
+    return versions
+
+
+def set_profile_headers(response: Response, etag: Optional[str]):
+    if etag:
+        response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PROFILE_CACHE_CONTROL
 
 
 class ProfileController:
     """Controller layer for Profile - handles HTTP logic and coordinates with services"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.profile_service = ProfileService(db)
+        self.profile_service = AsyncProfileService(db)
 
     async def check_profile_status(self, user_id: UUID) -> ProfileStatusResponse:
         """Check if user's profile exists and is complete"""
         try:
-            profile_exists = self.profile_service.profile_exists(user_id)
-            profile_complete = self.profile_service.is_profile_complete(
-                user_id) if profile_exists else False
+            profile_exists, profile_complete = await self.profile_service.get_profile_status(
+                user_id)
 
             return ProfileStatusResponse(
                 profile_exists=profile_exists,
@@ -34,15 +74,25 @@ class ProfileController:
                 detail=f"Failed to check profile status: {str(e)}"
             )
 
-    async def get_profile(self, user_id: UUID) -> ProfileResponse:
-        """Get current user's profile"""
+    async def get_profile(self, user_id: UUID, response: Response,
+                          if_none_match: Optional[str] = None) -> Union[ProfileResponse, Response]:
+        """Get current user's profile, or 304 if the client's copy is current"""
         try:
-            profile = self.profile_service.get_profile(user_id)
+            profile = await self.profile_service.get_profile(user_id)
             if not profile:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Profile not found"
                 )
+
+            etag = profile_etag(profile)
+            if etag and none_match(if_none_match, etag):
+                not_modified = Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED)
+                set_profile_headers(not_modified, etag)
+                return not_modified
+
+            set_profile_headers(response, etag)
             return profile
         except HTTPException:
             raise
@@ -54,17 +104,25 @@ class ProfileController:
 
 
 
-    async def update_profile(self, user_id: UUID, profile_data: ProfileUpdate) -> ProfileResponse:
-        """Update current user's profile"""
+    async def update_profile(self, user_id: UUID, profile_data: ProfileUpdate, response: Response,
+                             if_match: Optional[str] = None) -> ProfileResponse:
+        """Update current user's profile, honouring If-Match to prevent lost updates"""
         try:
-            profile = self.profile_service.update_profile(
-                user_id, profile_data)
+            expected_versions = expected_profile_versions(user_id, if_match)
+            profile = await self.profile_service.update_profile(
+                user_id, profile_data, expected_versions)
             if not profile:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Profile not found"
                 )
+            set_profile_headers(response, profile_etag(profile))
             return profile
+        except ProfileVersionMismatch:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Profile has been modified"
+            )
         except HTTPException:
             raise
         except Exception as e:
@@ -74,14 +132,14 @@ class ProfileController:
             )
 
     async def delete_profile(self, user_id: UUID) -> dict:
-        """Delete current user's profile"""
+        """Queue current user's profile and its data for deletion"""
         try:
-            if not self.profile_service.delete_profile(user_id):
+            if not await self.profile_service.delete_profile(user_id):
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Profile not found"
                 )
-            return {"message": "Profile deleted successfully"}
+            return {"message": "Profile deletion queued"}
         except HTTPException:
             raise
         except Exception as e:
@@ -1,11 +1,16 @@
-from fastapi import HTTPException, Depends, status
+from fastapi import HTTPException, Depends, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from jose.exceptions import ExpiredSignatureError, JWTClaimsError
-from typing import Optional, Dict, Any, Generator
+from typing import Optional, Dict, Any, Generator, AsyncGenerator, Iterable
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from core.config import settings
+from core.token_cache import TokenVerificationCache
+from core.jwks import JWKSKeyStore, UnknownSigningKey
 from database.db import get_db_with_auth, get_service_db
+from database.async_db import get_async_db_with_auth, async_read_session
+from services.access_index import access_index
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,6 +19,59 @@ logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
 
 
+# Public keys for asymmetrically signed tokens, loaded at startup (see main.py)
+jwks_store = JWKSKeyStore(
+    url=settings.SUPABASE_JWKS_URL,
+    cache_path=settings.JWKS_CACHE_PATH,
+    algorithms=[alg for alg in settings.JWT_ALGORITHMS if alg != settings.ALGORITHM],
+    refresh_interval=settings.JWKS_REFRESH_INTERVAL_SECONDS,
+    fetch_timeout=settings.JWKS_FETCH_TIMEOUT_SECONDS,
+)
+
+# Verified tokens are reused until they expire, so cache verification results
+token_cache = TokenVerificationCache(
+    max_entries=settings.JWT_CACHE_MAX_ENTRIES,
+    max_ttl=settings.JWT_CACHE_MAX_TTL_SECONDS,
+    negative_ttl=settings.JWT_NEGATIVE_CACHE_TTL_SECONDS,
+    transient_errors=(UnknownSigningKey,),
+) if settings.JWT_CACHE_ENABLED else None
+
+
+def _decode_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a token with the shared secret (HS256) or the JWKS key named by
+    its `kid` (RS256/ES256). Never fetches keys on the request path.
+    """
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get("alg")
+    if algorithm not in settings.JWT_ALGORITHMS:
+        raise JWTError(f"Signing algorithm not allowed: {algorithm}")
+
+    if algorithm == settings.ALGORITHM:
+        if not settings.SUPABASE_JWT_SECRET:
+            raise JWTError("No shared secret configured for HS256 tokens")
+        key = settings.SUPABASE_JWT_SECRET
+    else:
+        key = jwks_store.get_key(header.get("kid"))
+
+    return jwt.decode(
+        token,
+        key,
+        algorithms=[algorithm],
+        audience="authenticated"
+    )
+
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """
+    Verify and decode a Supabase JWT, reusing cached results for tokens seen
+    recently. Raises JWTError (or ExpiredSignatureError) like jwt.decode.
+    """
+    if token_cache is None:
+        return _decode_token(token)
+    return token_cache.verify(token, _decode_token)
+
+
 class User:
     """Simplified user model from JWT payload"""
 
@@ -24,40 +82,91 @@ class User:
         self.payload = payload
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+class Principal:
     """
-    Verify JWT token and return user information.
-    This is the main authentication dependency you should use.
+    Outcome of verifying the request's bearer token. Resolved once per
+    request and stored on request.state so every auth dependency reuses it.
     """
-    try:
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.SUPABASE_JWT_SECRET,
-            algorithms=[settings.ALGORITHM],
-            audience="authenticated"
-        )
 
-        if not payload.get("sub"):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid user ID in token"
-            )
+    def __init__(self, payload: Optional[Dict[str, Any]] = None, error: Optional[JWTError] = None):
+        self.payload = payload
+        self.error = error
+        self.user: Optional[User] = User(payload) if payload else None
+
+    @property
+    def authenticated(self) -> bool:
+        """True when a valid token with a user ID was presented"""
+        return self.user is not None and bool(self.user.id)
 
-        return User(payload)
 
-    except ExpiredSignatureError:
+def resolve_principal(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> Principal:
+    """
+    Verify the request's bearer token at most once per request.
+    Never raises; the dependencies below decide how to treat failures.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+
+    if not credentials:
+        principal = Principal()
+    else:
+        try:
+            principal = Principal(
+                payload=decode_access_token(credentials.credentials))
+        except JWTError as e:
+            principal = Principal(error=e)
+
+    request.state.principal = principal
+    return principal
+
+
+def get_request_user(request: Request) -> Optional[User]:
+    """The authenticated user already resolved for this request, if any"""
+    principal = getattr(request.state, "principal", None)
+    return principal.user if principal is not None and principal.authenticated else None
+
+
+def get_current_user(principal: Principal = Depends(resolve_principal)) -> User:
+    """
+    Verify JWT token and return user information.
+    This is the main authentication dependency you should use.
+    """
+    if isinstance(principal.error, ExpiredSignatureError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token has expired",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except JWTError:
+    if principal.error is not None or principal.payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if not principal.authenticated:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid user ID in token"
+        )
+
+    return principal.user
+
+
+async def get_async_read_db(
+    current_user: User = Depends(get_current_user)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI dependency that provides a read-only async session for the current
+    user. It is routed to a replica unless the user wrote recently.
+    """
+    async with async_read_session(user_id=current_user.id) as db:
+        yield db
+
 
 def get_current_user_id(current_user: User = Depends(get_current_user)) -> str:
     """Get the current user's ID - convenience function"""
@@ -74,29 +183,19 @@ def get_current_user_email(current_user: JWTTokenPayload = Depends(require_user)
     return current_user.email
 
 
-def verify_jwt_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
+def verify_jwt_token(principal: Principal = Depends(resolve_principal)) -> Dict[str, Any]:
     """
     Verify and decode Supabase JWT token.
     Returns the decoded token payload.
     """
-    try:
-        token = credentials.credentials
-
-        # Decode the JWT token using Supabase JWT secret
-        payload = jwt.decode(
-            token,
-            settings.SUPABASE_JWT_SECRET,
-            algorithms=[settings.ALGORITHM],
-            audience="authenticated"
-        )
-
-        return payload
-    except JWTError:
+    if principal.payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token"
         )
 
+    return principal.payload
+
 
 def get_user_id_from_token(token_payload: Dict[str, Any] = Depends(verify_jwt_token)) -> str:
     """
@@ -122,32 +221,30 @@ def get_authenticated_db(
         yield db
 
 
+async def get_async_authenticated_db(
+    user_id: str = Depends(get_user_id_from_token)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async variant of get_authenticated_db for async route handlers.
+    """
+    async with get_async_db_with_auth(user_id=user_id, role="authenticated") as db:
+        yield db
+
+
 def get_optional_authenticated_db(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+    principal: Principal = Depends(resolve_principal)
 ) -> Generator[Session, None, None]:
     """
     FastAPI dependency that provides a database session with optional authentication.
-    If no token is provided, uses service role. If token is provided, uses authenticated user context.
+    If no valid token is provided, uses service role. If token is provided, uses authenticated user context.
     """
-    if not credentials:
-        # No authentication provided, use service role
-        with get_service_db() as db:
+    if principal.authenticated:
+        with get_db_with_auth(user_id=principal.user.id, role="authenticated") as db:
             yield db
     else:
-        # Verify token and set user context
-        try:
-            payload = verify_jwt_token(credentials)
-            user_id = payload.get("sub")
-            if user_id:
-                with get_db_with_auth(user_id=user_id, role="authenticated") as db:
-                    yield db
-            else:
-                with get_service_db() as db:
-                    yield db
-        except HTTPException:
-            # Invalid token, use service role for public access
-            with get_service_db() as db:
-                yield db
+        # No (valid) authentication provided, use service role for public access
+        with get_service_db() as db:
+            yield db
 
 
 def require_service_role(
@@ -176,20 +273,15 @@ def get_admin_db(
 
 
 def extract_user_from_request(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+    principal: Principal = Depends(resolve_principal)
 ) -> Optional[str]:
     """
     Extract user ID from request without raising exceptions.
     Returns None if no valid token is provided.
     """
-    if not credentials:
-        return None
-
-    try:
-        payload = verify_jwt_token(credentials)
-        return payload.get("sub")
-    except HTTPException:
+    if principal.payload is None:
         return None
+    return principal.payload.get("sub")
 
 
 class RLSContext:
@@ -202,6 +294,12 @@ class RLSContext:
         self.role = role
         self._context_manager = None
 
+    @classmethod
+    def for_request(cls, request: Request, role: str = "authenticated") -> "RLSContext":
+        """RLS context for the principal already resolved for this request"""
+        user = get_request_user(request)
+        return cls(user_id=user.id if user else None, role=role)
+
     def __enter__(self) -> Session:
         self._context_manager = get_db_with_auth(
             user_id=self.user_id, role=self.role)
@@ -217,45 +315,18 @@ def check_user_access_to_profile(db: Session, user_id: str, profile_id: str) ->
     """
     Check if a user has access to a specific profile (either own profile or as caregiver).
     """
-    from database.models import Profile, Caregiver
+    return str(profile_id) in access_index.get(db, user_id)
 
-    # Check if it's the user's own profile
-    profile = db.query(Profile).filter(Profile.id == profile_id).first()
-    if not profile:
-        return False
 
-    if str(profile.id) == user_id:
-        return True
-
-    # Check if user is a caregiver for this profile
-    if profile.caregiver_id is not None:
-        caregiver = db.query(Caregiver).filter(
-            Caregiver.id == profile.caregiver_id).first()
-        if caregiver and str(caregiver.id) == user_id:
-            return True
-
-    return False
+def check_user_access_to_profiles(db: Session, user_id: str, profile_ids: Iterable[str]) -> Dict[str, bool]:
+    """
+    Check access to many profiles at once. Returns profile ID -> has access.
+    """
+    return access_index.check_many(access_index.get(db, user_id), profile_ids)
 
 
 def get_accessible_profile_ids(db: Session, user_id: str) -> list[str]:
     """
     Get all profile IDs that the current user can access.
     """
-    from database.models import Profile, Caregiver
-
-    accessible_ids = []
-
-    # User's own profile
-    user_profile = db.query(Profile).filter(Profile.id == user_id).first()
-    if user_profile:
-        accessible_ids.append(str(user_profile.id))
-
-    # Profiles managed as caregiver
-    managed_profiles = db.query(Profile).join(Caregiver).filter(
-        Caregiver.id == user_id
-    ).all()
-
-    for profile in managed_profiles:
-        accessible_ids.append(str(profile.id))
-
-    return list(set(accessible_ids))  # Remove duplicates
+    return sorted(access_index.get(db, user_id))
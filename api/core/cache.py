@@ -0,0 +1,290 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Hashable
+import asyncio
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CacheMetrics:
+    """Thread-safe hit/miss/eviction counters for a cache"""
+
+    FIELDS = ("hits", "shared_hits", "misses", "evictions",
+              "expirations", "invalidations", "backend_errors")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {field: 0 for field in self.FIELDS}
+
+    def incr(self, field: str, amount: int = 1):
+        with self._lock:
+            self._counts[field] += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            data: Dict[str, Any] = dict(self._counts)
+        lookups = data["hits"] + data["shared_hits"] + data["misses"]
+        data["hit_rate"] = round(
+            (data["hits"] + data["shared_hits"]) / lookups, 4) if lookups else 0.0
+        return data
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries also expire after `ttl` seconds.
+    Safe to share between threads.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, metrics: Optional[CacheMetrics] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.metrics = metrics or CacheMetrics()
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.metrics.incr("expirations")
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entries when full"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.metrics.incr("evictions")
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CacheBackend(ABC):
+    """Interface for a cache shared between workers. Values are strings."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float):
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Process-local stand-in for a shared backend, for tests and development"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, tuple] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._values[key] = (value, time.monotonic() + ttl)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._values.pop(key, None)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis-backed shared cache. Requires the optional `redis` package."""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_BACKEND_URL points to Redis but the 'redis' package is not installed") from e
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: str, ttl: float):
+        self._client.set(key, value, px=int(ttl * 1000))
+
+    def delete(self, key: str):
+        self._client.delete(key)
+
+
+def create_cache_backend(url: str) -> Optional[CacheBackend]:
+    """Build the shared backend for a CACHE_BACKEND_URL ("" disables it)"""
+    if not url:
+        return None
+    if url == "memory://":
+        return InMemoryCacheBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url)
+    raise ValueError(f"Unsupported CACHE_BACKEND_URL: {url}")
+
+
+class LayeredCache:
+    """
+    Read-through cache of JSON-serializable values: a small in-process
+    TTLCache in front of an optional shared backend. Backend failures are
+    logged and treated as misses so the cache never fails a request.
+    """
+
+    def __init__(self, namespace: str, max_entries: int, ttl: float,
+                 backend: Optional[CacheBackend] = None, shared_ttl: Optional[float] = None):
+        self.namespace = namespace
+        self.metrics = CacheMetrics()
+        self.local = TTLCache(max_entries, ttl, self.metrics)
+        self.backend = backend
+        self.shared_ttl = shared_ttl if shared_ttl is not None else ttl
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _get_shared(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            self.metrics.incr("backend_errors")
+            logger.warning(f"Cache backend get failed for {key}: {e}")
+            return None
+        return None if raw is None else json.loads(raw)
+
+    def _set_shared(self, key: str, value: Any):
+        try:
+            self.backend.set(key, json.dumps(value), self.shared_ttl)
+        except Exception as e:
+            self.metrics.incr("backend_errors")
+            logger.warning(f"Cache backend set failed for {key}: {e}")
+
+    def _delete_shared(self, key: str):
+        try:
+            self.backend.delete(key)
+        except Exception as e:
+            self.metrics.incr("backend_errors")
+            logger.warning(f"Cache backend delete failed for {key}: {e}")
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Look up a value locally, then in the shared backend"""
+        cache_key = self._key(key)
+        value = self.local.get(cache_key)
+        if value is not None:
+            self.metrics.incr("hits")
+            return value
+
+        if self.backend is not None:
+            value = self._get_shared(cache_key)
+            if value is not None:
+                self.metrics.incr("shared_hits")
+                self.local.set(cache_key, value)
+                return value
+
+        self.metrics.incr("misses")
+        return None
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Current value from either layer, without counting a hit or miss"""
+        cache_key = self._key(key)
+        value = self.local.get(cache_key)
+        if value is None and self.backend is not None:
+            value = self._get_shared(cache_key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value in both layers"""
+        cache_key = self._key(key)
+        self.local.set(cache_key, value)
+        if self.backend is not None:
+            self._set_shared(cache_key, value)
+
+    def invalidate(self, key: Hashable):
+        """Drop a value from both layers"""
+        cache_key = self._key(key)
+        self.local.delete(cache_key)
+        if self.backend is not None:
+            self._delete_shared(cache_key)
+        self.metrics.incr("invalidations")
+
+    # Async variants keep shared-backend I/O off the event loop; local hits
+    # are answered without leaving it.
+
+    async def aget(self, key: Hashable) -> Optional[Any]:
+        cache_key = self._key(key)
+        value = self.local.get(cache_key)
+        if value is not None:
+            self.metrics.incr("hits")
+            return value
+
+        if self.backend is not None:
+            value = await asyncio.to_thread(self._get_shared, cache_key)
+            if value is not None:
+                self.metrics.incr("shared_hits")
+                self.local.set(cache_key, value)
+                return value
+
+        self.metrics.incr("misses")
+        return None
+
+    async def apeek(self, key: Hashable) -> Optional[Any]:
+        cache_key = self._key(key)
+        value = self.local.get(cache_key)
+        if value is None and self.backend is not None:
+            value = await asyncio.to_thread(self._get_shared, cache_key)
+        return value
+
+    async def aset(self, key: Hashable, value: Any):
+        cache_key = self._key(key)
+        self.local.set(cache_key, value)
+        if self.backend is not None:
+            await asyncio.to_thread(self._set_shared, cache_key, value)
+
+    async def ainvalidate(self, key: Hashable):
+        cache_key = self._key(key)
+        self.local.delete(cache_key)
+        if self.backend is not None:
+            await asyncio.to_thread(self._delete_shared, cache_key)
+        self.metrics.incr("invalidations")
+
+    def stats(self) -> Dict[str, Any]:
+        data = self.metrics.snapshot()
+        data.update({
+            "namespace": self.namespace,
+            "local_entries": len(self.local),
+            "local_max_entries": self.local.max_entries,
+            "shared_backend": type(self.backend).__name__ if self.backend else None,
+        })
+        return data
@@ -1,15 +1,163 @@
 import os
 from dotenv import load_dotenv
+from typing import List
 
 load_dotenv()
 
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment ("1", "true", "yes", "on")"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 # Database
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://localhost/grace")
 
+# Read replicas (comma-separated URLs). Read-only sessions are routed here.
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(
+    os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", "5"))
+# A replica whose lag probe takes longer is treated as unreachable
+DB_REPLICA_LAG_CHECK_TIMEOUT = float(os.getenv("DB_REPLICA_LAG_CHECK_TIMEOUT", "2"))
+# How long a user's reads stay on the primary after they write
+DB_READ_YOUR_WRITES_SECONDS = float(
+    os.getenv("DB_READ_YOUR_WRITES_SECONDS", "10"))
+
+# Database connection pool
+# "queue" keeps a pool of open connections per worker, "null" opens a new
+# connection for every checkout (the previous behaviour).
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue").lower()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+# Set when connecting through PgBouncer in transaction pooling mode
+DB_PGBOUNCER_TRANSACTION_MODE = _env_bool(
+    "DB_PGBOUNCER_TRANSACTION_MODE", False)
+DB_ECHO = _env_bool("DB_ECHO", False)
+
+# Per-request SQL instrumentation
+DB_INSTRUMENTATION = _env_bool("DB_INSTRUMENTATION", True)
+# Same statement this many times in one request is reported as a possible N+1
+DB_N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "5"))
+# Requests running more queries than this are logged
+DB_REQUEST_QUERY_WARN = int(os.getenv("DB_REQUEST_QUERY_WARN", "20"))
+
+# chat_turns is partitioned by month. Partitions are created this many
+# months ahead; whole partitions older than the retention window are dropped.
+CHAT_PARTITION_MONTHS_AHEAD = int(os.getenv("CHAT_PARTITION_MONTHS_AHEAD", "3"))
+CHAT_RETENTION_MONTHS = int(os.getenv("CHAT_RETENTION_MONTHS", "12"))  # 0 keeps everything
+CHAT_PARTITION_MAINTENANCE_ON_STARTUP = _env_bool(
+    "CHAT_PARTITION_MAINTENANCE_ON_STARTUP", True)
+# How far ahead of the server clock a client-supplied chat turn timestamp may be
+CHAT_TURN_MAX_FUTURE_SECONDS = int(os.getenv("CHAT_TURN_MAX_FUTURE_SECONDS", "300"))
+
+# Purge worker (per-user retention and profile deletion). Each batch deletes
+# at most PURGE_BATCH_SIZE rows and is cancelled after PURGE_BATCH_TIMEOUT_MS;
+# a cancelled batch is retried at half the size, down to PURGE_MIN_BATCH_SIZE.
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "1000"))
+PURGE_MIN_BATCH_SIZE = int(os.getenv("PURGE_MIN_BATCH_SIZE", "50"))
+PURGE_BATCH_TIMEOUT_MS = int(os.getenv("PURGE_BATCH_TIMEOUT_MS", "2000"))
+PURGE_LOCK_TIMEOUT_MS = int(os.getenv("PURGE_LOCK_TIMEOUT_MS", "200"))
+# Pause between batches so the purge never monopolizes the tables
+PURGE_BATCH_PAUSE_MS = int(os.getenv("PURGE_BATCH_PAUSE_MS", "50"))
+
+# Memory recall (nearest chat turns by embedding). Higher ef_search trades
+# latency for recall on the HNSW index. RECALL_ITERATIVE_SCAN ("strict_order"
+# or "relaxed_order", pgvector >= 0.8) keeps scanning the index until enough
+# rows pass the profile filter; set it empty for older pgvector.
+RECALL_EF_SEARCH = int(os.getenv("RECALL_EF_SEARCH", "40"))
+RECALL_ITERATIVE_SCAN = os.getenv("RECALL_ITERATIVE_SCAN", "relaxed_order")
+# Embedding storage searched by recall: "vector" (float32), "halfvec"
+# (float16) or "binary" (float16 plus a binary-quantized index, re-ranked)
+EMBEDDING_STORAGE = os.getenv("EMBEDDING_STORAGE", "vector")
+# Re-ranked searches take this many index candidates per requested turn
+RECALL_RERANK_FACTOR = int(os.getenv("RECALL_RERANK_FACTOR", "4"))
+# Re-rank halfvec/binary candidates against the float32 embeddings (only
+# while those are still stored)
+RECALL_FULL_PRECISION_RERANK = _env_bool("RECALL_FULL_PRECISION_RERANK", False)
+
+# Background embedding of new chat turns. EMBEDDER is "hashing" (a
+# deterministic local stand-in, not semantically meaningful) or
+# "package.module:ClassName" for a real embedding client.
+EMBEDDING_PIPELINE_ENABLED = _env_bool("EMBEDDING_PIPELINE_ENABLED", False)
+EMBEDDER = os.getenv("EMBEDDER", "hashing")
+# A batch is sent when it reaches EMBEDDING_BATCH_SIZE turns or its oldest
+# turn has waited EMBEDDING_BATCH_MAX_AGE_MS
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_BATCH_MAX_AGE_MS = int(os.getenv("EMBEDDING_BATCH_MAX_AGE_MS", "200"))
+EMBEDDING_QUEUE_MAX = int(os.getenv("EMBEDDING_QUEUE_MAX", "10000"))
+# Turns that were never queued (or whose batch failed) are found by a sweep
+EMBEDDING_SWEEP_INTERVAL_SECONDS = float(os.getenv("EMBEDDING_SWEEP_INTERVAL_SECONDS", "60"))
+EMBEDDING_SWEEP_LIMIT = int(os.getenv("EMBEDDING_SWEEP_LIMIT", "1000"))
+# How long a swept turn is reserved for the worker that claimed it
+EMBEDDING_CLAIM_LEASE_SECONDS = float(os.getenv("EMBEDDING_CLAIM_LEASE_SECONDS", "600"))
+
+# Write-behind outbox: chat turns, activity results and mood updates are
+# appended to a local log and written to Postgres by a background flusher.
+# OUTBOX_FSYNC is "always" (fsync before the request returns), "interval"
+# (every OUTBOX_FSYNC_INTERVAL_MS; a machine crash can lose that much) or
+# "never" (left to the OS).
+OUTBOX_ENABLED = _env_bool("OUTBOX_ENABLED", False)
+OUTBOX_DIR = os.getenv("OUTBOX_DIR", "outbox")
+OUTBOX_FSYNC = os.getenv("OUTBOX_FSYNC", "interval")
+OUTBOX_FSYNC_INTERVAL_MS = int(os.getenv("OUTBOX_FSYNC_INTERVAL_MS", "100"))
+OUTBOX_FLUSH_INTERVAL_MS = int(os.getenv("OUTBOX_FLUSH_INTERVAL_MS", "250"))
+# Records written to Postgres per transaction
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+
+# Caching
+# Shared cache used by every worker: "redis://...", "memory://" (process-local
+# stand-in) or empty to only use each worker's in-process cache.
+CACHE_BACKEND_URL = os.getenv("CACHE_BACKEND_URL", "")
+PROFILE_CACHE_ENABLED = _env_bool("PROFILE_CACHE_ENABLED", True)
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "10000"))
+# In-process entries are short-lived because other workers can't invalidate them
+PROFILE_CACHE_TTL_SECONDS = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "30"))
+PROFILE_CACHE_SHARED_TTL_SECONDS = float(
+    os.getenv("PROFILE_CACHE_SHARED_TTL_SECONDS", "300"))
+# user -> accessible profile IDs (own profile plus profiles managed as caregiver)
+ACCESS_INDEX_ENABLED = _env_bool("ACCESS_INDEX_ENABLED", True)
+ACCESS_INDEX_MAX_ENTRIES = int(os.getenv("ACCESS_INDEX_MAX_ENTRIES", "10000"))
+# Both TTLs bound how long a revoked caregiver keeps access when the change
+# didn't go through the ORM, or in other workers' in-process caches
+ACCESS_INDEX_TTL_SECONDS = float(os.getenv("ACCESS_INDEX_TTL_SECONDS", "5"))
+ACCESS_INDEX_SHARED_TTL_SECONDS = float(
+    os.getenv("ACCESS_INDEX_SHARED_TTL_SECONDS", "5"))
+
 # Supabase
 SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", "")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
 
+# JWT verification cache
+JWT_CACHE_ENABLED = _env_bool("JWT_CACHE_ENABLED", True)
+JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))
+# Upper bound on how long a verified token is trusted; entries never outlive exp
+JWT_CACHE_MAX_TTL_SECONDS = float(os.getenv("JWT_CACHE_MAX_TTL_SECONDS", "3600"))
+JWT_NEGATIVE_CACHE_TTL_SECONDS = float(
+    os.getenv("JWT_NEGATIVE_CACHE_TTL_SECONDS", "30"))
+
+# Asymmetric JWT signing keys (JWKS). SUPABASE_JWKS_URL may be an http(s) URL
+# or a local JWKS file; JWKS_CACHE_PATH keeps a copy on disk across restarts.
+SUPABASE_JWKS_URL = os.getenv("SUPABASE_JWKS_URL", "")
+JWKS_CACHE_PATH = os.getenv("JWKS_CACHE_PATH", "")
+# Minimum time between refreshes triggered by an unknown `kid`
+JWKS_REFRESH_INTERVAL_SECONDS = float(
+    os.getenv("JWKS_REFRESH_INTERVAL_SECONDS", "30"))
+JWKS_FETCH_TIMEOUT_SECONDS = float(os.getenv("JWKS_FETCH_TIMEOUT_SECONDS", "5"))
+# Accepted signing algorithms. HS256 is verified with SUPABASE_JWT_SECRET,
+# the asymmetric ones with the JWKS keys.
+JWT_ALGORITHMS = [
+    alg.strip() for alg in os.getenv("JWT_ALGORITHMS", "HS256,RS256,ES256").split(",") if alg.strip()
+]
+
 # API Settings
 PROJECT_NAME = "GRACE API"
 ALGORITHM = "HS256"
@@ -19,10 +167,94 @@ class Settings:
     # Database
     DATABASE_URL: str = DATABASE_URL
 
+    # Read replicas
+    DATABASE_REPLICA_URLS: List[str] = DATABASE_REPLICA_URLS
+    DB_REPLICA_MAX_LAG_SECONDS: float = DB_REPLICA_MAX_LAG_SECONDS
+    DB_REPLICA_LAG_CHECK_INTERVAL: float = DB_REPLICA_LAG_CHECK_INTERVAL
+    DB_REPLICA_LAG_CHECK_TIMEOUT: float = DB_REPLICA_LAG_CHECK_TIMEOUT
+    DB_READ_YOUR_WRITES_SECONDS: float = DB_READ_YOUR_WRITES_SECONDS
+
+    # Database connection pool
+    DB_POOL_MODE: str = DB_POOL_MODE
+    DB_POOL_SIZE: int = DB_POOL_SIZE
+    DB_MAX_OVERFLOW: int = DB_MAX_OVERFLOW
+    DB_POOL_TIMEOUT: float = DB_POOL_TIMEOUT
+    DB_POOL_RECYCLE: int = DB_POOL_RECYCLE
+    DB_POOL_PRE_PING: bool = DB_POOL_PRE_PING
+    DB_PGBOUNCER_TRANSACTION_MODE: bool = DB_PGBOUNCER_TRANSACTION_MODE
+    DB_ECHO: bool = DB_ECHO
+
+    # Per-request SQL instrumentation
+    DB_INSTRUMENTATION: bool = DB_INSTRUMENTATION
+    DB_N_PLUS_ONE_THRESHOLD: int = DB_N_PLUS_ONE_THRESHOLD
+    DB_REQUEST_QUERY_WARN: int = DB_REQUEST_QUERY_WARN
+
+    # chat_turns partitioning and retention
+    CHAT_PARTITION_MONTHS_AHEAD: int = CHAT_PARTITION_MONTHS_AHEAD
+    CHAT_RETENTION_MONTHS: int = CHAT_RETENTION_MONTHS
+    CHAT_PARTITION_MAINTENANCE_ON_STARTUP: bool = CHAT_PARTITION_MAINTENANCE_ON_STARTUP
+    CHAT_TURN_MAX_FUTURE_SECONDS: int = CHAT_TURN_MAX_FUTURE_SECONDS
+
+    # Purge worker
+    PURGE_BATCH_SIZE: int = PURGE_BATCH_SIZE
+    PURGE_MIN_BATCH_SIZE: int = PURGE_MIN_BATCH_SIZE
+    PURGE_BATCH_TIMEOUT_MS: int = PURGE_BATCH_TIMEOUT_MS
+    PURGE_LOCK_TIMEOUT_MS: int = PURGE_LOCK_TIMEOUT_MS
+    PURGE_BATCH_PAUSE_MS: int = PURGE_BATCH_PAUSE_MS
+
+    # Memory recall
+    RECALL_EF_SEARCH: int = RECALL_EF_SEARCH
+    RECALL_ITERATIVE_SCAN: str = RECALL_ITERATIVE_SCAN
+    EMBEDDING_STORAGE: str = EMBEDDING_STORAGE
+    RECALL_RERANK_FACTOR: int = RECALL_RERANK_FACTOR
+    RECALL_FULL_PRECISION_RERANK: bool = RECALL_FULL_PRECISION_RERANK
+
+    # Embedding pipeline
+    EMBEDDING_PIPELINE_ENABLED: bool = EMBEDDING_PIPELINE_ENABLED
+    EMBEDDER: str = EMBEDDER
+    EMBEDDING_BATCH_SIZE: int = EMBEDDING_BATCH_SIZE
+    EMBEDDING_BATCH_MAX_AGE_MS: int = EMBEDDING_BATCH_MAX_AGE_MS
+    EMBEDDING_QUEUE_MAX: int = EMBEDDING_QUEUE_MAX
+    EMBEDDING_SWEEP_INTERVAL_SECONDS: float = EMBEDDING_SWEEP_INTERVAL_SECONDS
+    EMBEDDING_SWEEP_LIMIT: int = EMBEDDING_SWEEP_LIMIT
+    EMBEDDING_CLAIM_LEASE_SECONDS: float = EMBEDDING_CLAIM_LEASE_SECONDS
+
+    # Write-behind outbox
+    OUTBOX_ENABLED: bool = OUTBOX_ENABLED
+    OUTBOX_DIR: str = OUTBOX_DIR
+    OUTBOX_FSYNC: str = OUTBOX_FSYNC
+    OUTBOX_FSYNC_INTERVAL_MS: int = OUTBOX_FSYNC_INTERVAL_MS
+    OUTBOX_FLUSH_INTERVAL_MS: int = OUTBOX_FLUSH_INTERVAL_MS
+    OUTBOX_BATCH_SIZE: int = OUTBOX_BATCH_SIZE
+
+    # Caching
+    CACHE_BACKEND_URL: str = CACHE_BACKEND_URL
+    PROFILE_CACHE_ENABLED: bool = PROFILE_CACHE_ENABLED
+    PROFILE_CACHE_MAX_ENTRIES: int = PROFILE_CACHE_MAX_ENTRIES
+    PROFILE_CACHE_TTL_SECONDS: float = PROFILE_CACHE_TTL_SECONDS
+    PROFILE_CACHE_SHARED_TTL_SECONDS: float = PROFILE_CACHE_SHARED_TTL_SECONDS
+    ACCESS_INDEX_ENABLED: bool = ACCESS_INDEX_ENABLED
+    ACCESS_INDEX_MAX_ENTRIES: int = ACCESS_INDEX_MAX_ENTRIES
+    ACCESS_INDEX_TTL_SECONDS: float = ACCESS_INDEX_TTL_SECONDS
+    ACCESS_INDEX_SHARED_TTL_SECONDS: float = ACCESS_INDEX_SHARED_TTL_SECONDS
+
     # Supabase
     SUPABASE_JWT_SECRET: str = SUPABASE_JWT_SECRET
     SUPABASE_SERVICE_ROLE_KEY: str = SUPABASE_SERVICE_ROLE_KEY
 
+    # JWT verification cache
+    JWT_CACHE_ENABLED: bool = JWT_CACHE_ENABLED
+    JWT_CACHE_MAX_ENTRIES: int = JWT_CACHE_MAX_ENTRIES
+    JWT_CACHE_MAX_TTL_SECONDS: float = JWT_CACHE_MAX_TTL_SECONDS
+    JWT_NEGATIVE_CACHE_TTL_SECONDS: float = JWT_NEGATIVE_CACHE_TTL_SECONDS
+
+    # Asymmetric JWT signing keys
+    SUPABASE_JWKS_URL: str = SUPABASE_JWKS_URL
+    JWKS_CACHE_PATH: str = JWKS_CACHE_PATH
+    JWKS_REFRESH_INTERVAL_SECONDS: float = JWKS_REFRESH_INTERVAL_SECONDS
+    JWKS_FETCH_TIMEOUT_SECONDS: float = JWKS_FETCH_TIMEOUT_SECONDS
+    JWT_ALGORITHMS: List[str] = JWT_ALGORITHMS
+
     # API Settings
     PROJECT_NAME: str = PROJECT_NAME
     ALGORITHM: str = ALGORITHM
@@ -0,0 +1,71 @@
+from typing import List, Sequence
+import asyncio
+import hashlib
+import importlib
+import math
+import re
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class Embedder:
+    """
+    Turns texts into embedding vectors. Implementations must return one vector
+    of `dimensions` floats per text, in order.
+    """
+
+    dimensions: int
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic local stand-in for a real embedding model: word unigrams
+    and bigrams are hashed into signed buckets and the vector is normalized.
+    Texts sharing words end up close, but there is no semantic similarity.
+    Needs no network, so it is what tests and benchmarks use.
+    """
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+
+    def _bucket(self, feature: str):
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dimensions, 1.0 if value >> 63 else -1.0
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            index, sign = self._bucket(feature)
+            vector[index] += sign
+
+        norm = math.sqrt(sum(value * value for value in vector))
+        if norm == 0:
+            # Empty text still needs a valid (non-zero) vector for cosine distance
+            vector[0] = 1.0
+            return vector
+        return [value / norm for value in vector]
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        # CPU-bound; keep it off the event loop like a real model call would be
+        return await asyncio.to_thread(lambda: [self.embed_one(text) for text in texts])
+
+
+def load_embedder(spec: str, dimensions: int) -> Embedder:
+    """
+    Build the embedder named by `spec`: "hashing", or "package.module:ClassName"
+    for a class taking the vector dimensions as its only argument.
+    """
+    if spec in ("", "hashing"):
+        return HashingEmbedder(dimensions)
+
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"EMBEDDER must be 'hashing' or 'module:ClassName', got {spec!r}")
+    embedder_class = getattr(importlib.import_module(module_name), class_name)
+    return embedder_class(dimensions)
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Tuple
+from uuid import UUID
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def make_etag(resource_id: UUID, updated_at: datetime) -> str:
+    """
+    Strong ETag for a row versioned by its updated_at column. The timestamp
+    is kept at microsecond precision (like Postgres), so the tag can be turned
+    back into the exact updated_at value for a conditional UPDATE.
+    """
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    micros = (updated_at - _EPOCH) // timedelta(microseconds=1)
+    return f'"{resource_id.hex}-{micros:x}"'
+
+
+def parse_etag(etag: str) -> Optional[Tuple[UUID, datetime]]:
+    """Recover (id, updated_at) from a strong ETag made by make_etag"""
+    value = etag.strip()
+    if value.startswith("W/") or len(value) < 2 or value[0] != '"' or value[-1] != '"':
+        return None
+    try:
+        id_hex, micros_hex = value[1:-1].split("-", 1)
+        return UUID(hex=id_hex), _EPOCH + timedelta(microseconds=int(micros_hex, 16))
+    except ValueError:
+        return None
+
+
+def _split_etags(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def none_match(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True when If-None-Match lists the current ETag (or "*"), meaning a GET can
+    be answered with 304. Uses weak comparison, as RFC 9110 requires.
+    """
+    if not if_none_match:
+        return False
+    current = etag.removeprefix("W/")
+    return any(tag == "*" or tag.removeprefix("W/") == current for tag in _split_etags(if_none_match))
+
+
+def if_match_tags(if_match: Optional[str]) -> Optional[List[str]]:
+    """Entity tags listed in If-Match, or None when the header is absent or "*" """
+    if not if_match:
+        return None
+    tags = _split_etags(if_match)
+    if "*" in tags:
+        return None
+    return tags
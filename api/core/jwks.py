@@ -0,0 +1,174 @@
+from jose import jwk, JWTError
+from jose.backends.base import Key
+from typing import Optional, Dict, Any, List
+import httpx
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Algorithm assumed for keys published without an "alg" member
+_DEFAULT_ALGORITHMS = {"RSA": "RS256", "EC": "ES256"}
+
+
+class UnknownSigningKey(JWTError):
+    """The token's `kid` isn't in the key set (yet). Not remembered as a rejection."""
+
+
+class JWKSKeyStore:
+    """
+    Public signing keys from a JWKS document, indexed by `kid`.
+
+    Keys are loaded at startup and held in memory, with a copy on disk so a
+    restart can verify tokens before the JWKS endpoint is reachable. Lookups
+    never touch the network: an unknown `kid` schedules a background refresh
+    (at most once per `refresh_interval`) and the token is rejected until the
+    new key set has arrived.
+
+    `url` may be an http(s) URL or a local JWKS file (path or file:// URL).
+    """
+
+    def __init__(self, url: str, cache_path: str = "", algorithms: Optional[List[str]] = None,
+                 refresh_interval: float = 30.0, fetch_timeout: float = 5.0):
+        self.url = url
+        self.cache_path = cache_path
+        self.algorithms = algorithms or []
+        self.refresh_interval = refresh_interval
+        self.fetch_timeout = fetch_timeout
+        self._keys: Dict[str, Key] = {}
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._last_refresh_attempt = 0.0
+        self.loaded_at: Optional[float] = None
+        self.source: Optional[str] = None
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.unknown_kid_lookups = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url or self.cache_path)
+
+    def _fetch_document(self) -> Dict[str, Any]:
+        if self.url.startswith(("http://", "https://")):
+            response = httpx.get(self.url, timeout=self.fetch_timeout)
+            response.raise_for_status()
+            return response.json()
+        with open(self.url.removeprefix("file://"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _read_disk_cache(self) -> Optional[Dict[str, Any]]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        with open(self.cache_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_disk_cache(self, document: Dict[str, Any]):
+        if not self.cache_path:
+            return
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(document, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _build_keys(self, document: Dict[str, Any]) -> Dict[str, Key]:
+        """Parse every usable signing key once, so verification doesn't re-parse them"""
+        keys: Dict[str, Key] = {}
+        for key_data in document.get("keys", []):
+            kid = key_data.get("kid")
+            algorithm = key_data.get("alg") or _DEFAULT_ALGORITHMS.get(key_data.get("kty"))
+            if not kid or key_data.get("use", "sig") != "sig":
+                continue
+            if algorithm not in self.algorithms:
+                continue
+            try:
+                keys[kid] = jwk.construct(key_data, algorithm)
+            except JWTError as e:
+                logger.warning(f"Skipping unusable JWKS key {kid}: {e}")
+        return keys
+
+    def _install(self, document: Dict[str, Any], source: str):
+        keys = self._build_keys(document)
+        with self._lock:
+            self._keys = keys
+            self.loaded_at = time.time()
+            self.source = source
+        logger.info(f"Loaded {len(keys)} JWT signing keys from {source}")
+
+    def refresh(self) -> bool:
+        """Fetch the key set now and update the disk copy. Returns False on failure."""
+        try:
+            document = self._fetch_document()
+            self._install(document, "jwks_url")
+        except Exception as e:
+            with self._lock:
+                self.refresh_failures += 1
+            logger.warning(f"Failed to fetch JWKS from {self.url}: {e}")
+            return False
+
+        with self._lock:
+            self.refreshes += 1
+        try:
+            self._write_disk_cache(document)
+        except OSError as e:
+            logger.warning(f"Failed to write JWKS cache {self.cache_path}: {e}")
+        return True
+
+    def load(self):
+        """Startup load: the disk copy first (no network), then a fresh fetch"""
+        if not self.enabled:
+            return
+        try:
+            document = self._read_disk_cache()
+            if document is not None:
+                self._install(document, "disk_cache")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable JWKS cache {self.cache_path}: {e}")
+
+        if self.url:
+            self._last_refresh_attempt = time.monotonic()
+            self.refresh()
+
+    def request_refresh(self) -> bool:
+        """Refresh in a background thread unless one ran recently. Never blocks."""
+        if not self.url:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return False
+            if now - self._last_refresh_attempt < self.refresh_interval:
+                return False
+            self._last_refresh_attempt = now
+            self._refresh_thread = threading.Thread(
+                target=self.refresh, name="jwks-refresh", daemon=True)
+            self._refresh_thread.start()
+        return True
+
+    def get_key(self, kid: Optional[str]) -> Key:
+        """
+        Signing key for a token header's `kid`. Raises UnknownSigningKey (and
+        schedules a refresh) when the key isn't known yet.
+        """
+        key = self._keys.get(kid) if kid else None
+        if key is None:
+            with self._lock:
+                self.unknown_kid_lookups += 1
+            self.request_refresh()
+            raise UnknownSigningKey(f"Unknown signing key: {kid}")
+        return key
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "kids": sorted(self._keys),
+                "source": self.source,
+                "loaded_at": self.loaded_at,
+                "refreshes": self.refreshes,
+                "refresh_failures": self.refresh_failures,
+                "unknown_kid_lookups": self.unknown_kid_lookups,
+            }
@@ -0,0 +1,242 @@
+from typing import Optional, List, Dict, Any, Sequence, NamedTuple
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# When appended records are forced to disk
+FSYNC_POLICIES = ("always", "interval", "never")
+
+SEGMENT_SUFFIX = ".jsonl"
+
+
+class Segment(NamedTuple):
+    """A sealed outbox segment, locked by the process that claimed it"""
+    path: str
+    fd: int
+
+
+def _segment_created_at(name: str) -> float:
+    """Creation time (epoch seconds) encoded in a segment's file name"""
+    return int(name.split("-", 1)[0]) / 1e9
+
+
+class Outbox:
+    """
+    Local append-only log of pending database writes.
+
+    Records are JSON lines appended to the current segment file, which this
+    process holds an exclusive flock on. The flusher seals the segment
+    (`rotate`) and claims sealed segments in creation order. A segment is
+    only deleted after its records are committed. Segments left behind by a
+    process that died are no longer locked, so they are claimed and
+    replayed on the next start. Replay must therefore be idempotent.
+    """
+
+    def __init__(self, directory: str, fsync_policy: str = "interval"):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"OUTBOX_FSYNC must be one of {', '.join(FSYNC_POLICIES)}")
+        self.directory = directory
+        self.failed_directory = os.path.join(directory, "failed")
+        self.fsync_policy = fsync_policy
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._path: Optional[str] = None
+        self._size = 0
+        self._unsynced = False
+
+        self._appended = 0
+        self._fsyncs = 0
+        self._corrupt = 0
+
+    def _open_segment(self):
+        os.makedirs(self.failed_directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{time.time_ns():020d}-{os.getpid()}{SEGMENT_SUFFIX}")
+        # Locked before it gets a name `claim` looks at, so no flusher can take it
+        fd = os.open(path + ".new", os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_EXCL, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        os.rename(path + ".new", path)
+        if self.fsync_policy != "never":
+            # Make the new file's directory entry durable too
+            directory_fd = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(directory_fd)
+            finally:
+                os.close(directory_fd)
+        self._fd, self._path, self._size = fd, path, 0
+
+    def _write(self, payload: bytes) -> Optional[int]:
+        """Append to the current segment; returns a descriptor to fsync (caller closes) or None"""
+        with self._lock:
+            if self._fd is None:
+                self._open_segment()
+            view = memoryview(payload)
+            while view:
+                written = os.write(self._fd, view)
+                view = view[written:]
+            self._size += len(payload)
+            self._unsynced = True
+            if self.fsync_policy != "always":
+                return None
+            self._unsynced = False
+            # fsync a duplicate outside the lock so appends and rotation don't wait on it
+            return os.dup(self._fd)
+
+    async def append(self, records: Sequence[Dict[str, Any]]):
+        """
+        Append records as one write. With the "always" policy this returns
+        once they are on disk.
+        """
+        payload = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+        fd = self._write(payload.encode())
+        self._appended += len(records)
+        if fd is not None:
+            try:
+                await asyncio.to_thread(os.fsync, fd)
+                self._fsyncs += 1
+            finally:
+                os.close(fd)
+
+    def sync(self):
+        """fsync the current segment if anything was appended since the last fsync"""
+        with self._lock:
+            if self._fd is None or not self._unsynced:
+                return
+            self._unsynced = False
+            fd = os.dup(self._fd)
+        try:
+            os.fsync(fd)
+            self._fsyncs += 1
+        finally:
+            os.close(fd)
+
+    def rotate(self):
+        """Seal the current segment so it can be claimed; the next append starts a new one"""
+        with self._lock:
+            if self._fd is None or not self._size:
+                return
+            if self.fsync_policy != "never" and self._unsynced:
+                os.fsync(self._fd)
+                self._fsyncs += 1
+            os.close(self._fd)
+            self._fd, self._path, self._size, self._unsynced = None, None, 0, False
+
+    def close(self):
+        """Seal the current segment, if any, for the next start (or another process) to flush"""
+        self.rotate()
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                os.unlink(self._path)
+                self._fd, self._path = None, None
+
+    def _segment_names(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names if name.endswith(SEGMENT_SUFFIX))
+
+    def claim(self, limit: Optional[int] = None) -> List[Segment]:
+        """
+        Lock up to `limit` sealed segments, oldest first, stopping at the first
+        one that is still being written or is claimed by another process.
+        """
+        claimed: List[Segment] = []
+        for name in self._segment_names():
+            if limit is not None and len(claimed) >= limit:
+                break
+            path = os.path.join(self.directory, name)
+            if path == self._path:
+                break
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue  # flushed by another process meanwhile
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                break
+            if not os.path.exists(path):
+                os.close(fd)
+                continue
+            claimed.append(Segment(path, fd))
+        return claimed
+
+    def read(self, segment: Segment) -> List[Dict[str, Any]]:
+        """
+        Records of a claimed segment. A last line without a newline is a torn
+        append from a crash and is dropped; so is any line that isn't JSON.
+        """
+        with open(segment.path, "rb") as segment_file:
+            lines = segment_file.read().split(b"\n")
+        records = []
+        torn = lines.pop()
+        for line in lines:
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                self._corrupt += 1
+                logger.error(f"Skipping corrupt outbox record in {segment.path}")
+        if torn:
+            self._corrupt += 1
+            logger.warning(f"Dropping torn outbox record at the end of {segment.path}")
+        return records
+
+    def complete(self, segment: Segment):
+        """Delete a segment whose records are committed"""
+        os.unlink(segment.path)
+        os.close(segment.fd)
+
+    def release(self, segment: Segment):
+        """Unlock a segment so it is retried later"""
+        os.close(segment.fd)
+
+    def quarantine_records(self, segment: Segment, records: Sequence[Dict[str, Any]]):
+        """
+        Keep records the database rejects in failed/, in a file named after
+        the segment they came from, before that segment is deleted.
+        """
+        os.makedirs(self.failed_directory, exist_ok=True)
+        payload = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+        path = os.path.join(self.failed_directory, os.path.basename(segment.path))
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, payload.encode())
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pending segments and bytes on disk, and this process's append counters"""
+        names = self._segment_names()
+        pending_bytes = 0
+        for name in names:
+            try:
+                pending_bytes += os.path.getsize(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+        try:
+            failed = len([name for name in os.listdir(self.failed_directory)
+                          if name.endswith(SEGMENT_SUFFIX)])
+        except FileNotFoundError:
+            failed = 0
+        return {
+            "fsync_policy": self.fsync_policy,
+            "pending_segments": len(names),
+            "pending_bytes": pending_bytes,
+            # Age of the oldest write not yet in the database
+            "oldest_pending_seconds": round(time.time() - _segment_created_at(names[0]), 3) if names else 0.0,
+            "failed_segments": failed,
+            "appended": self._appended,
+            "fsyncs": self._fsyncs,
+            "corrupt_records": self._corrupt,
+        }
@@ -0,0 +1,21 @@
+from typing import Tuple
+from datetime import datetime
+from uuid import UUID
+import base64
+import json
+
+
+def encode_cursor(position: datetime, row_id: UUID) -> str:
+    """Opaque keyset cursor for the row at (position, id)"""
+    payload = json.dumps([position.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """(position, id) of a cursor from encode_cursor; raises ValueError if it isn't one"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(position), UUID(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,105 @@
+from jose import JWTError
+from core.cache import TTLCache
+from typing import Callable, Dict, Any, Tuple, Type
+import hashlib
+import threading
+import time
+
+
+class TokenVerificationCache:
+    """
+    Remembers the outcome of JWT verification so a token reused across many
+    requests is only verified once per worker.
+
+    - Verified payloads are keyed by a SHA-256 of the token and expire at the
+      token's `exp` claim (or after max_ttl, whichever is sooner).
+    - Rejected tokens are remembered for negative_ttl seconds so repeated bad
+      tokens don't cost a verification each time. Errors listed in
+      transient_errors (e.g. a signing key that hasn't been fetched yet) are
+      not remembered.
+    """
+
+    def __init__(self, max_entries: int, max_ttl: float, negative_ttl: float,
+                 transient_errors: Tuple[Type[JWTError], ...] = ()):
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.transient_errors = transient_errors
+        self._valid = TTLCache(max_entries, max_ttl)
+        self._rejected = TTLCache(max_entries, negative_ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.verify_time_total = 0.0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def _record_verification(self, seconds: float):
+        with self._lock:
+            self.misses += 1
+            self.verify_time_total += seconds
+
+    def verify(self, token: str, decode: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Return the verified payload for a token, calling `decode` only when the
+        outcome isn't cached. Re-raises the original JWTError type for
+        rejected tokens.
+        """
+        key = self._key(token)
+
+        payload = self._valid.get(key)
+        if payload is not None:
+            with self._lock:
+                self.hits += 1
+            return payload
+
+        rejected = self._rejected.get(key)
+        if rejected is not None:
+            with self._lock:
+                self.negative_hits += 1
+            error_type, message = rejected
+            raise error_type(message)
+
+        start = time.perf_counter()
+        try:
+            payload = decode(token)
+        except JWTError as e:
+            self._record_verification(time.perf_counter() - start)
+            if not isinstance(e, self.transient_errors):
+                self._rejected.set(key, (type(e), str(e)))
+            raise
+        self._record_verification(time.perf_counter() - start)
+
+        ttl = self.max_ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            ttl = min(ttl, exp - time.time())
+        if ttl > 0:
+            self._valid.set(key, payload, ttl)
+        return payload
+
+    def clear(self):
+        self._valid.clear()
+        self._rejected.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, negative_hits, misses = self.hits, self.negative_hits, self.misses
+            verify_time_total = self.verify_time_total
+        lookups = hits + negative_hits + misses
+        avg_verify = verify_time_total / misses if misses else 0.0
+        return {
+            "hits": hits,
+            "negative_hits": negative_hits,
+            "misses": misses,
+            "hit_rate": round((hits + negative_hits) / lookups, 4) if lookups else 0.0,
+            "verify_time_total_ms": round(verify_time_total * 1000, 3),
+            "verify_time_avg_ms": round(avg_verify * 1000, 3),
+            # Verification time avoided by cache hits, estimated from the average
+            "verify_time_saved_ms": round((hits + negative_hits) * avg_verify * 1000, 3),
+            "valid_entries": len(self._valid),
+            "rejected_entries": len(self._rejected),
+            "evictions": self._valid.metrics.snapshot()["evictions"],
+        }
@@ -0,0 +1,156 @@
+from sqlalchemy import text
+import asyncio
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+import logging
+from typing import Optional, AsyncGenerator
+from contextlib import asynccontextmanager
+from core.config import settings
+from .db import DATABASE_URL, _pool_options, _connect_args
+from .pool import InstrumentedAsyncAdaptedQueuePool
+from .instrumentation import instrument_engine
+from .rls import rls_context_statement
+from .routing import replica_router, REPLICA_LAG_QUERY, REPLICA_SESSION_KEY
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def to_async_url(url: str) -> str:
+    """
+    Convert a synchronous Postgres URL into its asyncpg equivalent.
+    asyncpg spells the libpq "sslmode" query option as "ssl".
+    """
+    parsed = make_url(url)
+    query = dict(parsed.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return parsed.set(drivername="postgresql+asyncpg", query=query).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: str) -> AsyncEngine:
+    """Create an asyncpg engine using the pool configuration from the settings"""
+    async_url = to_async_url(url)
+    db_engine = create_async_engine(
+        async_url,
+        echo=settings.DB_ECHO,
+        connect_args=_connect_args(async_url),
+        **_pool_options(InstrumentedAsyncAdaptedQueuePool),
+    )
+    instrument_engine(db_engine.sync_engine)
+    return db_engine
+
+
+# Create async engine
+async_engine = create_async_db_engine(DATABASE_URL)
+
+# Create async session factory. Objects stay usable after commit so
+# responses can be serialized without another round trip.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# Read replica engines and session factories, in DATABASE_REPLICA_URLS order
+async_replica_engines = [create_async_db_engine(url)
+                         for url in settings.DATABASE_REPLICA_URLS]
+AsyncReplicaSessionLocals = [
+    async_sessionmaker(bind=replica_engine, autoflush=False, expire_on_commit=False,
+                       info={REPLICA_SESSION_KEY: True})
+    for replica_engine in async_replica_engines
+]
+
+
+async def _measure_replica_lag(index: int) -> Optional[float]:
+    async with async_replica_engines[index].connect() as conn:
+        return (await conn.execute(REPLICA_LAG_QUERY)).scalar()
+
+
+async def refresh_replica_lag():
+    """
+    Measure every replica's replication lag concurrently. A replica that
+    doesn't answer within DB_REPLICA_LAG_CHECK_TIMEOUT is marked unreachable.
+    """
+    results = await asyncio.gather(
+        *(asyncio.wait_for(_measure_replica_lag(index), settings.DB_REPLICA_LAG_CHECK_TIMEOUT)
+          for index in range(replica_router.replica_count)),
+        return_exceptions=True)
+    for index, lag in enumerate(results):
+        if isinstance(lag, Exception):
+            logger.warning(f"Could not check lag of replica {index}: {lag!r}")
+            replica_router.record_lag(index, None)
+        else:
+            replica_router.record_lag(index, float(lag or 0))
+
+
+async def monitor_replica_lag():
+    """
+    Re-measure replica lag every DB_REPLICA_LAG_CHECK_INTERVAL until
+    cancelled. Run from the app lifespan so requests never wait on a probe.
+    """
+    while True:
+        await refresh_replica_lag()
+        await asyncio.sleep(replica_router.lag_check_interval)
+
+
+def async_read_session_factory(user_id: Optional[str] = None) -> async_sessionmaker:
+    """
+    Async session factory for read-only work: a healthy replica when one is
+    configured, otherwise (or right after this user wrote) the primary.
+    """
+    if not replica_router.enabled:
+        return AsyncSessionLocal
+
+    index = replica_router.choose_replica(user_id)
+    return AsyncSessionLocal if index is None else AsyncReplicaSessionLocals[index]
+
+# Dependencies
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@asynccontextmanager
+async def async_read_session(user_id: Optional[str] = None) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Read-only async session, routed to a replica when available.
+
+    Args:
+        user_id: The user the reads are for, so they see their own recent writes
+    """
+    session_factory = async_read_session_factory(user_id)
+    async with session_factory() as db:
+        yield db
+
+
+@asynccontextmanager
+async def get_async_db_with_auth(user_id: Optional[str] = None, role: str = "authenticated",
+                                 read_only: bool = False) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get an async database session with Supabase auth context set for RLS.
+
+    Args:
+        user_id: The authenticated user's UUID (from Supabase auth.uid())
+        role: The role to set ('authenticated', 'service_role', etc.)
+        read_only: Route the session to a read replica when possible
+    """
+    session_factory = async_read_session_factory(user_id) if read_only else AsyncSessionLocal
+    async with session_factory() as db:
+        # Set the auth context for RLS policies (auth.uid() and auth.role())
+        # in a single round trip
+        statement, params = rls_context_statement(user_id, role)
+        await db.execute(statement, params)
+
+        yield db
+
+
+@asynccontextmanager
+async def get_async_service_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get an async database session with service role privileges (bypasses RLS).
+    Use this for admin operations or when you need to access all data.
+    """
+    async with AsyncSessionLocal() as db:
+        # Set service role to bypass RLS
+        await db.execute(text("SELECT set_config('role', 'service_role', true)"))
+        yield db
@@ -0,0 +1,185 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import Counter
+from core.config import settings
+from typing import Optional, List, Tuple, Dict, Any, Callable, Generator
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """SQL statements executed within one request (or one tracked block)"""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.slowest_time = 0.0
+        self.statements: List[str] = []
+        self._statement_counts: Counter = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.total_time += duration
+        self.statements.append(statement)
+        self._statement_counts[statement] += 1
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Statements executed at least `threshold` times. The same parameterized
+        statement repeated many times in one request usually means an N+1 loop.
+        """
+        return [(statement, count) for statement, count in self._statement_counts.most_common()
+                if count >= threshold]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "query_count": self.count,
+            "db_time_ms": round(self.total_time * 1000, 3),
+            "slowest_ms": round(self.slowest_time * 1000, 3),
+            "slowest_statement": self.slowest_statement,
+        }
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by query_budget when a request runs more statements than allowed"""
+
+
+# Stats for the code currently running; None when nothing is being tracked
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None)
+
+# Callbacks receiving the stats of every finished request (used by query_budget)
+_request_observers: List[Callable[[QueryStats], None]] = []
+_observers_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+
+def instrument_engine(engine: Engine):
+    """Attach the statement timing hooks to an engine (use .sync_engine for async engines)"""
+    if not settings.DB_INSTRUMENTATION:
+        return
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def get_current_query_stats() -> Optional[QueryStats]:
+    """Stats for the request currently being handled, if any"""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(label: str = "") -> Generator[QueryStats, None, None]:
+    """Collect the statements executed inside the block in the current context"""
+    stats = QueryStats(label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def report_request(stats: QueryStats):
+    """Log noteworthy requests and hand the stats to any active observers"""
+    repeated = stats.repeated_statements(settings.DB_N_PLUS_ONE_THRESHOLD)
+    for statement, count in repeated:
+        logger.warning(
+            f"Possible N+1 in {stats.label}: statement ran {count} times: {statement[:200]}")
+
+    if stats.count > settings.DB_REQUEST_QUERY_WARN:
+        logger.warning(
+            f"{stats.label} ran {stats.count} queries in {stats.total_time * 1000:.1f} ms")
+
+    with _observers_lock:
+        observers = list(_request_observers)
+    for observer in observers:
+        observer(stats)
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Generator[List[QueryStats], None, None]:
+    """
+    Fail if any request handled inside the block, or the block itself, runs
+    more than `max_queries` statements. Works with TestClient, which handles
+    requests on another thread.
+
+    Example:
+        with query_budget(1):
+            client.get("/profile/check", headers=auth_headers)
+    """
+    collected: List[QueryStats] = []
+
+    with _observers_lock:
+        _request_observers.append(collected.append)
+    try:
+        with track_queries("query_budget block") as block_stats:
+            yield collected
+    finally:
+        with _observers_lock:
+            _request_observers.remove(collected.append)
+
+    for stats in collected + [block_stats]:
+        if stats.count > max_queries:
+            statements = "\n".join(
+                f"  {index + 1}. {statement}" for index, statement in enumerate(stats.statements))
+            raise QueryBudgetExceeded(
+                f"{stats.label or 'block'} ran {stats.count} queries (budget {max_queries}):\n{statements}")
+
+
+class QueryInstrumentationMiddleware:
+    """
+    ASGI middleware that tracks the SQL statements run by each HTTP request.
+    Adds a Server-Timing header with the query count and total database time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.DB_INSTRUMENTATION:
+            await self.app(scope, receive, send)
+            return
+
+        label = f"{scope['method']} {scope['path']}"
+
+        with track_queries(label) as stats:
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((
+                        b"server-timing",
+                        f'db;dur={stats.total_time * 1000:.3f};desc="{stats.count} queries"'.encode(),
+                    ))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                report_request(stats)
@@ -1,13 +1,16 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, Date, ForeignKey, Text, ARRAY, TIMESTAMP
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, Float, Date, ForeignKey, Text, ARRAY, TIMESTAMP, Index, FetchedValue, false
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
-from pgvector.sqlalchemy import Vector
+from sqlalchemy.sql import func, text
+from sqlalchemy.orm import relationship, deferred
+from pgvector.sqlalchemy import Vector, HALFVEC
 import uuid
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
+# Size of the chat turn embeddings
+EMBEDDING_DIMENSIONS = 1536
+
 
 class Profile(Base):
     __tablename__ = "profiles"
@@ -16,10 +19,13 @@ class Profile(Base):
     dob = Column(Date)
     preferred_speech_speed = Column(Float, default=1.0)
     preferred_avatar_type = Column(String, default="3D")
-    accessibility_preferences = Column(JSONB, default={})
+    # JSONB is decoded on every load; only profile detail reads undefer it
+    accessibility_preferences = deferred(Column(JSONB, default={}))
     caregiver_id = Column(UUID(as_uuid=True), ForeignKey(
-        "caregivers.id"), nullable=True)
+        "caregivers.id"), nullable=True, index=True)
     last_login = Column(TIMESTAMP(timezone=True))
+    # Chat turns older than this are purged for this user; NULL keeps them
+    chat_retention_days = Column(Integer)
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(
     ), onupdate=func.now(), nullable=False)
 
@@ -48,12 +54,14 @@ class Session(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     profile_id = Column(UUID(as_uuid=True), ForeignKey(
-        "profiles.id"), nullable=False)
+        "profiles.id"), nullable=False, index=True)
     start_time = Column(TIMESTAMP(timezone=True), nullable=False)
     end_time = Column(TIMESTAMP(timezone=True))
     duration = Column(Integer)  # in minutes
     mood_score = Column(Integer)  # 1-10
     mood_notes = Column(Text)
+    # When the API received the current mood; an older one never replaces it
+    mood_updated_at = Column(TIMESTAMP(timezone=True))
     time_of_day = Column(String)  # Morning/Afternoon/Evening
     summary = Column(Text)
     has_activity = Column(Boolean, default=False)
@@ -71,23 +79,59 @@ class Session(Base):
     session_activities = relationship(
         "SessionActivity", back_populates="session")
 
+    __table_args__ = (
+        # A profile's history, newest first, is one index range scan per page
+        Index("ix_sessions_profile_id_start_time_id", "profile_id", "start_time", "id"),
+    )
+
 
 class ChatTurn(Base):
     __tablename__ = "chat_turns"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(UUID(as_uuid=True), ForeignKey(
-        "sessions.id"), nullable=False)
-    timestamp = Column(TIMESTAMP(timezone=True), nullable=False)
+        "sessions.id"), nullable=False, index=True)
+    # Copied from the session by a database trigger so RLS can check it directly
+    profile_id = Column(UUID(as_uuid=True), ForeignKey(
+        "profiles.id"), nullable=False, server_default=FetchedValue())
+    # Partition key (chat_turns is range-partitioned by month), so part of the primary key
+    timestamp = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False)
     speaker = Column(String, nullable=False)
-    message = Column(Text, nullable=False)
+    # Heavy columns are deferred: loading a turn reads only its metadata
+    # unless a query undefers them (see database/projections.py)
+    message = deferred(Column(Text, nullable=False))
     audio_url = Column(String)
-    embedding = Column(Vector(1536))
+    embedding = deferred(Column(Vector(EMBEDDING_DIMENSIONS)), group="embeddings")
+    # Half-precision copy used by the halfvec and binary storage modes
+    embedding_half = deferred(Column(HALFVEC(EMBEDDING_DIMENSIONS)), group="embeddings")
+    # Until when an embedding sweep has reserved this turn for its worker
+    embedding_claimed_until = Column(TIMESTAMP(timezone=True))
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
     # Relationships
     session = relationship("Session", back_populates="chat_turns")
 
+    __table_args__ = (
+        # A profile's history in time order is one index range scan
+        Index("ix_chat_turns_profile_id_timestamp", "profile_id", "timestamp"),
+        # A session's transcript, paged by (timestamp, id)
+        Index("ix_chat_turns_session_id_timestamp_id", "session_id", "timestamp", "id"),
+        # Approximate nearest neighbours by cosine distance, for memory recall
+        Index("ix_chat_turns_embedding_hnsw", "embedding", postgresql_using="hnsw",
+              postgresql_with={"m": 16, "ef_construction": 64},
+              postgresql_ops={"embedding": "vector_cosine_ops"}),
+        Index("ix_chat_turns_embedding_half_hnsw", "embedding_half", postgresql_using="hnsw",
+              postgresql_with={"m": 16, "ef_construction": 64},
+              postgresql_ops={"embedding_half": "halfvec_cosine_ops"}),
+        # Binary quantization: 1 bit per dimension, searched by Hamming distance
+        Index("ix_chat_turns_embedding_binary_hnsw",
+              text(f"(binary_quantize(embedding_half)::bit({EMBEDDING_DIMENSIONS})) bit_hamming_ops"),
+              postgresql_using="hnsw", postgresql_with={"m": 16, "ef_construction": 64}),
+        # Turns still waiting for the embedding pipeline
+        Index("ix_chat_turns_unembedded", "timestamp",
+              postgresql_where=text("embedding IS NULL AND embedding_half IS NULL")),
+    )
+
 
 class Topic(Base):
     __tablename__ = "topics"
@@ -105,7 +149,7 @@ class SessionTopic(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(UUID(as_uuid=True), ForeignKey(
-        "sessions.id"), nullable=False)
+        "sessions.id"), nullable=False, index=True)
     topic_id = Column(UUID(as_uuid=True), ForeignKey(
         "topics.id"), nullable=False)
 
@@ -115,7 +159,7 @@ class Note(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(UUID(as_uuid=True), ForeignKey(
-        "sessions.id"), nullable=False)
+        "sessions.id"), nullable=False, index=True)
     title = Column(String)
     content = Column(Text)
     is_important = Column(Boolean, default=False)
@@ -131,7 +175,7 @@ class Activity(Base):
     type = Column(String, nullable=False)  # Trivia, Breathing, Music, etc.
     name = Column(String, nullable=False)
     description = Column(Text)
-    data = Column(JSONB, default={})
+    data = deferred(Column(JSONB, default={}))
 
     # Relationships
     sessions = relationship("Session", back_populates="activity")
@@ -144,13 +188,13 @@ class SessionActivity(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(UUID(as_uuid=True), ForeignKey(
-        "sessions.id"), nullable=False)
+        "sessions.id"), nullable=False, index=True)
     activity_id = Column(UUID(as_uuid=True), ForeignKey(
         "activities.id"), nullable=False)
     start_time = Column(TIMESTAMP(timezone=True), nullable=False)
     end_time = Column(TIMESTAMP(timezone=True))
     score = Column(Integer)
-    results = Column(JSONB, default={})
+    results = deferred(Column(JSONB, default={}))
 
     # Relationships
     session = relationship("Session", back_populates="session_activities")
@@ -162,7 +206,7 @@ class Medication(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     profile_id = Column(UUID(as_uuid=True), ForeignKey(
-        "profiles.id"), nullable=False)
+        "profiles.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
     dosage = Column(String)
     frequency = Column(String)
@@ -184,7 +228,7 @@ class MedicationReminder(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     medication_id = Column(UUID(as_uuid=True), ForeignKey(
-        "medications.id"), nullable=False)
+        "medications.id"), nullable=False, index=True)
     scheduled_time = Column(TIMESTAMP(timezone=True), nullable=False)
     taken_time = Column(TIMESTAMP(timezone=True))
     skipped = Column(Boolean, default=False)
@@ -194,3 +238,44 @@ class MedicationReminder(Base):
 
     # Relationships
     medication = relationship("Medication", back_populates="reminders")
+
+
+class PurgeRequest(Base):
+    __tablename__ = "purge_requests"
+
+    # Profile whose data the purge worker deletes (then the profile itself)
+    profile_id = Column(UUID(as_uuid=True), primary_key=True)
+    requested_at = Column(TIMESTAMP(timezone=True),
+                          server_default=func.now(), nullable=False)
+    completed_at = Column(TIMESTAMP(timezone=True))
+
+
+class PurgeCheckpoint(Base):
+    __tablename__ = "purge_checkpoints"
+
+    job = Column(String, primary_key=True)
+    target = Column(String, primary_key=True)
+    cursor = Column(JSONB)  # last deleted key in keyset order
+    rows_deleted = Column(BigInteger, server_default="0", nullable=False)
+    done = Column(Boolean, server_default=false(), nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True),
+                        server_default=func.now(), nullable=False)
+
+
+class MoodRollup(Base):
+    __tablename__ = "mood_rollups"
+
+    # Closed sessions of a profile per UTC day or ISO week, split by time of
+    # day. Kept current by the sessions_maintain_mood_rollups trigger.
+    profile_id = Column(UUID(as_uuid=True), ForeignKey(
+        "profiles.id", ondelete="CASCADE"), primary_key=True)
+    granularity = Column(String, primary_key=True)  # day/week
+    period_start = Column(Date, primary_key=True)
+    time_of_day = Column(String, primary_key=True)  # Morning/Afternoon/Evening/Unknown
+    sessions = Column(Integer, server_default="0", nullable=False)
+    rated_sessions = Column(Integer, server_default="0", nullable=False)  # with a mood score
+    mood_sum = Column(BigInteger, server_default="0", nullable=False)
+    timed_sessions = Column(Integer, server_default="0", nullable=False)  # with a duration
+    duration_sum = Column(BigInteger, server_default="0", nullable=False)  # in minutes
+    updated_at = Column(TIMESTAMP(timezone=True),
+                        server_default=func.now(), nullable=False)
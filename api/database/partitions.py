@@ -0,0 +1,233 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from core.config import settings
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, NamedTuple, Optional, Tuple
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Tables range-partitioned by month on their timestamp column
+CHAT_TURNS_TABLE = "chat_turns"
+
+# Catches rows outside every monthly partition; should stay empty
+DEFAULT_PARTITION_SUFFIX = "_default"
+
+# Rows counted at most when checking the DEFAULT partition
+DEFAULT_PARTITION_COUNT_LIMIT = 10000
+
+# Months before the current one that ingestion accepts (and partitions are
+# kept for) when retention is disabled
+BACKDATE_MONTHS_WITHOUT_RETENTION = 12
+
+# Partition names look like chat_turns_p2026_10
+PARTITION_NAME_PATTERN = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+_BOUND_PATTERN = re.compile(r"FROM \('(?P<start>[^']+)'\) TO \('(?P<end>[^']+)'\)")
+
+
+class Partition(NamedTuple):
+    """A monthly partition covering [start, end) in UTC"""
+    name: str
+    start: date
+    end: date
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month `months` after the month containing `day`"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def backdate_months() -> int:
+    """Months before the current one that new turns may be timestamped in"""
+    if settings.CHAT_RETENTION_MONTHS > 0:
+        return settings.CHAT_RETENTION_MONTHS
+    return BACKDATE_MONTHS_WITHOUT_RETENTION
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def create_partition_statements(table: str, month: date) -> List[str]:
+    """
+    DDL for the partition holding `month`. RLS is enabled on the partition
+    itself (with no policies) so it can only be read through the parent
+    table, where the policies apply.
+    """
+    start = month_start(month)
+    end = add_months(start, 1)
+    name = partition_name(table, start)
+    return [
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start} 00:00:00+00') TO ('{end} 00:00:00+00')",
+        f"ALTER TABLE {name} ENABLE ROW LEVEL SECURITY",
+    ]
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}{DEFAULT_PARTITION_SUFFIX}"
+
+
+def create_default_partition_statements(table: str) -> List[str]:
+    """
+    DDL for the DEFAULT partition, which takes rows no monthly partition
+    covers instead of failing the insert
+    """
+    name = default_partition_name(table)
+    return [
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} DEFAULT",
+        f"ALTER TABLE {name} ENABLE ROW LEVEL SECURITY",
+    ]
+
+
+def has_default_partition(conn: Connection, table: str = CHAT_TURNS_TABLE) -> bool:
+    return bool(conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"),
+                             {"name": default_partition_name(table)}).scalar())
+
+
+def default_partition_rows(conn: Connection, table: str = CHAT_TURNS_TABLE) -> Optional[int]:
+    """
+    Rows in the DEFAULT partition (counted up to DEFAULT_PARTITION_COUNT_LIMIT),
+    or None if there is no DEFAULT partition. Rows there are never dropped
+    by retention, and block creating the monthly partition they belong to.
+    """
+    if not has_default_partition(conn, table):
+        return None
+    name = default_partition_name(table)
+    return conn.execute(text(f"SELECT count(*) FROM (SELECT 1 FROM {name} LIMIT :limit) t"),
+                        {"limit": DEFAULT_PARTITION_COUNT_LIMIT}).scalar()
+
+
+def _parse_bound(value: str) -> date:
+    # Bounds are rendered in the session time zone; partitions start at UTC midnight
+    return datetime.fromisoformat(value).astimezone(timezone.utc).date()
+
+
+def list_partitions(conn: Connection, table: str = CHAT_TURNS_TABLE) -> List[Partition]:
+    """Range partitions of `table`, oldest first"""
+    rows = conn.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:table AS regclass)
+    """), {"table": table}).all()
+
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND_PATTERN.search(bound or "")
+        if match is None:
+            continue  # DEFAULT partition
+        partitions.append(Partition(
+            name, _parse_bound(match["start"]), _parse_bound(match["end"])))
+    return sorted(partitions, key=lambda partition: partition.start)
+
+
+def ensure_partitions(conn: Connection, table: str = CHAT_TURNS_TABLE,
+                      months_ahead: Optional[int] = None, today: Optional[date] = None,
+                      months_back: Optional[int] = None) -> List[str]:
+    """
+    Create the partitions from `months_back` months before the current one
+    (by default every month chat_turn_window accepts) to `months_ahead`
+    months after it, and the DEFAULT partition, if they don't exist yet.
+    Returns the names of new partitions.
+    """
+    months_ahead = settings.CHAT_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    months_back = backdate_months() if months_back is None else months_back
+    current_month = month_start(today or datetime.now(timezone.utc).date())
+    existing = {partition.start for partition in list_partitions(conn, table)}
+
+    created = []
+    for offset in range(-months_back, months_ahead + 1):
+        month = add_months(current_month, offset)
+        if month in existing:
+            continue
+        for statement in create_partition_statements(table, month):
+            conn.execute(text(statement))
+        created.append(partition_name(table, month))
+    if default_partition_rows(conn, table) is None:
+        for statement in create_default_partition_statements(table):
+            conn.execute(text(statement))
+        created.append(default_partition_name(table))
+    return created
+
+
+def expired_partitions(partitions: List[Partition], retention_months: int,
+                       today: Optional[date] = None) -> List[Partition]:
+    """
+    Partitions whose whole range is older than the retention window: the
+    current month plus the `retention_months` months before it.
+    """
+    if retention_months <= 0:
+        return []
+    cutoff = add_months(today or datetime.now(timezone.utc).date(), -retention_months)
+    return [partition for partition in partitions if partition.end <= cutoff]
+
+
+def drop_expired_partitions(conn: Connection, table: str = CHAT_TURNS_TABLE,
+                            retention_months: Optional[int] = None,
+                            today: Optional[date] = None, concurrently: bool = True) -> List[str]:
+    """
+    Apply retention by detaching and dropping whole partitions instead of
+    deleting rows. DETACH ... CONCURRENTLY doesn't block queries on the
+    parent table but can't run inside a transaction, so pass an AUTOCOMMIT
+    connection (see maintenance_connection) or concurrently=False.
+
+    Postgres refuses a concurrent detach while the table has a DEFAULT
+    partition, so then a plain DETACH is used. It briefly takes an ACCESS
+    EXCLUSIVE lock on the parent table, but doesn't scan anything.
+    """
+    retention_months = settings.CHAT_RETENTION_MONTHS if retention_months is None else retention_months
+    expired = expired_partitions(list_partitions(conn, table), retention_months, today)
+    if expired and concurrently and has_default_partition(conn, table):
+        concurrently = False
+    dropped = []
+    for partition in expired:
+        detach = "CONCURRENTLY" if concurrently else ""
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition.name} {detach}"))
+        conn.execute(text(f"DROP TABLE {partition.name}"))
+        logger.info(f"Dropped expired partition {partition.name} "
+                    f"({partition.start} to {partition.end})")
+        dropped.append(partition.name)
+    return dropped
+
+
+def chat_turn_window(now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """
+    Range a new chat turn's timestamp must fall in: from the start of the
+    month backdate_months() ago to CHAT_TURN_MAX_FUTURE_SECONDS past now.
+    ensure_partitions creates every month of it, so accepted turns never
+    land in the DEFAULT partition (provided maintenance ran this month and
+    CHAT_PARTITION_MONTHS_AHEAD is at least 1).
+    """
+    now = now or datetime.now(timezone.utc)
+    newest = now + timedelta(seconds=settings.CHAT_TURN_MAX_FUTURE_SECONDS)
+    oldest_month = add_months(now.date(), -backdate_months())
+    return datetime.combine(oldest_month, time.min, tzinfo=timezone.utc), newest
+
+
+def maintenance_connection(engine: Engine) -> Connection:
+    """An AUTOCOMMIT connection for partition maintenance"""
+    return engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+
+
+def maintain_chat_partitions(engine: Engine) -> List[str]:
+    """
+    Create upcoming chat_turns partitions and warn if the DEFAULT partition
+    has rows; used at application startup
+    """
+    with maintenance_connection(engine) as conn:
+        created = ensure_partitions(conn)
+        stray = default_partition_rows(conn)
+    if created:
+        logger.info(f"Created chat_turns partitions: {', '.join(created)}")
+    if stray:
+        logger.warning(f"{stray} chat turn(s) are in {default_partition_name(CHAT_TURNS_TABLE)}, "
+                       "outside every monthly partition; see `python run.py partitions list`")
+    return created
@@ -0,0 +1,101 @@
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from typing import Dict, Any, Optional
+import threading
+import time
+
+
+class PoolStats:
+    """Thread-safe counters describing how connections are handed out by a pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def record_checkout(self, wait_seconds: float, timed_out: bool = False):
+        """Record how long a caller waited to get a connection from the pool"""
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_time_total += wait_seconds
+            if wait_seconds > self.wait_time_max:
+                self.wait_time_max = wait_seconds
+
+    def reset(self):
+        """Reset the counters (the pool's live gauges are not affected)"""
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_time_total = 0.0
+            self.wait_time_max = 0.0
+
+    def snapshot(self, pool) -> Dict[str, Any]:
+        """Return the counters together with the pool's current gauges"""
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            data: Dict[str, Any] = {
+                "pool_class": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_time_total_ms": round(self.wait_time_total * 1000, 3),
+                "wait_time_avg_ms": round(self.wait_time_total * 1000 / attempts, 3) if attempts else 0.0,
+                "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+            }
+
+        # Only queue-style pools keep connections around
+        if hasattr(pool, "checkedout"):
+            data.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        return data
+
+
+class InstrumentedPoolMixin:
+    """
+    Times every connection checkout. The measured wait includes the time spent
+    blocked on a full pool and, when the pool has to grow, the time needed to
+    open the new connection.
+    """
+
+    stats: PoolStats
+
+    def __init__(self, *args, stats: Optional[PoolStats] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats or PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_checkout(
+                time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # Keep counting across engine.dispose()
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    """QueuePool that records checkout wait times"""
+
+
+class InstrumentedNullPool(InstrumentedPoolMixin, NullPool):
+    """NullPool that records connection setup times"""
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait times"""
@@ -0,0 +1,81 @@
+"""
+Narrow loads for list views.
+
+The heavy columns (chat turn text and embeddings, JSONB documents) are
+deferred on the models, so loading an entity skips them by default. These
+helpers name exactly what list views read: column lists for Core selects,
+and loader options for ORM loads. With raiseload, touching anything else
+raises instead of quietly costing one query per row.
+"""
+from sqlalchemy import func
+from sqlalchemy.orm import load_only, undefer
+from sqlalchemy.orm.interfaces import LoaderOption
+from sqlalchemy.sql.elements import ColumnElement
+from database.models import Profile, Session, ChatTurn, Activity, SessionActivity
+from typing import List
+
+# Characters of a chat message shown in a history list
+MESSAGE_PREVIEW_CHARS = 200
+
+CHAT_TURN_LIST_COLUMNS = [ChatTurn.id, ChatTurn.session_id, ChatTurn.timestamp, ChatTurn.speaker]
+
+# What a transcript shows: the list columns plus the full message, no embeddings
+CHAT_TURN_TRANSCRIPT_COLUMNS = [*CHAT_TURN_LIST_COLUMNS, ChatTurn.message, ChatTurn.audio_url]
+
+SESSION_LIST_COLUMNS = [Session.id, Session.profile_id, Session.start_time, Session.end_time,
+                        Session.duration, Session.mood_score, Session.time_of_day,
+                        Session.has_activity, Session.activity_type]
+
+ACTIVITY_LIST_COLUMNS = [Activity.id, Activity.type, Activity.name]
+
+SESSION_ACTIVITY_LIST_COLUMNS = [SessionActivity.id, SessionActivity.session_id,
+                                 SessionActivity.activity_id, SessionActivity.start_time,
+                                 SessionActivity.end_time, SessionActivity.score]
+
+
+def message_preview(length: int = MESSAGE_PREVIEW_CHARS) -> ColumnElement:
+    """The first `length` characters of a chat message, cut in the database"""
+    return func.left(ChatTurn.message, length).label("message_preview")
+
+
+def chat_turn_list_columns(preview_chars: int = MESSAGE_PREVIEW_CHARS) -> List[ColumnElement]:
+    """Columns of a chat history row: metadata plus a message preview (none if 0)"""
+    if not preview_chars:
+        return list(CHAT_TURN_LIST_COLUMNS)
+    return [*CHAT_TURN_LIST_COLUMNS, message_preview(preview_chars)]
+
+
+def chat_turn_list_options() -> List[LoaderOption]:
+    """Load ChatTurn entities with their metadata only"""
+    return [load_only(*CHAT_TURN_LIST_COLUMNS, ChatTurn.profile_id, ChatTurn.created_at,
+                      raiseload=True)]
+
+
+def chat_turn_detail_options() -> List[LoaderOption]:
+    """Load ChatTurn entities with their message, still without embeddings"""
+    return [undefer(ChatTurn.message)]
+
+
+def chat_turn_transcript_options() -> List[LoaderOption]:
+    """Load ChatTurn entities for a transcript: message included, embeddings not"""
+    return [load_only(*CHAT_TURN_TRANSCRIPT_COLUMNS, raiseload=True)]
+
+
+def session_list_options() -> List[LoaderOption]:
+    """Load Session entities without their summary and mood notes"""
+    return [load_only(*SESSION_LIST_COLUMNS, raiseload=True)]
+
+
+def activity_list_options() -> List[LoaderOption]:
+    """Load Activity entities without their description and data"""
+    return [load_only(*ACTIVITY_LIST_COLUMNS, raiseload=True)]
+
+
+def session_activity_list_options() -> List[LoaderOption]:
+    """Load SessionActivity entities without their results"""
+    return [load_only(*SESSION_ACTIVITY_LIST_COLUMNS, raiseload=True)]
+
+
+def profile_detail_options() -> List[LoaderOption]:
+    """Load Profile entities with everything ProfileResponse needs"""
+    return [undefer(Profile.accessibility_preferences)]
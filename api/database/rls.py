@@ -0,0 +1,32 @@
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+from functools import lru_cache
+from typing import Optional, Dict, Any, Tuple
+import json
+
+# Claims and role are set together so the RLS context costs one round trip.
+# Both settings are transaction-local (is_local = true).
+_SET_CLAIMS_AND_ROLE = text(
+    "SELECT set_config('request.jwt.claims', :claims, true), "
+    "set_config('role', :role, true)"
+)
+_SET_ROLE = text("SELECT set_config('role', :role, true)")
+
+
+@lru_cache(maxsize=4096)
+def build_claims(user_id: str, role: str) -> str:
+    """Serialize the JWT claims read by auth.uid() / auth.role()"""
+    return json.dumps({"sub": user_id, "role": role}, separators=(",", ":"))
+
+
+def rls_context_statement(user_id: Optional[str], role: str) -> Tuple[TextClause, Dict[str, Any]]:
+    """
+    Build the single statement that sets up the RLS context.
+
+    Args:
+        user_id: The authenticated user's UUID, or None to only set the role
+        role: The role to set ('authenticated', 'service_role', etc.)
+    """
+    if user_id:
+        return _SET_CLAIMS_AND_ROLE, {"claims": build_claims(str(user_id), role), "role": role}
+    return _SET_ROLE, {"role": role}
@@ -0,0 +1,127 @@
+from sqlalchemy import text
+from core.config import settings
+from typing import Optional, Dict
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Replay lag in seconds. An idle primary produces no WAL, so a replica that has
+# replayed everything it received counts as caught up even if its last replayed
+# transaction is old.
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+# Session.info flag set on sessions bound to a read replica
+REPLICA_SESSION_KEY = "replica"
+
+
+def is_replica_session(db) -> bool:
+    """Check if a (sync or async) session reads from a replica, whose rows may lag the primary"""
+    return bool(db.info.get(REPLICA_SESSION_KEY))
+
+
+class ReplicaRouter:
+    """
+    Decides whether a read-only session can go to a replica, and which one.
+
+    - Replicas are used round-robin among those whose last measured lag is
+      within max_lag_seconds. Lag is measured off the request path, every
+      lag_check_interval seconds, by database.async_db.monitor_replica_lag;
+      a measurement older than three intervals no longer counts.
+    - After a user writes, their reads stay on the primary for
+      sticky_seconds (read-your-writes). Stickiness is tracked per worker
+      process: a request served by another worker can still read from a
+      replica, which is at most max_lag_seconds behind.
+    - With no healthy replica, reads fall back to the primary.
+    """
+
+    def __init__(self, replica_count: int, max_lag_seconds: float,
+                 lag_check_interval: float, sticky_seconds: float):
+        self.replica_count = replica_count
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval = lag_check_interval
+        self.sticky_seconds = sticky_seconds
+        self._lock = threading.Lock()
+        self._round_robin = itertools.count()
+        self._lag: Dict[int, Optional[float]] = {}
+        self._checked_at: Dict[int, float] = {}
+        self._sticky_until: Dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica_count > 0
+
+    def mark_write(self, user_id: str):
+        """Pin the user's reads to the primary for the stickiness window"""
+        if not self.enabled or self.sticky_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._sticky_until[str(user_id)] = now + self.sticky_seconds
+            # Keep the map small on busy workers
+            if len(self._sticky_until) > 10000:
+                self._sticky_until = {
+                    key: until for key, until in self._sticky_until.items() if until > now}
+
+    def is_sticky(self, user_id: Optional[str]) -> bool:
+        """Check if the user wrote recently and must read from the primary"""
+        if user_id is None:
+            return False
+        with self._lock:
+            until = self._sticky_until.get(str(user_id))
+            if until is None:
+                return False
+            if until <= time.monotonic():
+                del self._sticky_until[str(user_id)]
+                return False
+            return True
+
+    def record_lag(self, index: int, lag_seconds: Optional[float]):
+        """Store a lag measurement; None marks the replica as unreachable"""
+        with self._lock:
+            self._lag[index] = lag_seconds
+            self._checked_at[index] = time.monotonic()
+        if lag_seconds is None or lag_seconds > self.max_lag_seconds:
+            logger.warning(
+                f"Replica {index} unavailable for reads (lag: {lag_seconds})")
+
+    def choose_replica(self, user_id: Optional[str] = None) -> Optional[int]:
+        """Pick a replica index for a read-only session, or None for the primary"""
+        if not self.enabled or self.is_sticky(user_id):
+            return None
+
+        # If the lag monitor stops, its last measurements must not keep a replica in use
+        measured_after = time.monotonic() - 3 * self.lag_check_interval
+        with self._lock:
+            healthy = [
+                index for index in range(self.replica_count)
+                if self._lag.get(index) is not None and self._lag[index] <= self.max_lag_seconds
+                and self._checked_at.get(index, float("-inf")) >= measured_after
+            ]
+            if not healthy:
+                return None
+            return healthy[next(self._round_robin) % len(healthy)]
+
+    def status(self) -> Dict[str, object]:
+        """Current lag measurements, for health checks"""
+        with self._lock:
+            return {
+                "replicas": self.replica_count,
+                "lag_seconds": {str(index): self._lag.get(index) for index in range(self.replica_count)},
+                "sticky_users": len(self._sticky_until),
+            }
+
+
+replica_router = ReplicaRouter(
+    replica_count=len(settings.DATABASE_REPLICA_URLS),
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    lag_check_interval=settings.DB_REPLICA_LAG_CHECK_INTERVAL,
+    sticky_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
+)
@@ -1,3 +1,19 @@
 from .profile_datastore import ProfileDatastore
+from .async_profile_datastore import AsyncProfileDatastore
+from .purge_datastore import PurgeDatastore
+from .memory_datastore import MemoryDatastore
+from .async_memory_datastore import AsyncMemoryDatastore
+from .embedding_datastore import EmbeddingDatastore
+from .async_embedding_datastore import AsyncEmbeddingDatastore
+from .chat_datastore import ChatDatastore
+from .async_chat_datastore import AsyncChatDatastore
+from .history_datastore import HistoryDatastore
+from .async_history_datastore import AsyncHistoryDatastore
+from .rollup_datastore import RollupDatastore
+from .async_rollup_datastore import AsyncRollupDatastore
 
-__all__ = ["ProfileDatastore"]
+__all__ = ["ProfileDatastore", "AsyncProfileDatastore", "PurgeDatastore",
+           "MemoryDatastore", "AsyncMemoryDatastore", "EmbeddingDatastore",
+           "AsyncEmbeddingDatastore", "ChatDatastore", "AsyncChatDatastore",
+           "HistoryDatastore", "AsyncHistoryDatastore", "RollupDatastore",
+           "AsyncRollupDatastore"]
@@ -0,0 +1,58 @@
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from datastores.chat_datastore import (
+    ChatTurnRow, SessionActivityRow, SessionMoodRow, ordered_turns, write_statements)
+from datastores.history_datastore import session_bounds_statement
+from typing import Optional, List
+from uuid import UUID
+
+
+class AsyncChatDatastore:
+    """
+    Async datastore layer for chat turns - buffers the writes of a
+    conversation (turns, activity results, mood) and sends them in one
+    statement per kind without blocking the event loop
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._buffer: List[ChatTurnRow] = []
+        self._activities: List[SessionActivityRow] = []
+        self._moods: List[SessionMoodRow] = []
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer) + len(self._activities) + len(self._moods)
+
+    def add(self, row: ChatTurnRow):
+        """Buffer a turn until the next flush"""
+        self._buffer.append(row)
+
+    def add_activity(self, row: SessionActivityRow):
+        """Buffer an activity result until the next flush"""
+        self._activities.append(row)
+
+    def set_mood(self, row: SessionMoodRow):
+        """Buffer a session mood until the next flush"""
+        self._moods.append(row)
+
+    async def flush(self) -> List[ChatTurnRow]:
+        """Write everything buffered in one transaction. Returns the turns written, in timestamp order."""
+        rows = ordered_turns(self._buffer)
+        statements = write_statements(rows, self._activities, self._moods)
+        if not statements:
+            return []
+        try:
+            for statement, params in statements:
+                await self.db.execute(statement, params)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        self._buffer, self._activities, self._moods = [], [], []
+        return rows
+
+    async def get_session_bounds(self, session_id: UUID) -> Optional[Row]:
+        """(profile_id, start_time) of a session, or None if it doesn't exist"""
+        result = await self.db.execute(session_bounds_statement(session_id))
+        return result.first()
@@ -0,0 +1,34 @@
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from datastores.embedding_datastore import (
+    CLAIM_MISSING_EMBEDDINGS_STATEMENT, write_embeddings_statement, write_embeddings_params)
+from typing import Sequence, List, Tuple
+from datetime import datetime
+from uuid import UUID
+
+
+class AsyncEmbeddingDatastore:
+    """Async datastore layer for chat turn embeddings - reads turns to embed and writes the results back"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def claim_missing(self, limit: int, lease_seconds: float) -> List[Row]:
+        """
+        Claim the newest turns that have no embedding and no unexpired claim.
+        Returns their (id, timestamp, message).
+        """
+        result = await self.db.execute(CLAIM_MISSING_EMBEDDINGS_STATEMENT,
+                                       {"limit": limit, "lease_seconds": lease_seconds})
+        rows = list(result)
+        await self.db.commit()
+        return rows
+
+    async def write_embeddings(self, rows: Sequence[Tuple[UUID, datetime, Sequence[float]]],
+                               columns: Sequence[str]) -> int:
+        """Store (id, timestamp, embedding) rows with one bulk UPDATE. Returns rows updated."""
+        if not rows:
+            return 0
+        result = await self.db.execute(write_embeddings_statement(columns), write_embeddings_params(rows))
+        await self.db.commit()
+        return result.rowcount
@@ -0,0 +1,32 @@
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.models import Session as ChatSession, ChatTurn
+from datastores.history_datastore import (
+    Keyset, session_page_statement, turn_page_statement, session_bounds_statement)
+from typing import Optional, List
+from datetime import datetime
+from uuid import UUID
+
+
+class AsyncHistoryDatastore:
+    """Async datastore layer for session and chat history - keyset-paginated reads without blocking the event loop"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def session_page(self, profile_id: UUID, limit: int,
+                           before: Optional[Keyset] = None) -> List[ChatSession]:
+        """Up to `limit` sessions of a profile, newest first"""
+        result = await self.db.execute(session_page_statement(profile_id, limit, before))
+        return list(result.unique().scalars())
+
+    async def turn_page(self, session_id: UUID, since: datetime, limit: int,
+                        after: Optional[Keyset] = None) -> List[ChatTurn]:
+        """Up to `limit` turns of a session, oldest first"""
+        result = await self.db.execute(turn_page_statement(session_id, since, limit, after))
+        return list(result.scalars())
+
+    async def get_session_bounds(self, session_id: UUID) -> Optional[Row]:
+        """(profile_id, start_time) of a session, or None if it doesn't exist"""
+        result = await self.db.execute(session_bounds_statement(session_id))
+        return result.first()
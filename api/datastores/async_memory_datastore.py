@@ -0,0 +1,33 @@
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from datastores.memory_datastore import (
+    recall_statement, search_settings_statement, searchable_turns_statement)
+from typing import Optional, Sequence, List
+from datetime import datetime
+from uuid import UUID
+
+
+class AsyncMemoryDatastore:
+    """Async datastore layer for memory recall - handles nearest-neighbour queries without blocking the event loop"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def recall(self, profile_id: UUID, embedding: Sequence[float], k: int, ef_search: int,
+                     iterative_scan: str = "", since: Optional[datetime] = None,
+                     exact: bool = False, storage: str = "vector", rerank_candidates: int = 0,
+                     full_precision: bool = False) -> List[Row]:
+        """Nearest chat turns of a profile, closest first"""
+        if not exact:
+            statement, params = search_settings_statement(ef_search, iterative_scan)
+            await self.db.execute(statement, params)
+        result = await self.db.execute(recall_statement(
+            profile_id, embedding, k, since, exact, storage, rerank_candidates, full_precision))
+        return list(result)
+
+    async def count_searchable(self, profile_id: UUID, limit: int, since: Optional[datetime] = None,
+                               storage: str = "vector", full_precision: bool = False) -> int:
+        """Turns of a profile that recall can return, up to `limit`"""
+        result = await self.db.execute(searchable_turns_statement(
+            profile_id, limit, since, storage, full_precision))
+        return result.scalar_one()
@@ -0,0 +1,57 @@
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+from database.models import Profile
+from datastores.profile_datastore import (
+    completeness_expression, partial_update_statement, accessible_profile_ids_statement,
+    profile_statement, live_profile_criteria)
+from typing import Optional, Sequence, Dict, Any, List
+from datetime import datetime
+from uuid import UUID
+
+
+class AsyncProfileDatastore:
+    """Async datastore layer for Profile entity - handles all database operations without blocking the event loop"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, user_id: UUID) -> Optional[Profile]:
+        """Get a profile by user ID"""
+        result = await self.db.execute(profile_statement(user_id))
+        return result.scalars().first()
+
+    async def update_fields(self, user_id: UUID, values: Dict[str, Any],
+                            columns: Sequence[ColumnElement],
+                            expected_versions: Optional[Sequence[datetime]] = None) -> Optional[Row]:
+        """
+        Update only the given fields in one round trip and return the
+        requested columns, or None if no profile matched.
+        """
+        result = await self.db.execute(
+            partial_update_statement(user_id, values, columns, expected_versions))
+        row = result.first()
+        await self.db.commit()
+        return row
+
+    async def exists(self, user_id: UUID) -> bool:
+        """Check if profile exists and isn't pending deletion"""
+        result = await self.db.execute(select(Profile.id).where(*live_profile_criteria(user_id)))
+        return result.first() is not None
+
+    async def get_status(self, user_id: UUID, required_fields: Sequence[str]) -> Optional[bool]:
+        """
+        Get profile completeness in one narrow query without loading the profile.
+        Returns None if the profile doesn't exist.
+        """
+        result = await self.db.execute(
+            select(completeness_expression(required_fields)).where(
+                *live_profile_criteria(user_id)))
+        row = result.first()
+        return None if row is None else bool(row[0])
+
+    async def get_accessible_ids(self, user_id: UUID) -> List[UUID]:
+        """IDs of every profile the user can access, in one narrow query"""
+        result = await self.db.execute(accessible_profile_ids_statement(user_id))
+        return list(result.scalars())
@@ -0,0 +1,15 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from datastores.purge_datastore import ENQUEUE_PROFILE_PURGE_STATEMENT
+from uuid import UUID
+
+
+class AsyncPurgeDatastore:
+    """Async datastore layer for purge requests - lets request handlers queue work for the purge worker"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue_profile_purge(self, profile_id: UUID):
+        """Ask the worker to delete all of a profile's data (and the profile)"""
+        await self.db.execute(ENQUEUE_PROFILE_PURGE_STATEMENT, {"profile_id": profile_id})
+        await self.db.commit()
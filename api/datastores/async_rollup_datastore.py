@@ -0,0 +1,18 @@
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from datastores.rollup_datastore import mood_trend_statement
+from typing import List
+from datetime import date
+from uuid import UUID
+
+
+class AsyncRollupDatastore:
+    """Async datastore layer for mood rollups - dashboard reads without blocking the event loop"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def mood_trend(self, profile_id: UUID, granularity: str, since: date, until: date) -> List[Row]:
+        """Rollup rows of a profile in a range of periods"""
+        result = await self.db.execute(mood_trend_statement(profile_id, granularity, since, until))
+        return list(result)
@@ -0,0 +1,248 @@
+from sqlalchemy import text, insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Executable
+from sqlalchemy.sql.elements import TextClause
+from database.models import ChatTurn
+from datastores.history_datastore import session_bounds_statement
+from typing import Optional, List, NamedTuple, Dict, Any, Sequence, Tuple
+from datetime import datetime, timezone
+from uuid import UUID
+import csv
+import io
+import json
+
+
+class ChatTurnRow(NamedTuple):
+    """A chat turn to be written; profile_id is filled in by the database trigger"""
+    id: UUID
+    session_id: UUID
+    timestamp: datetime
+    speaker: str
+    message: str
+    audio_url: Optional[str] = None
+
+
+class SessionActivityRow(NamedTuple):
+    """An activity result; writing the same id again replaces its end time, score and results"""
+    id: UUID
+    session_id: UUID
+    activity_id: UUID
+    start_time: datetime
+    end_time: Optional[datetime] = None
+    score: Optional[int] = None
+    results: Optional[Dict[str, Any]] = None
+
+
+class SessionMoodRow(NamedTuple):
+    """A session's mood; the one received last wins, whatever order they are written in"""
+    session_id: UUID
+    mood_score: int
+    mood_notes: Optional[str] = None
+    # When the API received it; a row without one never replaces a timed mood
+    received_at: Optional[datetime] = None
+
+
+# Columns written by every ingestion path, in ChatTurnRow order
+INGEST_COLUMNS = ChatTurnRow._fields
+
+# One INSERT for any number of turns: the rows arrive as parallel arrays, so
+# the statement text (and its prepared plan) is the same for every batch
+# size. Arrays are passed as text so every driver binds them the same way.
+INSERT_TURNS_STATEMENT = text("""
+    INSERT INTO chat_turns (id, session_id, timestamp, speaker, message, audio_url)
+    SELECT CAST(v.id AS uuid), CAST(v.session_id AS uuid), CAST(v.timestamp AS timestamptz),
+           v.speaker, v.message, v.audio_url
+    FROM unnest(CAST(:ids AS text[]), CAST(:session_ids AS text[]), CAST(:timestamps AS text[]),
+                CAST(:speakers AS text[]), CAST(:messages AS text[]), CAST(:audio_urls AS text[]))
+        WITH ORDINALITY AS v(id, session_id, timestamp, speaker, message, audio_url, n)
+    ORDER BY v.n
+    ON CONFLICT (id, timestamp) DO NOTHING
+""")
+
+# Insert or replace activity results by id, so a replayed write is harmless
+UPSERT_ACTIVITIES_STATEMENT = text("""
+    INSERT INTO session_activities (id, session_id, activity_id, start_time, end_time, score, results)
+    SELECT CAST(v.id AS uuid), CAST(v.session_id AS uuid), CAST(v.activity_id AS uuid),
+           CAST(v.start_time AS timestamptz), CAST(v.end_time AS timestamptz),
+           CAST(v.score AS integer), CAST(v.results AS jsonb)
+    FROM unnest(CAST(:ids AS text[]), CAST(:session_ids AS text[]), CAST(:activity_ids AS text[]),
+                CAST(:start_times AS text[]), CAST(:end_times AS text[]), CAST(:scores AS text[]),
+                CAST(:results AS text[]))
+        AS v(id, session_id, activity_id, start_time, end_time, score, results)
+    ON CONFLICT (id) DO UPDATE
+    SET end_time = EXCLUDED.end_time, score = EXCLUDED.score, results = EXCLUDED.results
+    WHERE session_activities.session_id = EXCLUDED.session_id
+""")
+
+# Outbox segments are replayed in the order they were created, not the order
+# their records were received, so an older mood can arrive after a newer one:
+# only a mood received later than the stored one replaces it
+UPDATE_MOODS_STATEMENT = text("""
+    UPDATE sessions s
+    SET mood_score = CAST(v.mood_score AS integer), mood_notes = v.mood_notes,
+        mood_updated_at = CAST(v.received_at AS timestamptz)
+    FROM unnest(CAST(:session_ids AS text[]), CAST(:mood_scores AS text[]), CAST(:mood_notes AS text[]),
+                CAST(:received_ats AS text[]))
+        AS v(session_id, mood_score, mood_notes, received_at)
+    WHERE s.id = CAST(v.session_id AS uuid)
+    AND (s.mood_updated_at IS NULL OR s.mood_updated_at < CAST(v.received_at AS timestamptz))
+""")
+
+# COPY is the fastest way in, but Postgres refuses COPY FROM on a table with
+# row level security unless the role bypasses it, so only service-role
+# sessions (imports, scripts) can use it
+COPY_TURNS_STATEMENT = (f"COPY chat_turns ({', '.join(INGEST_COLUMNS)}) "
+                        "FROM STDIN WITH (FORMAT csv)")
+
+
+def ordered_turns(rows: Sequence[ChatTurnRow]) -> List[ChatTurnRow]:
+    """Rows sorted by timestamp; turns with the same timestamp keep their order"""
+    return sorted(rows, key=lambda row: row.timestamp)
+
+
+def insert_turns_params(rows: Sequence[ChatTurnRow]) -> Dict[str, Any]:
+    """Bind parameters for INSERT_TURNS_STATEMENT"""
+    return {
+        "ids": [str(row.id) for row in rows],
+        "session_ids": [str(row.session_id) for row in rows],
+        "timestamps": [row.timestamp.isoformat() for row in rows],
+        "speakers": [row.speaker for row in rows],
+        "messages": [row.message for row in rows],
+        "audio_urls": [row.audio_url for row in rows],
+    }
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _received(row: SessionMoodRow) -> datetime:
+    return row.received_at or datetime.min.replace(tzinfo=timezone.utc)
+
+
+def write_statements(turns: Sequence[ChatTurnRow], activities: Sequence[SessionActivityRow] = (),
+                     moods: Sequence[SessionMoodRow] = ()) -> List[Tuple[TextClause, Dict[str, Any]]]:
+    """
+    Statements writing a batch of turns, activity results and moods, one per
+    kind present. Turns go in in timestamp order. A later row for the same
+    activity replaces an earlier one; for a session's mood, the one received
+    last wins. Every statement can be replayed safely.
+    """
+    statements = []
+    if turns:
+        statements.append((INSERT_TURNS_STATEMENT, insert_turns_params(ordered_turns(turns))))
+    if activities:
+        latest = list({row.id: row for row in activities}.values())
+        statements.append((UPSERT_ACTIVITIES_STATEMENT, {
+            "ids": [str(row.id) for row in latest],
+            "session_ids": [str(row.session_id) for row in latest],
+            "activity_ids": [str(row.activity_id) for row in latest],
+            "start_times": [_text(row.start_time) for row in latest],
+            "end_times": [_text(row.end_time) for row in latest],
+            "scores": [_text(row.score) for row in latest],
+            "results": [json.dumps(row.results or {}) for row in latest],
+        }))
+    if moods:
+        latest: Dict[UUID, SessionMoodRow] = {}
+        for row in moods:
+            current = latest.get(row.session_id)
+            if current is None or _received(current) <= _received(row):
+                latest[row.session_id] = row
+        statements.append((UPDATE_MOODS_STATEMENT, {
+            "session_ids": [str(row.session_id) for row in latest.values()],
+            "mood_scores": [_text(row.mood_score) for row in latest.values()],
+            "mood_notes": [row.mood_notes for row in latest.values()],
+            "received_ats": [_text(row.received_at) for row in latest.values()],
+        }))
+    return statements
+
+
+def insert_turn_statement(row: ChatTurnRow) -> Executable:
+    """A single-row INSERT; the per-turn path the bulk statement replaces"""
+    return insert(ChatTurn).values(**row._asdict())
+
+
+class ChatDatastore:
+    """
+    Datastore layer for chat turns - buffers the writes of a conversation
+    (turns, activity results, mood) and sends them in one statement per kind
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._buffer: List[ChatTurnRow] = []
+        self._activities: List[SessionActivityRow] = []
+        self._moods: List[SessionMoodRow] = []
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer) + len(self._activities) + len(self._moods)
+
+    def add(self, row: ChatTurnRow):
+        """Buffer a turn until the next flush"""
+        self._buffer.append(row)
+
+    def add_activity(self, row: SessionActivityRow):
+        """Buffer an activity result until the next flush"""
+        self._activities.append(row)
+
+    def set_mood(self, row: SessionMoodRow):
+        """Buffer a session mood until the next flush"""
+        self._moods.append(row)
+
+    def flush(self) -> List[ChatTurnRow]:
+        """Write everything buffered in one transaction. Returns the turns written, in timestamp order."""
+        rows = ordered_turns(self._buffer)
+        statements = write_statements(rows, self._activities, self._moods)
+        if not statements:
+            return []
+        try:
+            for statement, params in statements:
+                self.db.execute(statement, params)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        self._buffer, self._activities, self._moods = [], [], []
+        return rows
+
+    def insert_turn(self, row: ChatTurnRow):
+        """Write one turn in its own statement"""
+        self.db.execute(insert_turn_statement(row))
+        self.db.commit()
+
+    def copy_turns(self, rows: Sequence[ChatTurnRow]) -> int:
+        """
+        Write turns with COPY, in timestamp order. Only for sessions that
+        bypass RLS (see COPY_TURNS_STATEMENT). Returns the rows written.
+        """
+        rows = ordered_turns(rows)
+        data = io.StringIO()
+        # Strings are always quoted, so only a missing audio_url is an unquoted NULL
+        writer = csv.writer(data, quoting=csv.QUOTE_NONNUMERIC)
+        for row in rows:
+            writer.writerow([str(row.id), str(row.session_id), row.timestamp.isoformat(),
+                             row.speaker, row.message, row.audio_url])
+        data.seek(0)
+
+        cursor = self.db.connection().connection.cursor()
+        try:
+            if hasattr(cursor, "copy_expert"):  # psycopg2
+                cursor.copy_expert(COPY_TURNS_STATEMENT, data)
+            else:  # psycopg 3
+                with cursor.copy(COPY_TURNS_STATEMENT) as copy:
+                    copy.write(data.getvalue())
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            cursor.close()
+        return len(rows)
+
+    def get_session_bounds(self, session_id: UUID) -> Optional[Row]:
+        """(profile_id, start_time) of a session, or None if it doesn't exist"""
+        return self.db.execute(session_bounds_statement(session_id)).first()
@@ -0,0 +1,174 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+from database.models import EMBEDDING_DIMENSIONS
+from datastores.memory_datastore import check_embedding_storage
+from typing import Optional, Tuple, NamedTuple, Dict, Any, List, Sequence
+from datetime import datetime
+from uuid import UUID
+
+
+class EmbeddingRewrite(NamedTuple):
+    """A batched in-place change to chat turn embeddings"""
+    name: str
+    assignment: str
+    condition: str
+
+
+# Copy float32 embeddings into the half-precision column
+BACKFILL_HALFVEC = EmbeddingRewrite(
+    "backfill",
+    f"embedding_half = t.embedding::halfvec({EMBEDDING_DIMENSIONS})",
+    "embedding IS NOT NULL AND embedding_half IS NULL")
+
+# Drop float32 embeddings that have a half-precision copy. Their space is
+# reused by new rows after VACUUM; this disables full-precision re-ranking.
+COMPACT_FLOAT32 = EmbeddingRewrite(
+    "compact",
+    "embedding = NULL",
+    "embedding IS NOT NULL AND embedding_half IS NOT NULL")
+
+# Indexes whose size `storage_stats` reports, one per storage mode
+EMBEDDING_INDEXES = {
+    "vector": "ix_chat_turns_embedding_hnsw",
+    "halfvec": "ix_chat_turns_embedding_half_hnsw",
+    "binary": "ix_chat_turns_embedding_binary_hnsw",
+}
+
+
+# SQL type of each embedding column
+_COLUMN_TYPES = {
+    "embedding": f"vector({EMBEDDING_DIMENSIONS})",
+    "embedding_half": f"halfvec({EMBEDDING_DIMENSIONS})",
+}
+
+# Claim the newest turns with no embedding in either column, for
+# :lease_seconds. Workers sweeping at the same time skip each other's locked
+# rows and unexpired claims, so each turn goes to one worker; if that worker
+# fails to embed it, the next sweep after the lease expires claims it again.
+# Served by the partial index ix_chat_turns_unembedded, which only holds
+# unembedded turns.
+CLAIM_MISSING_EMBEDDINGS_STATEMENT = text("""
+    WITH claimed AS (
+        SELECT id, timestamp FROM chat_turns
+        WHERE embedding IS NULL AND embedding_half IS NULL
+          AND (embedding_claimed_until IS NULL OR embedding_claimed_until < now())
+        ORDER BY timestamp DESC
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE chat_turns t
+    SET embedding_claimed_until = now() + make_interval(secs => :lease_seconds)
+    FROM claimed c
+    WHERE t.id = c.id AND t.timestamp = c.timestamp
+    RETURNING t.id, t.timestamp, t.message
+""")
+
+
+def embedding_columns(storage: str, full_precision: bool) -> List[str]:
+    """Columns a new embedding is written to under a storage mode"""
+    check_embedding_storage(storage)
+    if storage == "vector":
+        return ["embedding"]
+    return ["embedding_half", "embedding"] if full_precision else ["embedding_half"]
+
+
+def write_embeddings_statement(columns: Sequence[str]) -> TextClause:
+    """
+    One UPDATE for a whole batch of embeddings, joined against unnested
+    arrays. The arrays are passed as text so every driver binds them the
+    same way. The timestamp range lets Postgres skip partitions the batch
+    can't touch.
+    """
+    assignments = ", ".join(f"{column} = CAST(v.embedding AS {_COLUMN_TYPES[column]})"
+                            for column in columns)
+    return text(f"""
+        UPDATE chat_turns t SET {assignments}
+        FROM unnest(CAST(:ids AS text[]), CAST(:timestamps AS text[]), CAST(:embeddings AS text[]))
+            AS v(id, timestamp, embedding)
+        WHERE t.id = CAST(v.id AS uuid) AND t.timestamp = CAST(v.timestamp AS timestamptz)
+        AND t.timestamp BETWEEN :min_timestamp AND :max_timestamp
+    """)
+
+
+def write_embeddings_params(rows: Sequence[Tuple[UUID, datetime, Sequence[float]]]) -> Dict[str, Any]:
+    """Bind parameters for write_embeddings_statement from (id, timestamp, embedding) rows"""
+    timestamps = [timestamp for _, timestamp, _ in rows]
+    return {
+        "ids": [str(turn_id) for turn_id, _, _ in rows],
+        "timestamps": [timestamp.isoformat() for timestamp in timestamps],
+        "embeddings": ["[" + ",".join(repr(float(value)) for value in embedding) + "]"
+                       for _, _, embedding in rows],
+        "min_timestamp": min(timestamps),
+        "max_timestamp": max(timestamps),
+    }
+
+
+class EmbeddingDatastore:
+    """Datastore layer for chat turn embeddings - batched rewrites between storage modes"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def rewrite_batch(self, partition: str, rewrite: EmbeddingRewrite, batch_size: int,
+                      after: Optional[Tuple[UUID, datetime]] = None) -> Tuple[int, Optional[Tuple[UUID, datetime]]]:
+        """
+        Apply `rewrite` to the next batch of one partition, walking its
+        primary key from `after`. Rows locked by live writes are skipped.
+        Returns the rows changed and the key to continue from (None when done).
+        """
+        keyset = " AND (id, timestamp) > (:after_id, :after_timestamp)" if after else ""
+        params: Dict[str, Any] = {"batch_size": batch_size}
+        if after:
+            params.update(after_id=after[0], after_timestamp=after[1])
+
+        try:
+            changed = self.db.execute(text(f"""
+                WITH batch AS (
+                    SELECT id, timestamp FROM {partition}
+                    WHERE {rewrite.condition}{keyset}
+                    ORDER BY id, timestamp
+                    LIMIT :batch_size
+                    FOR UPDATE SKIP LOCKED
+                )
+                UPDATE {partition} t SET {rewrite.assignment}
+                FROM batch WHERE t.id = batch.id AND t.timestamp = batch.timestamp
+                RETURNING t.id, t.timestamp
+            """), params).all()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        if not changed:
+            return 0, None
+        return len(changed), tuple(max(tuple(row) for row in changed))
+
+    def storage_stats(self) -> Dict[str, Any]:
+        """Embedding counts and on-disk sizes per storage mode (scans chat_turns)"""
+        counts = self.db.execute(text("""
+            SELECT count(embedding), count(embedding_half),
+                   coalesce(sum(pg_column_size(embedding)), 0),
+                   coalesce(sum(pg_column_size(embedding_half)), 0)
+            FROM chat_turns
+        """)).one()
+        index_sizes = dict(self.db.execute(text("""
+            SELECT i.relname, coalesce(sum(pg_relation_size(p.inhrelid)), 0)
+            FROM pg_class i LEFT JOIN pg_inherits p ON p.inhparent = i.oid
+            WHERE i.relname = ANY(:names)
+            GROUP BY i.relname
+        """), {"names": list(EMBEDDING_INDEXES.values())}).all())
+        table_bytes = self.db.execute(text("""
+            SELECT coalesce(sum(pg_total_relation_size(inhrelid)), 0)
+            FROM pg_inherits WHERE inhparent = 'chat_turns'::regclass
+        """)).scalar()
+
+        return {
+            "table_bytes": int(table_bytes),
+            "vector": {"rows": counts[0], "column_bytes": int(counts[2]),
+                       "index_bytes": int(index_sizes.get(EMBEDDING_INDEXES["vector"], 0))},
+            "halfvec": {"rows": counts[1], "column_bytes": int(counts[3]),
+                        "index_bytes": int(index_sizes.get(EMBEDDING_INDEXES["halfvec"], 0))},
+            "binary": {"rows": counts[1], "column_bytes": int(counts[3]),
+                       "index_bytes": int(index_sizes.get(EMBEDDING_INDEXES["binary"], 0))},
+        }
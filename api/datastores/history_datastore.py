@@ -0,0 +1,82 @@
+from sqlalchemy import select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, selectinload, joinedload, raiseload
+from sqlalchemy.sql import Select, Executable
+from database.models import Session as ChatSession, ChatTurn, Topic, Activity
+from database.projections import session_list_options, chat_turn_transcript_options
+from typing import Optional, Tuple, List
+from datetime import datetime
+from uuid import UUID
+
+# A keyset position: (start_time or timestamp, id) of the last row of the previous page
+Keyset = Tuple[datetime, UUID]
+
+
+def session_page_statement(profile_id: UUID, limit: int, before: Optional[Keyset] = None) -> Select:
+    """
+    A profile's sessions, newest first, from just after `before`. Walks
+    ix_sessions_profile_id_start_time_id, so a deep page costs the same as
+    the first. Topics come from one SELECT ... IN for the whole page and the
+    activity name from a join; any other relationship raises rather than
+    loading once per session.
+    """
+    statement = (
+        select(ChatSession)
+        .where(ChatSession.profile_id == profile_id)
+        .options(*session_list_options(),
+                 selectinload(ChatSession.topics).load_only(Topic.name),
+                 joinedload(ChatSession.activity).load_only(Activity.name),
+                 raiseload("*"))
+        .order_by(ChatSession.start_time.desc(), ChatSession.id.desc())
+        .limit(limit)
+    )
+    if before is not None:
+        statement = statement.where(tuple_(ChatSession.start_time, ChatSession.id) < before)
+    return statement
+
+
+def turn_page_statement(session_id: UUID, since: datetime, limit: int,
+                        after: Optional[Keyset] = None) -> Select:
+    """
+    A session's turns in time order, from just after `after`. Walks
+    ix_chat_turns_session_id_timestamp_id. The plain timestamp bound (the
+    session start, or the cursor's timestamp) lets Postgres skip older
+    chat_turns partitions; the row comparison alone doesn't.
+    """
+    lower = after[0] if after is not None else since
+    statement = (
+        select(ChatTurn)
+        .where(ChatTurn.session_id == session_id, ChatTurn.timestamp >= lower)
+        .options(*chat_turn_transcript_options(), raiseload("*"))
+        .order_by(ChatTurn.timestamp, ChatTurn.id)
+        .limit(limit)
+    )
+    if after is not None:
+        statement = statement.where(tuple_(ChatTurn.timestamp, ChatTurn.id) > after)
+    return statement
+
+
+def session_bounds_statement(session_id: UUID) -> Executable:
+    """The profile and start time of a session"""
+    return select(ChatSession.profile_id, ChatSession.start_time).where(ChatSession.id == session_id)
+
+
+class HistoryDatastore:
+    """Datastore layer for session and chat history - keyset-paginated reads"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def session_page(self, profile_id: UUID, limit: int,
+                     before: Optional[Keyset] = None) -> List[ChatSession]:
+        """Up to `limit` sessions of a profile, newest first"""
+        return list(self.db.execute(session_page_statement(profile_id, limit, before)).unique().scalars())
+
+    def turn_page(self, session_id: UUID, since: datetime, limit: int,
+                  after: Optional[Keyset] = None) -> List[ChatTurn]:
+        """Up to `limit` turns of a session, oldest first"""
+        return list(self.db.execute(turn_page_statement(session_id, since, limit, after)).scalars())
+
+    def get_session_bounds(self, session_id: UUID) -> Optional[Row]:
+        """(profile_id, start_time) of a session, or None if it doesn't exist"""
+        return self.db.execute(session_bounds_statement(session_id)).first()
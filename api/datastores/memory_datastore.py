@@ -0,0 +1,147 @@
+from sqlalchemy import select, text, cast, func
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import ColumnElement, TextClause
+from pgvector.sqlalchemy import HALFVEC, BIT
+from database.models import ChatTurn, EMBEDDING_DIMENSIONS
+from typing import Optional, Sequence, List, Tuple, Dict, Any
+from datetime import datetime
+from uuid import UUID
+
+
+# How chat turn embeddings are stored and indexed for recall:
+#   vector  - float32 `embedding`, HNSW index on it (~6 KB per turn)
+#   halfvec - float16 `embedding_half`, HNSW index on it (~3 KB per turn)
+#   binary  - float16 `embedding_half` searched through an HNSW index on its
+#             binary quantization (1 bit per dimension), then re-ranked
+EMBEDDING_STORAGE_MODES = ("vector", "halfvec", "binary")
+
+
+def check_embedding_storage(storage: str):
+    """Raise ValueError unless `storage` is one of EMBEDDING_STORAGE_MODES"""
+    if storage not in EMBEDDING_STORAGE_MODES:
+        raise ValueError(f"EMBEDDING_STORAGE must be one of {', '.join(EMBEDDING_STORAGE_MODES)}, "
+                         f"got {storage!r}")
+
+
+def stored_embedding(storage: str) -> ColumnElement:
+    """The column holding the embeddings for a storage mode"""
+    return ChatTurn.embedding if storage == "vector" else ChatTurn.embedding_half
+
+
+def reranks(storage: str, full_precision: bool) -> bool:
+    """
+    Whether index candidates are re-ordered by exact distance: always for
+    binary, and for halfvec when the float32 embeddings are kept for it.
+    """
+    return storage == "binary" or (storage == "halfvec" and full_precision)
+
+
+def _index_distance(storage: str, embedding: Sequence[float]) -> ColumnElement:
+    """Distance expression that matches the storage mode's HNSW index"""
+    if storage == "binary":
+        quantized = cast(func.binary_quantize(ChatTurn.embedding_half), BIT(EMBEDDING_DIMENSIONS))
+        return quantized.hamming_distance(
+            func.binary_quantize(cast(embedding, HALFVEC(EMBEDDING_DIMENSIONS))))
+    return stored_embedding(storage).cosine_distance(embedding)
+
+
+def _recall_filters(profile_id: UUID, since: Optional[datetime], storage: str,
+                    full_precision: bool) -> List[ColumnElement]:
+    """The profile's turns that recall can return"""
+    filters = [ChatTurn.profile_id == profile_id, stored_embedding(storage).is_not(None)]
+    if full_precision:
+        # A NULL distance would sort last and still be returned
+        filters.append(ChatTurn.embedding.is_not(None))
+    if since is not None:
+        filters.append(ChatTurn.timestamp >= since)
+    return filters
+
+
+def searchable_turns_statement(profile_id: UUID, limit: int, since: Optional[datetime] = None,
+                               storage: str = "vector", full_precision: bool = False) -> Select:
+    """
+    How many of the profile's turns recall can return, counting at most
+    `limit`. Uses the profile_id index and stops after `limit` rows.
+    """
+    turns = (select(ChatTurn.id)
+             .where(*_recall_filters(profile_id, since, storage, full_precision))
+             .limit(limit).subquery("turns"))
+    return select(func.count()).select_from(turns)
+
+
+def recall_statement(profile_id: UUID, embedding: Sequence[float], k: int,
+                     since: Optional[datetime] = None, exact: bool = False,
+                     storage: str = "vector", rerank_candidates: int = 0,
+                     full_precision: bool = False) -> Select:
+    """
+    The k chat turns of a profile closest to `embedding` by cosine distance.
+
+    Ordering by the bare index distance lets the planner use the storage
+    mode's HNSW index. With rerank_candidates, that many turns are taken from
+    the index and re-ordered by exact cosine distance, on the float32
+    embeddings when full_precision is set; turns whose float32 embedding was
+    compacted away are then skipped. With exact=True the ordering no longer
+    matches any index, so every turn of the profile is compared: the
+    brute-force baseline. A `since` bound prunes chat_turns partitions.
+    """
+    exact_column = ChatTurn.embedding if full_precision else stored_embedding(storage)
+    filters = _recall_filters(profile_id, since, storage, full_precision)
+    columns = [ChatTurn.id, ChatTurn.session_id, ChatTurn.timestamp, ChatTurn.speaker,
+               ChatTurn.message]
+
+    if exact:
+        distance = exact_column.cosine_distance(embedding)
+        return (select(*columns, distance.label("distance")).where(*filters)
+                .order_by(distance + 0).limit(k))
+
+    index_distance = _index_distance(storage, embedding)
+    if not rerank_candidates:
+        return (select(*columns, index_distance.label("distance")).where(*filters)
+                .order_by(index_distance).limit(k))
+
+    candidates = (select(*columns, exact_column.label("rerank_embedding")).where(*filters)
+                  .order_by(index_distance).limit(max(rerank_candidates, k))
+                  .subquery("candidates"))
+    distance = candidates.c.rerank_embedding.cosine_distance(embedding)
+    return (select(*[candidates.c[column.key] for column in columns], distance.label("distance"))
+            .order_by(distance).limit(k))
+
+
+def search_settings_statement(ef_search: int,
+                              iterative_scan: str = "") -> Tuple[TextClause, Dict[str, Any]]:
+    """
+    Set the HNSW search parameters for the current transaction only, in one
+    round trip.
+    """
+    if iterative_scan:
+        return (text("SELECT set_config('hnsw.ef_search', :ef_search, true), "
+                     "set_config('hnsw.iterative_scan', :iterative_scan, true)"),
+                {"ef_search": str(ef_search), "iterative_scan": iterative_scan})
+    return (text("SELECT set_config('hnsw.ef_search', :ef_search, true)"),
+            {"ef_search": str(ef_search)})
+
+
+class MemoryDatastore:
+    """Datastore layer for memory recall - nearest-neighbour queries over chat turn embeddings"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def recall(self, profile_id: UUID, embedding: Sequence[float], k: int, ef_search: int,
+               iterative_scan: str = "", since: Optional[datetime] = None,
+               exact: bool = False, storage: str = "vector", rerank_candidates: int = 0,
+               full_precision: bool = False) -> List[Row]:
+        """Nearest chat turns of a profile, closest first"""
+        if not exact:
+            statement, params = search_settings_statement(ef_search, iterative_scan)
+            self.db.execute(statement, params)
+        return list(self.db.execute(recall_statement(
+            profile_id, embedding, k, since, exact, storage, rerank_candidates, full_precision)))
+
+    def count_searchable(self, profile_id: UUID, limit: int, since: Optional[datetime] = None,
+                         storage: str = "vector", full_precision: bool = False) -> int:
+        """Turns of a profile that recall can return, up to `limit`"""
+        return self.db.execute(searchable_turns_statement(
+            profile_id, limit, since, storage, full_precision)).scalar_one()
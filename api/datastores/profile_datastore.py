@@ -1,9 +1,75 @@
+from sqlalchemy import and_, or_, true, exists, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from database.models import Profile
-from typing import Optional
+from sqlalchemy.sql import Executable
+from sqlalchemy.sql.elements import ColumnElement
+from database.models import Profile, PurgeRequest
+from database.projections import profile_detail_options
+from typing import Optional, Sequence, Dict, Any, List
+from datetime import datetime
 from uuid import UUID
 
 
+def completeness_expression(required_fields: Sequence[str]) -> ColumnElement:
+    """SQL boolean that is true when every required profile column is set"""
+    if not required_fields:
+        return true()
+    return and_(*(getattr(Profile, field).isnot(None) for field in required_fields))
+
+
+def not_pending_purge() -> ColumnElement:
+    """
+    SQL boolean that is false once the profile's deletion has been requested.
+    The purge worker removes the row later; until then the profile is gone
+    as far as reads, writes and access checks are concerned.
+    """
+    return ~exists().where(PurgeRequest.profile_id == Profile.id,
+                           PurgeRequest.completed_at.is_(None))
+
+
+def live_profile_criteria(user_id: UUID) -> List[ColumnElement]:
+    """WHERE criteria for the user's profile, unless it is pending deletion"""
+    return [Profile.id == user_id, not_pending_purge()]
+
+
+def partial_update_statement(user_id: UUID, values: Dict[str, Any],
+                             columns: Sequence[ColumnElement],
+                             expected_versions: Optional[Sequence[datetime]] = None) -> Executable:
+    """
+    UPDATE ... RETURNING for the given fields. updated_at is bumped by its
+    onupdate default. With nothing to change the row is only read, so
+    updated_at stays the same. When expected_versions is given, the row only
+    matches if its updated_at is one of them (optimistic concurrency).
+    """
+    criteria = live_profile_criteria(user_id)
+    if expected_versions is not None:
+        criteria.append(Profile.updated_at.in_(expected_versions))
+
+    if not values:
+        return select(*columns).where(*criteria)
+    return (
+        update(Profile)
+        .where(*criteria)
+        .values(**values)
+        .returning(*columns)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def profile_statement(user_id: UUID) -> Executable:
+    """One profile with the columns ProfileResponse needs, deferred ones included"""
+    return select(Profile).where(*live_profile_criteria(user_id)).options(*profile_detail_options())
+
+
+def accessible_profile_ids_statement(user_id: UUID) -> Executable:
+    """
+    IDs of the user's own profile and every profile they manage as caregiver,
+    leaving out profiles pending deletion
+    """
+    return select(Profile.id).where(
+        or_(Profile.id == user_id, Profile.caregiver_id == user_id), not_pending_purge())
+
+
 class ProfileDatastore:
     """Datastore layer for Profile entity - handles all database operations"""
 
@@ -12,26 +78,34 @@ class ProfileDatastore:
 
     def get_by_id(self, user_id: UUID) -> Optional[Profile]:
         """Get a profile by user ID"""
-        return self.db.query(Profile).filter(Profile.id == user_id).first()
+        return self.db.execute(profile_statement(user_id)).scalars().first()
 
-    def update(self, profile: Profile) -> Profile:
-        """Update existing profile"""
+    def update_fields(self, user_id: UUID, values: Dict[str, Any],
+                      columns: Sequence[ColumnElement],
+                      expected_versions: Optional[Sequence[datetime]] = None) -> Optional[Row]:
+        """
+        Update only the given fields in one round trip and return the
+        requested columns, or None if no profile matched.
+        """
+        row = self.db.execute(
+            partial_update_statement(user_id, values, columns, expected_versions)).first()
         self.db.commit()
-        self.db.refresh(profile)
-        return profile
-
-    def delete(self, profile: Profile) -> bool:
-        """Delete a profile"""
-        try:
-            self.db.delete(profile)
-            self.db.commit()
-            return True
-        except Exception:
-            self.db.rollback()
-            return False
+        return row
 
     def exists(self, user_id: UUID) -> bool:
-        """Check if profile exists"""
-        return self.db.query(Profile).filter(Profile.id == user_id).first() is not None
+        """Check if profile exists and isn't pending deletion"""
+        return self.db.query(Profile.id).filter(
+            *live_profile_criteria(user_id)).first() is not None
 
+    def get_status(self, user_id: UUID, required_fields: Sequence[str]) -> Optional[bool]:
+        """
+        Get profile completeness in one narrow query without loading the profile.
+        Returns None if the profile doesn't exist.
+        """
+        row = self.db.query(completeness_expression(required_fields)).filter(
+            *live_profile_criteria(user_id)).first()
+        return None if row is None else bool(row[0])
 
+    def get_accessible_ids(self, user_id: UUID) -> List[UUID]:
+        """IDs of every profile the user can access, in one narrow query"""
+        return list(self.db.execute(accessible_profile_ids_statement(user_id)).scalars())
@@ -0,0 +1,178 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from database.models import PurgeCheckpoint
+from typing import Optional, List, Tuple, NamedTuple, Dict, Any
+from uuid import UUID
+import json
+
+
+class PurgeTarget(NamedTuple):
+    """
+    Rows of one table to purge. `scope` is a FROM ... WHERE clause with the
+    table aliased as t; `keys` are (column, SQL type) pairs giving the keyset
+    order, which must be unique per row.
+    """
+    table: str
+    keys: Tuple[Tuple[str, str], ...]
+    scope: str
+
+
+_UUID_KEY = (("id", "uuid"),)
+# Matches the (profile_id, timestamp) index and the (id, timestamp) primary key
+_CHAT_TURN_KEYS = (("timestamp", "timestamptz"), ("id", "uuid"))
+
+_SESSION_SCOPE = "{table} t JOIN sessions s ON s.id = t.session_id WHERE s.profile_id = :profile_id"
+
+# Everything that references a profile, children before parents so foreign
+# keys never block a batch
+PROFILE_PURGE_TARGETS = [
+    PurgeTarget("chat_turns", _CHAT_TURN_KEYS, "chat_turns t WHERE t.profile_id = :profile_id"),
+    PurgeTarget("notes", _UUID_KEY, _SESSION_SCOPE.format(table="notes")),
+    PurgeTarget("session_topics", _UUID_KEY, _SESSION_SCOPE.format(table="session_topics")),
+    PurgeTarget("session_activities", _UUID_KEY, _SESSION_SCOPE.format(table="session_activities")),
+    PurgeTarget("sessions", _UUID_KEY, "sessions t WHERE t.profile_id = :profile_id"),
+    PurgeTarget("medication_reminders", _UUID_KEY,
+                "medication_reminders t JOIN medications m ON m.id = t.medication_id "
+                "WHERE m.profile_id = :profile_id"),
+    PurgeTarget("medications", _UUID_KEY, "medications t WHERE t.profile_id = :profile_id"),
+]
+
+# Chat turns past a profile's own retention setting
+RETENTION_PURGE_TARGET = PurgeTarget(
+    "chat_turns", _CHAT_TURN_KEYS,
+    "chat_turns t WHERE t.profile_id = :profile_id AND t.timestamp < :cutoff")
+
+
+# Queue a profile purge; asking again restarts a completed one
+ENQUEUE_PROFILE_PURGE_STATEMENT = text("""
+    INSERT INTO purge_requests (profile_id) VALUES (:profile_id)
+    ON CONFLICT (profile_id) DO UPDATE SET requested_at = now(), completed_at = NULL
+""")
+
+
+def batch_delete_statement(target: PurgeTarget, after_cursor: bool) -> str:
+    """
+    DELETE ... RETURNING for the next batch in keyset order. Rows locked by
+    the live conversation path are skipped rather than waited for.
+    """
+    key_columns = ", ".join(f"t.{name}" for name, _ in target.keys)
+    keyset = ""
+    if after_cursor:
+        cursor = ", ".join(f"CAST(:cursor_{index} AS {sql_type})"
+                           for index, (_, sql_type) in enumerate(target.keys))
+        keyset = f" AND ({key_columns}) > ({cursor})"
+    join = " AND ".join(f"d.{name} = batch.{name}" for name, _ in target.keys)
+    returning = ", ".join(f"d.{name}" for name, _ in target.keys)
+    return f"""
+        WITH batch AS (
+            SELECT {key_columns} FROM {target.scope}{keyset}
+            ORDER BY {key_columns}
+            LIMIT :batch_size
+            FOR UPDATE OF t SKIP LOCKED
+        )
+        DELETE FROM {target.table} d USING batch
+        WHERE {join}
+        RETURNING {returning}
+    """
+
+
+class PurgeDatastore:
+    """Datastore layer for the purge worker - batch deletes and their checkpoints"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue_profile_purge(self, profile_id: UUID):
+        """Ask the worker to delete all of a profile's data (and the profile)"""
+        self.db.execute(ENQUEUE_PROFILE_PURGE_STATEMENT, {"profile_id": profile_id})
+        self.db.commit()
+
+    def pending_profile_purges(self) -> List[UUID]:
+        return list(self.db.execute(text("""
+            SELECT profile_id FROM purge_requests
+            WHERE completed_at IS NULL ORDER BY requested_at
+        """)).scalars())
+
+    def complete_profile_purge(self, profile_id: UUID) -> Optional[UUID]:
+        """
+        Delete the (now childless) profile and mark its purge request done.
+        Returns the profile's caregiver ID, if it had one.
+        """
+        caregiver_id = self.db.execute(
+            text("DELETE FROM profiles WHERE id = :profile_id RETURNING caregiver_id"),
+            {"profile_id": profile_id}).scalar()
+        self.db.execute(text("UPDATE purge_requests SET completed_at = now() WHERE profile_id = :profile_id"),
+                        {"profile_id": profile_id})
+        self.db.commit()
+        return caregiver_id
+
+    def profiles_with_retention(self) -> List[Tuple[UUID, int]]:
+        """(profile ID, retention days) for every profile with its own chat retention"""
+        return [tuple(row) for row in self.db.execute(text("""
+            SELECT id, chat_retention_days FROM profiles
+            WHERE chat_retention_days IS NOT NULL ORDER BY id
+        """))]
+
+    def get_checkpoint(self, job: str, target: str) -> Optional[PurgeCheckpoint]:
+        return self.db.get(PurgeCheckpoint, (job, target))
+
+    def delete_batch(self, job: str, target: PurgeTarget, params: Dict[str, Any],
+                     cursor: Optional[List[str]], batch_size: int,
+                     statement_timeout_ms: int, lock_timeout_ms: int) -> List[tuple]:
+        """
+        Delete one batch and record the new checkpoint in the same transaction.
+        The timeouts bound how long the batch can run or wait for a lock;
+        exceeding them raises and rolls the batch back.
+        """
+        self.db.execute(text("SELECT set_config('statement_timeout', :timeout, true), "
+                             "set_config('lock_timeout', :lock_timeout, true)"),
+                        {"timeout": str(statement_timeout_ms), "lock_timeout": str(lock_timeout_ms)})
+
+        statement_params = dict(params, batch_size=batch_size)
+        for index, value in enumerate(cursor or []):
+            statement_params[f"cursor_{index}"] = value
+        try:
+            deleted = [tuple(row) for row in self.db.execute(
+                text(batch_delete_statement(target, cursor is not None)), statement_params)]
+            new_cursor = [str(value) for value in max(deleted)] if deleted else cursor
+            self._save_checkpoint(job, target.table, new_cursor, len(deleted), done=False)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return deleted
+
+    def has_remaining(self, target: PurgeTarget, params: Dict[str, Any]) -> bool:
+        """Whether any rows are left in scope, including ones skipped as locked"""
+        return self.db.execute(
+            text(f"SELECT 1 FROM {target.scope} LIMIT 1"), params).first() is not None
+
+    def finish_target(self, job: str, target: PurgeTarget):
+        self._save_checkpoint(job, target.table, None, 0, done=True)
+        self.db.commit()
+
+    def restart_target(self, job: str, target: PurgeTarget):
+        """Start the next pass from the beginning, to pick up rows skipped as locked"""
+        self._save_checkpoint(job, target.table, None, 0, done=False)
+        self.db.commit()
+
+    def _save_checkpoint(self, job: str, target: str, cursor: Optional[List[str]],
+                         rows_deleted: int, done: bool):
+        self.db.execute(text("""
+            INSERT INTO purge_checkpoints (job, target, cursor, rows_deleted, done, updated_at)
+            VALUES (:job, :target, CAST(:cursor AS jsonb), :rows_deleted, :done, now())
+            ON CONFLICT (job, target) DO UPDATE SET
+                cursor = EXCLUDED.cursor,
+                rows_deleted = purge_checkpoints.rows_deleted + EXCLUDED.rows_deleted,
+                done = EXCLUDED.done,
+                updated_at = now()
+        """), {"job": job, "target": target, "cursor": json.dumps(cursor),
+               "rows_deleted": rows_deleted, "done": done})
+
+    def clear_checkpoints(self, job: str):
+        self.db.execute(text("DELETE FROM purge_checkpoints WHERE job = :job"), {"job": job})
+        self.db.commit()
+
+    def checkpoints(self) -> List[PurgeCheckpoint]:
+        return list(self.db.query(PurgeCheckpoint).order_by(
+            PurgeCheckpoint.job, PurgeCheckpoint.target))
@@ -0,0 +1,122 @@
+from sqlalchemy import select, func, cast, text, Date
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from database.models import Session as ChatSession, MoodRollup
+from typing import Optional, List
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import UUID
+
+GRANULARITIES = ("day", "week")
+
+# Length of a period, for the exclusive upper bound of a range of them
+PERIOD_LENGTH = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+# Rollup row for sessions without a time of day
+UNKNOWN_TIME_OF_DAY = "Unknown"
+
+# Serializes rebuilds with the trigger: it waits for in-flight session
+# writes to commit and holds new ones until the rebuilt rows are committed,
+# so every session change is counted exactly once
+LOCK_ROLLUPS_STATEMENT = text("LOCK TABLE mood_rollups IN SHARE ROW EXCLUSIVE MODE")
+
+DELETE_ROLLUPS_STATEMENT = text(
+    "DELETE FROM mood_rollups WHERE profile_id = ANY(CAST(:profile_ids AS uuid[]))")
+
+# The rows the trigger would have built, recomputed from the profiles' closed sessions
+REBUILD_ROLLUPS_STATEMENT = text(f"""
+    INSERT INTO mood_rollups (
+        profile_id, granularity, period_start, time_of_day, sessions,
+        rated_sessions, mood_sum, timed_sessions, duration_sum)
+    SELECT s.profile_id, g.granularity, g.period_start,
+           coalesce(s.time_of_day, '{UNKNOWN_TIME_OF_DAY}'), count(*), count(s.mood_score),
+           coalesce(sum(s.mood_score), 0), count(s.duration), coalesce(sum(s.duration), 0)
+    FROM sessions s
+    CROSS JOIN LATERAL (VALUES
+        ('day', (s.start_time AT TIME ZONE 'UTC')::date),
+        ('week', date_trunc('week', (s.start_time AT TIME ZONE 'UTC')::date)::date)
+    ) g (granularity, period_start)
+    WHERE s.end_time IS NOT NULL AND s.profile_id = ANY(CAST(:profile_ids AS uuid[]))
+    GROUP BY 1, 2, 3, 4
+""")
+
+PROFILE_BATCH_STATEMENT = text(
+    "SELECT id FROM profiles WHERE id > :after ORDER BY id LIMIT :limit")
+
+
+def mood_trend_statement(profile_id: UUID, granularity: str, since: date, until: date) -> Select:
+    """
+    A profile's rollup rows for the periods starting from `since` to
+    `until`, inclusive: one primary key range scan.
+    """
+    return (
+        select(MoodRollup.period_start, MoodRollup.time_of_day, MoodRollup.sessions,
+               MoodRollup.rated_sessions, MoodRollup.mood_sum, MoodRollup.timed_sessions,
+               MoodRollup.duration_sum)
+        .where(MoodRollup.profile_id == profile_id,
+               MoodRollup.granularity == granularity,
+               MoodRollup.period_start.between(since, until))
+        .order_by(MoodRollup.period_start, MoodRollup.time_of_day)
+    )
+
+
+def live_mood_trend_statement(profile_id: UUID, granularity: str, since: date, until: date) -> Select:
+    """
+    The same rows as mood_trend_statement, aggregated from the sessions on
+    the fly. What the dashboard would cost without the rollups; also how
+    `rollups verify` checks them.
+    """
+    day = cast(func.timezone("UTC", ChatSession.start_time), Date)
+    period_start = (day if granularity == "day"
+                    else cast(func.date_trunc("week", day), Date)).label("period_start")
+    time_of_day = func.coalesce(ChatSession.time_of_day, UNKNOWN_TIME_OF_DAY).label("time_of_day")
+    lower = datetime.combine(since, time.min, tzinfo=timezone.utc)
+    upper = datetime.combine(until, time.min, tzinfo=timezone.utc) + PERIOD_LENGTH[granularity]
+    return (
+        select(period_start, time_of_day,
+               func.count().label("sessions"),
+               func.count(ChatSession.mood_score).label("rated_sessions"),
+               func.coalesce(func.sum(ChatSession.mood_score), 0).label("mood_sum"),
+               func.count(ChatSession.duration).label("timed_sessions"),
+               func.coalesce(func.sum(ChatSession.duration), 0).label("duration_sum"))
+        .where(ChatSession.profile_id == profile_id,
+               ChatSession.end_time.is_not(None),
+               ChatSession.start_time >= lower,
+               ChatSession.start_time < upper)
+        .group_by(period_start, time_of_day)
+        .order_by(period_start, time_of_day)
+    )
+
+
+class RollupDatastore:
+    """Datastore layer for mood rollups - dashboard reads, plus rebuilds for backfills"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def mood_trend(self, profile_id: UUID, granularity: str, since: date, until: date) -> List[Row]:
+        """Rollup rows of a profile in a range of periods"""
+        return list(self.db.execute(mood_trend_statement(profile_id, granularity, since, until)))
+
+    def live_mood_trend(self, profile_id: UUID, granularity: str, since: date, until: date) -> List[Row]:
+        """The same rows aggregated from the sessions"""
+        return list(self.db.execute(live_mood_trend_statement(profile_id, granularity, since, until)))
+
+    def profile_ids_after(self, after: Optional[UUID], limit: int) -> List[UUID]:
+        """The next `limit` profile ids in id order"""
+        result = self.db.execute(PROFILE_BATCH_STATEMENT,
+                                 {"after": after or UUID(int=0), "limit": limit})
+        return [row[0] for row in result]
+
+    def rebuild(self, profile_ids: List[UUID]) -> int:
+        """Recompute the profiles' rollups from their sessions, in one transaction. Returns rows written."""
+        try:
+            params = {"profile_ids": profile_ids}
+            self.db.execute(LOCK_ROLLUPS_STATEMENT)
+            self.db.execute(DELETE_ROLLUPS_STATEMENT, params)
+            written = self.db.execute(REBUILD_ROLLUPS_STATEMENT, params).rowcount
+            self.db.commit()
+            return written
+        except Exception:
+            self.db.rollback()
+            raise
@@ -1,11 +1,59 @@
+from contextlib import asynccontextmanager
+import asyncio
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routes import profile_route
+from routes import profile_route, memory_route, chat_route, history_route, dashboard_route
 from core.config import settings
+from database.db import engine, get_pool_stats
+from database.partitions import maintain_chat_partitions
+from database.async_db import async_engine, async_replica_engines, monitor_replica_lag
+from database.routing import replica_router
+from database.instrumentation import QueryInstrumentationMiddleware
+from services.profile_cache import profile_cache
+from services.access_index import access_index
+from services.embedding_pipeline import embedding_pipeline
+from services.outbox_flusher import outbox_flusher
+from core.auth import token_cache, jwks_store
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load JWT signing keys before serving so verification never fetches them
+    await asyncio.to_thread(jwks_store.load)
+    if settings.CHAT_PARTITION_MAINTENANCE_ON_STARTUP:
+        # Make sure next months' chat_turns partitions exist before inserts need them
+        try:
+            await asyncio.to_thread(maintain_chat_partitions, engine)
+        except Exception as e:
+            logger.warning(f"chat_turns partition maintenance failed: {e}")
+    # Replica lag is measured in the background; reads use the primary until
+    # the first measurement arrives
+    lag_monitor = asyncio.create_task(monitor_replica_lag()) if replica_router.enabled else None
+    if settings.EMBEDDING_PIPELINE_ENABLED:
+        await embedding_pipeline.start()
+    if settings.OUTBOX_ENABLED:
+        # Replays segments left by a previous run before new ones are written
+        await outbox_flusher.start()
+    yield
+    if settings.OUTBOX_ENABLED:
+        await outbox_flusher.stop()
+    await embedding_pipeline.stop()
+    if lag_monitor is not None:
+        lag_monitor.cancel()
+        await asyncio.gather(lag_monitor, return_exceptions=True)
+    # Close pooled connections on shutdown
+    await async_engine.dispose()
+    for replica_engine in async_replica_engines:
+        await replica_engine.dispose()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -17,8 +65,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Track SQL statements per request
+app.add_middleware(QueryInstrumentationMiddleware)
+
 # Include routers
 app.include_router(profile_route.router)
+app.include_router(memory_route.router)
+app.include_router(chat_route.router)
+app.include_router(history_route.router)
+app.include_router(dashboard_route.router)
 
 
 @app.get("/")
@@ -29,3 +84,36 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/db")
+async def database_health():
+    """Connection pool gauges and checkout wait times for this worker"""
+    return {
+        "pool": get_pool_stats(),
+        "async_pool": get_pool_stats(async_engine.sync_engine),
+        "replicas": replica_router.status(),
+    }
+
+
+@app.get("/health/cache")
+async def cache_health():
+    """Hit, miss and eviction counters for this worker's caches"""
+    return {
+        "profile": profile_cache.stats(),
+        "access": access_index.stats(),
+        "jwt": token_cache.stats() if token_cache else {"enabled": False},
+        "jwks": jwks_store.status(),
+    }
+
+
+@app.get("/health/embeddings")
+async def embedding_health():
+    """Queue depth, batch sizes and throughput of this worker's embedding pipeline"""
+    return {"enabled": settings.EMBEDDING_PIPELINE_ENABLED, **embedding_pipeline.stats()}
+
+
+@app.get("/health/outbox")
+async def outbox_health():
+    """Write-behind outbox backlog and this worker's flush counters"""
+    return {"enabled": settings.OUTBOX_ENABLED, **outbox_flusher.stats()}
@@ -0,0 +1,72 @@
+"""add_half_precision_chat_turn_embeddings
+
+Revision ID: 1083006f8268
+Revises: 8682d852e8ed
+Create Date: 2026-10-18 21:03:55.268410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1083006f8268'
+down_revision: Union[str, None] = '8682d852e8ed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+HNSW_OPTIONS = "WITH (m = 16, ef_construction = 64)"
+
+# (parent index, partition index suffix, index method)
+INDEXES = [
+    ("ix_chat_turns_embedding_half_hnsw", "embedding_half_idx",
+     f"hnsw (embedding_half halfvec_cosine_ops) {HNSW_OPTIONS}"),
+    ("ix_chat_turns_embedding_binary_hnsw", "embedding_binary_idx",
+     f"hnsw ((binary_quantize(embedding_half)::bit(1536)) bit_hamming_ops) {HNSW_OPTIONS}"),
+]
+
+
+def upgrade() -> None:
+    """
+    Half-precision embeddings (pgvector >= 0.7) and the indexes for the
+    halfvec and binary storage modes.
+
+    The column starts empty and adding it doesn't rewrite chat_turns. Existing
+    rows are copied over with `python run.py embeddings backfill`. As in the
+    previous revision, the indexes are created ON ONLY the partitioned table
+    and each partition's index is built concurrently and attached.
+    """
+
+    op.execute("ALTER TABLE chat_turns ADD COLUMN IF NOT EXISTS embedding_half halfvec(1536)")
+
+    for name, _, method in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY chat_turns USING {method}")
+
+    partitions = op.get_bind().execute(sa.text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'chat_turns'::regclass
+        ORDER BY c.relname
+    """)).scalars().all()
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            for name, suffix, method in INDEXES:
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_{suffix} "
+                           f"ON {partition} USING {method}")
+                op.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition}_{suffix}")
+
+
+def downgrade() -> None:
+    """Restore compacted float32 embeddings, then drop the half-precision ones."""
+    op.execute("""
+        UPDATE chat_turns SET embedding = embedding_half::vector(1536)
+        WHERE embedding IS NULL AND embedding_half IS NOT NULL
+    """)
+    for name, _, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("ALTER TABLE chat_turns DROP COLUMN IF EXISTS embedding_half")
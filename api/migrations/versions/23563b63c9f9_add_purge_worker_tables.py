@@ -0,0 +1,64 @@
+"""add_purge_worker_tables
+
+Revision ID: 23563b63c9f9
+Revises: b9bfbed646a3
+Create Date: 2026-10-18 18:21:37.114862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '23563b63c9f9'
+down_revision: Union[str, None] = 'b9bfbed646a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Per-user chat retention and the purge worker's bookkeeping tables."""
+
+    # NULL keeps chat history until the global partition retention drops it
+    op.add_column('profiles', sa.Column('chat_retention_days', sa.Integer(), nullable=True))
+
+    op.create_table(
+        'purge_requests',
+        sa.Column('profile_id', sa.UUID(), nullable=False),
+        sa.Column('requested_at', sa.TIMESTAMP(timezone=True),
+                  server_default=sa.text('now()'), nullable=False),
+        sa.Column('completed_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('profile_id'),
+    )
+    op.create_index('ix_purge_requests_pending', 'purge_requests', ['requested_at'],
+                    postgresql_where=sa.text('completed_at IS NULL'))
+
+    # One row per (job, table): where the keyset scan got to, committed with
+    # each batch so an interrupted purge resumes where it stopped
+    op.create_table(
+        'purge_checkpoints',
+        sa.Column('job', sa.String(), nullable=False),
+        sa.Column('target', sa.String(), nullable=False),
+        sa.Column('cursor', postgresql.JSONB(), nullable=True),
+        sa.Column('rows_deleted', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('done', sa.Boolean(), server_default=sa.false(), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True),
+                  server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('job', 'target'),
+    )
+
+    # Worker bookkeeping only; no API role should read or write these
+    op.execute("ALTER TABLE purge_requests ENABLE ROW LEVEL SECURITY")
+    op.execute("ALTER TABLE purge_checkpoints ENABLE ROW LEVEL SECURITY")
+
+
+def downgrade() -> None:
+    """Drop the purge worker tables and per-user retention."""
+    op.drop_table('purge_checkpoints')
+    op.drop_index('ix_purge_requests_pending', table_name='purge_requests')
+    op.drop_table('purge_requests')
+    op.drop_column('profiles', 'chat_retention_days')
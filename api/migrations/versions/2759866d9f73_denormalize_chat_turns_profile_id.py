@@ -0,0 +1,193 @@
+"""denormalize_chat_turns_profile_id
+
+Revision ID: 2759866d9f73
+Revises: 58fd9c8332a9
+Create Date: 2026-10-18 13:47:05.902516
+
+"""
+from typing import Sequence, Union
+import time
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2759866d9f73'
+down_revision: Union[str, None] = '58fd9c8332a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows updated per backfill transaction
+BACKFILL_BATCH_SIZE = 5000
+
+UID = "(select auth.uid())"
+OWN_SESSION_IDS = f"SELECT s.id FROM sessions s WHERE s.profile_id = {UID}"
+
+# (policy name, command, new expression, expression it replaces)
+POLICIES = [
+    ("Users can view own chat turns", "SELECT",
+     f"profile_id = {UID}",
+     f"session_id IN ({OWN_SESSION_IDS})"),
+    # profile_id is filled in from the session by a BEFORE trigger, which runs
+    # before WITH CHECK, so this still only admits turns in the user's sessions
+    ("Users can insert own chat turns", "INSERT",
+     f"profile_id = {UID}",
+     f"session_id IN ({OWN_SESSION_IDS})"),
+    ("Caregivers can view managed chat turns", "SELECT",
+     f"profile_id IN (SELECT p.id FROM profiles p WHERE p.caregiver_id = {UID})",
+     f"""session_id IN (
+                SELECT s.id FROM sessions s
+                JOIN profiles p ON p.id = s.profile_id
+                WHERE p.caregiver_id = {UID}
+            )"""),
+]
+
+
+def _replace_policy(name: str, command: str, expression: str) -> None:
+    clause = "WITH CHECK" if command == "INSERT" else "USING"
+    op.execute(f'DROP POLICY IF EXISTS "{name}" ON chat_turns')
+    op.execute(f"""
+        CREATE POLICY "{name}" ON chat_turns
+        FOR {command} {clause} ({expression})
+    """)
+
+
+def _backfill_pass(connection) -> None:
+    """
+    Fill chat_turns.profile_id in one walk over the table in id order. Each
+    batch starts after the last id of the previous one (keyset pagination),
+    so it reads only its own rows instead of rescanning those already
+    filled. Rows another transaction has locked are skipped.
+    """
+    last_id = "00000000-0000-0000-0000-000000000000"
+    while True:
+        batch_end = connection.execute(sa.text("""
+            WITH batch AS (
+                SELECT id FROM chat_turns
+                WHERE id > CAST(:last_id AS uuid)
+                ORDER BY id
+                LIMIT :batch_size
+            ), claimed AS (
+                SELECT id FROM chat_turns
+                WHERE id IN (SELECT id FROM batch) AND profile_id IS NULL
+                FOR UPDATE SKIP LOCKED
+            ), updated AS (
+                UPDATE chat_turns ct SET profile_id = s.profile_id
+                FROM sessions s
+                WHERE s.id = ct.session_id AND ct.id IN (SELECT id FROM claimed)
+            )
+            SELECT id FROM batch ORDER BY id DESC LIMIT 1
+        """), {"last_id": last_id, "batch_size": BACKFILL_BATCH_SIZE}).scalar()
+        if batch_end is None:
+            return
+        last_id = str(batch_end)
+
+
+def upgrade() -> None:
+    """Copy sessions.profile_id onto chat_turns and check it directly in RLS."""
+
+    op.add_column('chat_turns', sa.Column('profile_id', sa.UUID(), nullable=True))
+
+    # Keep chat_turns.profile_id in sync with the turn's session. SECURITY
+    # DEFINER so the lookup isn't itself filtered by RLS.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION public.chat_turns_set_profile_id()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        SECURITY DEFINER SET search_path = public
+        AS $$
+        BEGIN
+            SELECT s.profile_id INTO NEW.profile_id
+            FROM sessions s WHERE s.id = NEW.session_id;
+            RETURN NEW;
+        END;
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER chat_turns_set_profile_id
+        BEFORE INSERT OR UPDATE OF session_id, profile_id ON chat_turns
+        FOR EACH ROW EXECUTE FUNCTION public.chat_turns_set_profile_id()
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION public.sessions_sync_chat_turns_profile_id()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        SECURITY DEFINER SET search_path = public
+        AS $$
+        BEGIN
+            UPDATE chat_turns SET profile_id = NEW.profile_id
+            WHERE session_id = NEW.id;
+            RETURN NULL;
+        END;
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER sessions_sync_chat_turns_profile_id
+        AFTER UPDATE OF profile_id ON sessions
+        FOR EACH ROW WHEN (OLD.profile_id IS DISTINCT FROM NEW.profile_id)
+        EXECUTE FUNCTION public.sessions_sync_chat_turns_profile_id()
+    """)
+
+    # Backfill existing rows in small committed batches so no transaction
+    # holds row locks on a large part of the table
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        while True:
+            _backfill_pass(connection)
+            # Rows locked by concurrent writers were skipped; walk again until
+            # every turn whose session has a profile has it
+            remaining = connection.execute(sa.text("""
+                SELECT EXISTS (
+                    SELECT 1 FROM chat_turns ct JOIN sessions s ON s.id = ct.session_id
+                    WHERE ct.profile_id IS NULL AND s.profile_id IS NOT NULL
+                )
+            """)).scalar()
+            if not remaining:
+                break
+            time.sleep(1)
+
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chat_turns_profile_id_timestamp "
+            "ON chat_turns (profile_id, timestamp)")
+
+    # A validated CHECK lets SET NOT NULL skip its full-table scan under an
+    # exclusive lock. VALIDATE only takes a SHARE UPDATE EXCLUSIVE lock, but
+    # each ADD takes a stronger one that is held until its transaction ends,
+    # so every VALIDATE runs in its own transaction after the ADD commits.
+    op.execute("""
+        ALTER TABLE chat_turns ADD CONSTRAINT chat_turns_profile_id_not_null
+        CHECK (profile_id IS NOT NULL) NOT VALID
+    """)
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE chat_turns VALIDATE CONSTRAINT chat_turns_profile_id_not_null")
+    op.alter_column('chat_turns', 'profile_id', nullable=False)
+    op.drop_constraint('chat_turns_profile_id_not_null', 'chat_turns', type_='check')
+    op.execute("""
+        ALTER TABLE chat_turns ADD CONSTRAINT chat_turns_profile_id_fkey
+        FOREIGN KEY (profile_id) REFERENCES profiles (id) NOT VALID
+    """)
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE chat_turns VALIDATE CONSTRAINT chat_turns_profile_id_fkey")
+
+    for name, command, expression, _ in POLICIES:
+        _replace_policy(name, command, expression)
+
+
+def downgrade() -> None:
+    """Restore the session-based chat turn policies and drop profile_id."""
+
+    for name, command, _, expression in POLICIES:
+        _replace_policy(name, command, expression)
+
+    op.execute("DROP TRIGGER IF EXISTS sessions_sync_chat_turns_profile_id ON sessions")
+    op.execute("DROP FUNCTION IF EXISTS public.sessions_sync_chat_turns_profile_id()")
+    op.execute("DROP TRIGGER IF EXISTS chat_turns_set_profile_id ON chat_turns")
+    op.execute("DROP FUNCTION IF EXISTS public.chat_turns_set_profile_id()")
+
+    op.drop_constraint('chat_turns_profile_id_fkey', 'chat_turns', type_='foreignkey')
+    op.execute("DROP INDEX IF EXISTS ix_chat_turns_profile_id_timestamp")
+    op.drop_column('chat_turns', 'profile_id')
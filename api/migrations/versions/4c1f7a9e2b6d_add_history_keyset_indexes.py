@@ -0,0 +1,59 @@
+"""add_history_keyset_indexes
+
+Revision ID: 4c1f7a9e2b6d
+Revises: e5da5e4ea998
+Create Date: 2026-10-18 23:05:12.418806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1f7a9e2b6d'
+down_revision: Union[str, None] = 'e5da5e4ea998'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SESSIONS_INDEX = "ix_sessions_profile_id_start_time_id"
+CHAT_TURNS_INDEX = "ix_chat_turns_session_id_timestamp_id"
+CHAT_TURNS_INDEX_METHOD = "btree (session_id, timestamp, id)"
+
+
+def upgrade() -> None:
+    """
+    Indexes matching the history keysets, so every page is one index range
+    scan however deep it is: a profile's sessions by (start_time, id) and a
+    session's turns by (timestamp, id). chat_turns is partitioned, so its
+    index is built per partition and attached, as in the HNSW revisions.
+    """
+
+    op.execute(f"CREATE INDEX IF NOT EXISTS {CHAT_TURNS_INDEX} ON ONLY chat_turns "
+               f"USING {CHAT_TURNS_INDEX_METHOD}")
+
+    partitions = op.get_bind().execute(sa.text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'chat_turns'::regclass
+        ORDER BY c.relname
+    """)).scalars().all()
+
+    # Build indexes without blocking writes; CONCURRENTLY can't run in a transaction
+    with op.get_context().autocommit_block():
+        op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {SESSIONS_INDEX} "
+                   "ON sessions (profile_id, start_time, id)")
+        for partition in partitions:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_session_keyset_idx "
+                       f"ON {partition} USING {CHAT_TURNS_INDEX_METHOD}")
+            op.execute(f"ALTER INDEX {CHAT_TURNS_INDEX} ATTACH PARTITION {partition}_session_keyset_idx")
+
+
+def downgrade() -> None:
+    """Drop the history keyset indexes."""
+    op.execute(f"DROP INDEX IF EXISTS {CHAT_TURNS_INDEX}")
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {SESSIONS_INDEX}")
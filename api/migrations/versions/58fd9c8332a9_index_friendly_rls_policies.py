@@ -0,0 +1,186 @@
+"""index_friendly_rls_policies
+
+Revision ID: 58fd9c8332a9
+Revises: 898257c9a6e7
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '58fd9c8332a9'
+down_revision: Union[str, None] = '898257c9a6e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Foreign key columns used by the policies (and by joins) that had no index
+FOREIGN_KEY_INDEXES = [
+    ("sessions", "profile_id"),
+    ("chat_turns", "session_id"),
+    ("profiles", "caregiver_id"),
+    ("notes", "session_id"),
+    ("session_activities", "session_id"),
+    ("session_topics", "session_id"),
+    ("medications", "profile_id"),
+    ("medication_reminders", "medication_id"),
+]
+
+# The policies compare the uuid columns directly with (select auth.uid()).
+# Without the ::text casts the column's index can be used, and wrapping the
+# function in a sub-select makes Postgres evaluate it once per statement
+# (an InitPlan) instead of once per row. Caregiver and child-table checks use
+# uncorrelated IN (...) sub-selects, which are also evaluated once.
+UID = "(select auth.uid())"
+ROLE = "(select auth.role())"
+
+OWN_SESSION_IDS = f"SELECT s.id FROM sessions s WHERE s.profile_id = {UID}"
+MANAGED_PROFILE_IDS = f"SELECT p.id FROM profiles p WHERE p.caregiver_id = {UID}"
+
+OLD_OWN_SESSION = """EXISTS (
+                SELECT 1 FROM sessions s
+                WHERE s.id = {table}.session_id
+                AND auth.uid()::text = s.profile_id::text
+            )"""
+OLD_MANAGED_PROFILE = """EXISTS (
+                SELECT 1 FROM profiles p
+                JOIN caregivers c ON p.caregiver_id = c.id
+                WHERE p.id = {table}.profile_id
+                AND auth.uid()::text = c.id::text
+            )"""
+OLD_OWN_MEDICATION = """EXISTS (
+                SELECT 1 FROM medications m
+                WHERE m.id = medication_reminders.medication_id
+                AND auth.uid()::text = m.profile_id::text
+            )"""
+
+# (table, policy name, command, new expression, expression it replaces)
+POLICIES = [
+    ("profiles", "Users can view own profile", "SELECT",
+     f"id = {UID}", "auth.uid()::text = id::text"),
+    ("profiles", "Users can update own profile", "UPDATE",
+     f"id = {UID}", "auth.uid()::text = id::text"),
+    ("profiles", "Users can insert own profile", "INSERT",
+     f"id = {UID}", "auth.uid()::text = id::text"),
+    ("profiles", "Caregivers can view managed profiles", "SELECT",
+     f"caregiver_id = {UID}",
+     """EXISTS (
+                SELECT 1 FROM caregivers c
+                WHERE c.id = profiles.caregiver_id
+                AND auth.uid()::text = c.id::text
+            )"""),
+
+    ("caregivers", "Caregivers can view own data", "SELECT",
+     f"id = {UID}", "auth.uid()::text = id::text"),
+    ("caregivers", "Caregivers can update own data", "UPDATE",
+     f"id = {UID}", "auth.uid()::text = id::text"),
+    ("caregivers", "Caregivers can insert own data", "INSERT",
+     f"id = {UID}", "auth.uid()::text = id::text"),
+
+    ("sessions", "Users can view own sessions", "SELECT",
+     f"profile_id = {UID}", "auth.uid()::text = profile_id::text"),
+    ("sessions", "Users can insert own sessions", "INSERT",
+     f"profile_id = {UID}", "auth.uid()::text = profile_id::text"),
+    ("sessions", "Users can update own sessions", "UPDATE",
+     f"profile_id = {UID}", "auth.uid()::text = profile_id::text"),
+    ("sessions", "Caregivers can view managed sessions", "SELECT",
+     f"profile_id IN ({MANAGED_PROFILE_IDS})",
+     OLD_MANAGED_PROFILE.format(table="sessions")),
+
+    ("chat_turns", "Users can view own chat turns", "SELECT",
+     f"session_id IN ({OWN_SESSION_IDS})", OLD_OWN_SESSION.format(table="chat_turns")),
+    ("chat_turns", "Users can insert own chat turns", "INSERT",
+     f"session_id IN ({OWN_SESSION_IDS})", OLD_OWN_SESSION.format(table="chat_turns")),
+    ("chat_turns", "Caregivers can view managed chat turns", "SELECT",
+     f"""session_id IN (
+                SELECT s.id FROM sessions s
+                JOIN profiles p ON p.id = s.profile_id
+                WHERE p.caregiver_id = {UID}
+            )""",
+     """EXISTS (
+                SELECT 1 FROM sessions s
+                JOIN profiles p ON s.profile_id = p.id
+                JOIN caregivers c ON p.caregiver_id = c.id
+                WHERE s.id = chat_turns.session_id
+                AND auth.uid()::text = c.id::text
+            )"""),
+
+    ("medications", "Users can view own medications", "SELECT",
+     f"profile_id = {UID}", "auth.uid()::text = profile_id::text"),
+    ("medications", "Users can manage own medications", "ALL",
+     f"profile_id = {UID}", "auth.uid()::text = profile_id::text"),
+    ("medications", "Caregivers can view managed medications", "SELECT",
+     f"profile_id IN ({MANAGED_PROFILE_IDS})",
+     OLD_MANAGED_PROFILE.format(table="medications")),
+
+    ("medication_reminders", "Users can view own medication reminders", "SELECT",
+     f"medication_id IN (SELECT m.id FROM medications m WHERE m.profile_id = {UID})",
+     OLD_OWN_MEDICATION),
+    ("medication_reminders", "Users can manage own medication reminders", "ALL",
+     f"medication_id IN (SELECT m.id FROM medications m WHERE m.profile_id = {UID})",
+     OLD_OWN_MEDICATION),
+
+    ("notes", "Users can view own notes", "SELECT",
+     f"session_id IN ({OWN_SESSION_IDS})", OLD_OWN_SESSION.format(table="notes")),
+    ("notes", "Users can manage own notes", "ALL",
+     f"session_id IN ({OWN_SESSION_IDS})", OLD_OWN_SESSION.format(table="notes")),
+
+    ("session_activities", "Users can view own session activities", "SELECT",
+     f"session_id IN ({OWN_SESSION_IDS})", OLD_OWN_SESSION.format(table="session_activities")),
+    ("session_activities", "Users can manage own session activities", "ALL",
+     f"session_id IN ({OWN_SESSION_IDS})", OLD_OWN_SESSION.format(table="session_activities")),
+
+    ("session_topics", "Users can view own session topics", "SELECT",
+     f"session_id IN ({OWN_SESSION_IDS})", OLD_OWN_SESSION.format(table="session_topics")),
+    ("session_topics", "Users can manage own session topics", "ALL",
+     f"session_id IN ({OWN_SESSION_IDS})", OLD_OWN_SESSION.format(table="session_topics")),
+
+    ("activities", "Authenticated users can view activities", "SELECT",
+     f"{ROLE} = 'authenticated'", "auth.role() = 'authenticated'"),
+    ("topics", "Authenticated users can view topics", "SELECT",
+     f"{ROLE} = 'authenticated'", "auth.role() = 'authenticated'"),
+] + [
+    (table, "Service role bypass", "ALL",
+     f"{ROLE} = 'service_role'", "auth.role() = 'service_role'")
+    for table in ("profiles", "caregivers", "sessions", "chat_turns", "medications",
+                  "medication_reminders", "notes", "session_activities",
+                  "session_topics", "activities", "topics")
+]
+
+
+def _replace_policy(table: str, name: str, command: str, expression: str) -> None:
+    clause = "WITH CHECK" if command == "INSERT" else "USING"
+    op.execute(f'DROP POLICY IF EXISTS "{name}" ON {table}')
+    op.execute(f"""
+        CREATE POLICY "{name}" ON {table}
+        FOR {command} {clause} ({expression})
+    """)
+
+
+def upgrade() -> None:
+    """Add foreign key indexes and rewrite the RLS policies to use them."""
+
+    # Build indexes without blocking writes; CONCURRENTLY can't run in a transaction
+    with op.get_context().autocommit_block():
+        for table, column in FOREIGN_KEY_INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{column} ON {table} ({column})")
+
+    for table, name, command, expression, _ in POLICIES:
+        _replace_policy(table, name, command, expression)
+
+
+def downgrade() -> None:
+    """Restore the original policies and drop the foreign key indexes."""
+
+    for table, name, command, _, expression in POLICIES:
+        _replace_policy(table, name, command, expression)
+
+    with op.get_context().autocommit_block():
+        for table, column in FOREIGN_KEY_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_{column}")
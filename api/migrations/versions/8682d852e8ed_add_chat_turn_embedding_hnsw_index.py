@@ -0,0 +1,55 @@
+"""add_chat_turn_embedding_hnsw_index
+
+Revision ID: 8682d852e8ed
+Revises: 23563b63c9f9
+Create Date: 2026-10-18 19:42:08.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8682d852e8ed'
+down_revision: Union[str, None] = '23563b63c9f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = "ix_chat_turns_embedding_hnsw"
+# pgvector's defaults; recall is tuned per query with hnsw.ef_search
+INDEX_METHOD = "hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+
+
+def upgrade() -> None:
+    """
+    HNSW index on chat_turns.embedding for memory recall.
+
+    chat_turns is partitioned, and CREATE INDEX CONCURRENTLY doesn't work on a
+    partitioned table. So the parent index is created ON ONLY chat_turns
+    (which builds nothing), then each partition's index is built concurrently
+    and attached. Partitions created later get the index automatically.
+    """
+
+    op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON ONLY chat_turns USING {INDEX_METHOD}")
+
+    partitions = op.get_bind().execute(sa.text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'chat_turns'::regclass
+        ORDER BY c.relname
+    """)).scalars().all()
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_embedding_idx "
+                       f"ON {partition} USING {INDEX_METHOD}")
+            op.execute(f"ALTER INDEX {INDEX_NAME} ATTACH PARTITION {partition}_embedding_idx")
+
+
+def downgrade() -> None:
+    """Drop the HNSW index (and its partition indexes)."""
+    op.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
@@ -0,0 +1,169 @@
+"""add_mood_rollups
+
+Revision ID: 9d3b6e2f81a4
+Revises: 4c1f7a9e2b6d
+Create Date: 2026-10-18 23:48:31.207145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3b6e2f81a4'
+down_revision: Union[str, None] = '4c1f7a9e2b6d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+UID = "(select auth.uid())"
+ROLE = "(select auth.role())"
+
+# (policy name, expression)
+POLICIES = [
+    ("Users can view own mood rollups", f"profile_id = {UID}"),
+    ("Caregivers can view managed mood rollups",
+     f"profile_id IN (SELECT p.id FROM profiles p WHERE p.caregiver_id = {UID})"),
+    ("Service role bypass", f"{ROLE} = 'service_role'"),
+]
+
+
+def upgrade() -> None:
+    """
+    Per profile, per day and per week mood rollups of closed sessions, kept
+    current by a trigger on sessions so the caregiver dashboard reads a
+    handful of rows instead of aggregating a profile's whole history.
+    """
+
+    # One row per (profile, day or week, time of day); averages are derived
+    # from the sums so a row can be adjusted by adding and subtracting
+    op.create_table(
+        'mood_rollups',
+        sa.Column('profile_id', sa.UUID(), nullable=False),
+        sa.Column('granularity', sa.String(), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('time_of_day', sa.String(), nullable=False),
+        sa.Column('sessions', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('rated_sessions', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('mood_sum', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('timed_sessions', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('duration_sum', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True),
+                  server_default=sa.text('now()'), nullable=False),
+        sa.CheckConstraint("granularity IN ('day', 'week')", name='mood_rollups_granularity_check'),
+        sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('profile_id', 'granularity', 'period_start', 'time_of_day'),
+    )
+
+    # Add (delta = 1) or remove (delta = -1) one closed session's contribution
+    # to its day and week. Periods are UTC calendar days and ISO weeks.
+    # SECURITY DEFINER so the write isn't filtered by RLS on mood_rollups.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION public.mood_rollups_apply(s sessions, delta integer)
+        RETURNS void
+        LANGUAGE plpgsql
+        SECURITY DEFINER SET search_path = public
+        AS $$
+        DECLARE
+            session_day date := (s.start_time AT TIME ZONE 'UTC')::date;
+            session_time_of_day text := coalesce(s.time_of_day, 'Unknown');
+        BEGIN
+            INSERT INTO mood_rollups AS r (
+                profile_id, granularity, period_start, time_of_day, sessions,
+                rated_sessions, mood_sum, timed_sessions, duration_sum)
+            SELECT s.profile_id, g.granularity, g.period_start, session_time_of_day, delta,
+                   delta * (s.mood_score IS NOT NULL)::integer, delta * coalesce(s.mood_score, 0),
+                   delta * (s.duration IS NOT NULL)::integer, delta * coalesce(s.duration, 0)
+            FROM (VALUES ('day', session_day),
+                         ('week', date_trunc('week', session_day)::date)) g (granularity, period_start)
+            ON CONFLICT (profile_id, granularity, period_start, time_of_day) DO UPDATE SET
+                sessions = r.sessions + EXCLUDED.sessions,
+                rated_sessions = r.rated_sessions + EXCLUDED.rated_sessions,
+                mood_sum = r.mood_sum + EXCLUDED.mood_sum,
+                timed_sessions = r.timed_sessions + EXCLUDED.timed_sessions,
+                duration_sum = r.duration_sum + EXCLUDED.duration_sum,
+                updated_at = now();
+
+            IF delta < 0 THEN
+                DELETE FROM mood_rollups
+                WHERE profile_id = s.profile_id AND time_of_day = session_time_of_day
+                AND (granularity, period_start) IN (
+                    ('day', session_day), ('week', date_trunc('week', session_day)::date))
+                AND sessions <= 0;
+            END IF;
+        END;
+        $$
+    """)
+
+    # A session counts once it is closed (end_time set). Any later change to
+    # a counted column moves its contribution: out of the old row, into the new.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION public.sessions_maintain_mood_rollups()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        SECURITY DEFINER SET search_path = public
+        AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE'
+               AND (OLD.profile_id, OLD.start_time, OLD.end_time IS NULL, OLD.duration,
+                    OLD.mood_score, OLD.time_of_day)
+                   IS NOT DISTINCT FROM
+                   (NEW.profile_id, NEW.start_time, NEW.end_time IS NULL, NEW.duration,
+                    NEW.mood_score, NEW.time_of_day) THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.end_time IS NOT NULL THEN
+                PERFORM mood_rollups_apply(OLD, -1);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.end_time IS NOT NULL THEN
+                PERFORM mood_rollups_apply(NEW, 1);
+            END IF;
+            RETURN NULL;
+        END;
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER sessions_maintain_mood_rollups
+        AFTER INSERT OR DELETE
+        OR UPDATE OF profile_id, start_time, end_time, duration, mood_score, time_of_day
+        ON sessions
+        FOR EACH ROW EXECUTE FUNCTION public.sessions_maintain_mood_rollups()
+    """)
+
+    # Backfill from the closed sessions already there. CREATE TRIGGER holds a
+    # lock that blocks session writes until this transaction commits, so no
+    # session change lands between the backfill's snapshot and the trigger
+    # taking over. `python run.py rollups rebuild` recomputes the same rows.
+    op.execute("""
+        INSERT INTO mood_rollups (
+            profile_id, granularity, period_start, time_of_day, sessions,
+            rated_sessions, mood_sum, timed_sessions, duration_sum)
+        SELECT s.profile_id, g.granularity, g.period_start,
+               coalesce(s.time_of_day, 'Unknown'), count(*), count(s.mood_score),
+               coalesce(sum(s.mood_score), 0), count(s.duration), coalesce(sum(s.duration), 0)
+        FROM sessions s
+        CROSS JOIN LATERAL (VALUES
+            ('day', (s.start_time AT TIME ZONE 'UTC')::date),
+            ('week', date_trunc('week', (s.start_time AT TIME ZONE 'UTC')::date)::date)
+        ) g (granularity, period_start)
+        WHERE s.end_time IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    """)
+
+    op.execute("ALTER TABLE mood_rollups ENABLE ROW LEVEL SECURITY")
+    for name, expression in POLICIES:
+        op.execute(f"""
+            CREATE POLICY "{name}" ON mood_rollups
+            FOR {"ALL" if name == "Service role bypass" else "SELECT"} USING ({expression})
+        """)
+
+
+def downgrade() -> None:
+    """Drop the mood rollups and the trigger that maintains them."""
+    op.execute("DROP TRIGGER IF EXISTS sessions_maintain_mood_rollups ON sessions")
+    op.execute("DROP FUNCTION IF EXISTS public.sessions_maintain_mood_rollups()")
+    op.execute("DROP FUNCTION IF EXISTS public.mood_rollups_apply(sessions, integer)")
+    op.drop_table('mood_rollups')
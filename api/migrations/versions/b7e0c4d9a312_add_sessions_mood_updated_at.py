@@ -0,0 +1,30 @@
+"""add_sessions_mood_updated_at
+
+Revision ID: b7e0c4d9a312
+Revises: 9d3b6e2f81a4
+Create Date: 2026-10-19 10:12:44.530217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e0c4d9a312'
+down_revision: Union[str, None] = '9d3b6e2f81a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """When the current mood was received, so a replayed older mood can't overwrite it."""
+    # Nullable with no default: a metadata-only change, no table rewrite
+    op.add_column('sessions', sa.Column('mood_updated_at', sa.TIMESTAMP(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop sessions.mood_updated_at."""
+    op.drop_column('sessions', 'mood_updated_at')
@@ -0,0 +1,131 @@
+"""partition_chat_turns_by_month
+
+Revision ID: b9bfbed646a3
+Revises: 2759866d9f73
+Create Date: 2026-10-18 16:05:22.740193
+
+"""
+from typing import Sequence, Union
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9bfbed646a3'
+down_revision: Union[str, None] = '2759866d9f73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Partitions created beyond the current month; the app keeps this many ahead
+MONTHS_AHEAD = 3
+
+UID = "(select auth.uid())"
+
+# Policies on chat_turns as of the previous revision: (name, command, expression)
+POLICIES = [
+    ("Users can view own chat turns", "SELECT", f"profile_id = {UID}"),
+    ("Users can insert own chat turns", "INSERT", f"profile_id = {UID}"),
+    ("Caregivers can view managed chat turns", "SELECT",
+     f"profile_id IN (SELECT p.id FROM profiles p WHERE p.caregiver_id = {UID})"),
+    ("Service role bypass", "ALL", "(select auth.role()) = 'service_role'"),
+]
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_monthly_partitions(table: str, first_month: date, last_month: date) -> None:
+    month = first_month
+    while month <= last_month:
+        name = f"chat_turns_p{month:%Y_%m}"
+        end = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {name} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{end} 00:00:00+00')")
+        # Only readable through the parent table, where the policies apply
+        op.execute(f"ALTER TABLE {name} ENABLE ROW LEVEL SECURITY")
+        month = end
+
+
+def _create_dependents(primary_key: str) -> None:
+    """Keys, indexes, trigger and RLS for a freshly swapped-in chat_turns table."""
+    op.execute(f"ALTER TABLE chat_turns ADD CONSTRAINT chat_turns_pkey PRIMARY KEY ({primary_key})")
+    op.execute("CREATE INDEX ix_chat_turns_session_id ON chat_turns (session_id)")
+    op.execute("CREATE INDEX ix_chat_turns_profile_id_timestamp ON chat_turns (profile_id, timestamp)")
+    op.execute("""
+        ALTER TABLE chat_turns ADD CONSTRAINT chat_turns_session_id_fkey
+        FOREIGN KEY (session_id) REFERENCES sessions (id)
+    """)
+    op.execute("""
+        ALTER TABLE chat_turns ADD CONSTRAINT chat_turns_profile_id_fkey
+        FOREIGN KEY (profile_id) REFERENCES profiles (id)
+    """)
+    op.execute("""
+        CREATE TRIGGER chat_turns_set_profile_id
+        BEFORE INSERT OR UPDATE OF session_id, profile_id ON chat_turns
+        FOR EACH ROW EXECUTE FUNCTION public.chat_turns_set_profile_id()
+    """)
+
+    op.execute("ALTER TABLE chat_turns ENABLE ROW LEVEL SECURITY")
+    for name, command, expression in POLICIES:
+        clause = "WITH CHECK" if command == "INSERT" else "USING"
+        op.execute(f"""
+            CREATE POLICY "{name}" ON chat_turns
+            FOR {command} {clause} ({expression})
+        """)
+
+
+def upgrade() -> None:
+    """
+    Rebuild chat_turns as a table range-partitioned by month on timestamp.
+    Rows are copied in one transaction, so run this while chat writes are paused.
+    """
+
+    op.execute("""
+        CREATE TABLE chat_turns_partitioned (
+            LIKE chat_turns INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS
+        ) PARTITION BY RANGE (timestamp)
+    """)
+
+    connection = op.get_bind()
+    oldest, newest = connection.execute(
+        sa.text("SELECT min(timestamp), max(timestamp) FROM chat_turns")).one()
+    current_month = _month_start(datetime.now(timezone.utc).date())
+    first_month, last_month = current_month, _add_months(current_month, MONTHS_AHEAD)
+    if oldest is not None:
+        first_month = min(first_month, _month_start(oldest.astimezone(timezone.utc).date()))
+        last_month = max(last_month, _month_start(newest.astimezone(timezone.utc).date()))
+    _create_monthly_partitions("chat_turns_partitioned", first_month, last_month)
+
+    op.execute("INSERT INTO chat_turns_partitioned SELECT * FROM chat_turns")
+    op.execute("DROP TABLE chat_turns")
+    op.execute("ALTER TABLE chat_turns_partitioned RENAME TO chat_turns")
+
+    # The partition key has to be part of the primary key
+    _create_dependents("id, timestamp")
+
+
+def downgrade() -> None:
+    """Copy chat_turns back into a single unpartitioned table."""
+
+    op.execute("""
+        CREATE TABLE chat_turns_unpartitioned (
+            LIKE chat_turns INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS
+        )
+    """)
+    op.execute("INSERT INTO chat_turns_unpartitioned SELECT * FROM chat_turns")
+    # Drops every partition with it
+    op.execute("DROP TABLE chat_turns")
+    op.execute("ALTER TABLE chat_turns_unpartitioned RENAME TO chat_turns")
+
+    _create_dependents("id")
@@ -0,0 +1,38 @@
+"""add_chat_turns_default_partition
+
+Revision ID: c3f8a1e5b720
+Revises: b7e0c4d9a312
+Create Date: 2026-10-19 10:41:09.882154
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8a1e5b720'
+down_revision: Union[str, None] = 'b7e0c4d9a312'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    A DEFAULT partition for chat_turns, so a turn outside every monthly
+    partition is stored instead of failing (and, from the outbox, being set
+    aside). Ingestion rejects such timestamps, so it should stay empty;
+    `python run.py partitions list` reports it if not. Indexes on the
+    parent are created on it automatically.
+    """
+    op.execute("CREATE TABLE IF NOT EXISTS chat_turns_default PARTITION OF chat_turns DEFAULT")
+    # As for the monthly partitions: only readable through the parent's policies
+    op.execute("ALTER TABLE chat_turns_default ENABLE ROW LEVEL SECURITY")
+
+
+def downgrade() -> None:
+    """Drop the DEFAULT partition (and any rows in it)."""
+    op.execute("ALTER TABLE chat_turns DETACH PARTITION chat_turns_default")
+    op.execute("DROP TABLE chat_turns_default")
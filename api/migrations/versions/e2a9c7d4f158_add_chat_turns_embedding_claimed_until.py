@@ -0,0 +1,30 @@
+"""add_chat_turns_embedding_claimed_until
+
+Revision ID: e2a9c7d4f158
+Revises: c3f8a1e5b720
+Create Date: 2026-10-19 15:02:18.664103
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9c7d4f158'
+down_revision: Union[str, None] = 'c3f8a1e5b720'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Lease on a chat turn claimed by an embedding sweep, so concurrent sweeps don't queue it twice."""
+    # Nullable with no default: a metadata-only change on every partition, no table rewrite
+    op.add_column('chat_turns', sa.Column('embedding_claimed_until', sa.TIMESTAMP(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop chat_turns.embedding_claimed_until."""
+    op.drop_column('chat_turns', 'embedding_claimed_until')
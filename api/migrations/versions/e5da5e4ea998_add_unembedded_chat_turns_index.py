@@ -0,0 +1,52 @@
+"""add_unembedded_chat_turns_index
+
+Revision ID: e5da5e4ea998
+Revises: 1083006f8268
+Create Date: 2026-10-18 22:17:40.912635
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5da5e4ea998'
+down_revision: Union[str, None] = '1083006f8268'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = "ix_chat_turns_unembedded"
+INDEX_METHOD = "btree (timestamp) WHERE embedding IS NULL AND embedding_half IS NULL"
+
+
+def upgrade() -> None:
+    """
+    Partial index over chat turns that have no embedding yet, for the
+    embedding pipeline's sweep. It only holds turns waiting to be embedded,
+    so it stays small. Built per partition and attached, as in the HNSW
+    revisions.
+    """
+
+    op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON ONLY chat_turns USING {INDEX_METHOD}")
+
+    partitions = op.get_bind().execute(sa.text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'chat_turns'::regclass
+        ORDER BY c.relname
+    """)).scalars().all()
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_unembedded_idx "
+                       f"ON {partition} USING {INDEX_METHOD}")
+            op.execute(f"ALTER INDEX {INDEX_NAME} ATTACH PARTITION {partition}_unembedded_idx")
+
+
+def downgrade() -> None:
+    """Drop the partial index (and its partition indexes)."""
+    op.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
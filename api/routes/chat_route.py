@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.async_db import get_async_db
+from core.auth import get_current_user, User
+from controllers.chat_controller import ChatController
+from schemas.chat import (
+    ChatTurnBatch, ChatTurnBatchResponse, ActivityResultCreate, ActivityResultResponse,
+    MoodUpdate, MoodResponse)
+from uuid import UUID
+
+router = APIRouter(prefix="/chat", tags=["chat"])
+
+
+@router.post("/sessions/{session_id}/turns", response_model=ChatTurnBatchResponse,
+             status_code=status.HTTP_201_CREATED)
+async def ingest_chat_turns(
+    session_id: UUID,
+    batch: ChatTurnBatch,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Add a batch of turns to a session, written in timestamp order (202 when queued in the outbox)"""
+    controller = ChatController(db)
+    user_id = UUID(current_user.id)
+    result = await controller.ingest_turns(user_id, session_id, batch)
+    if result.queued:
+        response.status_code = status.HTTP_202_ACCEPTED
+    return result
+
+
+@router.post("/sessions/{session_id}/activities", response_model=ActivityResultResponse,
+             status_code=status.HTTP_201_CREATED)
+async def record_activity_result(
+    session_id: UUID,
+    activity_result: ActivityResultCreate,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Save an activity result for a session (202 when queued in the outbox)"""
+    controller = ChatController(db)
+    user_id = UUID(current_user.id)
+    result = await controller.record_activity(user_id, session_id, activity_result)
+    if result.queued:
+        response.status_code = status.HTTP_202_ACCEPTED
+    return result
+
+
+@router.put("/sessions/{session_id}/mood", response_model=MoodResponse)
+async def update_session_mood(
+    session_id: UUID,
+    mood: MoodUpdate,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Set a session's mood score and notes (202 when queued in the outbox)"""
+    controller = ChatController(db)
+    user_id = UUID(current_user.id)
+    result = await controller.update_mood(user_id, session_id, mood)
+    if result.queued:
+        response.status_code = status.HTTP_202_ACCEPTED
+    return result
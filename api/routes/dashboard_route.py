@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.auth import get_current_user, get_async_read_db, User
+from controllers.dashboard_controller import DashboardController
+from schemas.dashboard import MoodTrend
+from uuid import UUID
+from typing import Optional
+from datetime import date
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("/profiles/{profile_id}/mood", response_model=MoodTrend)
+async def get_mood_trend(
+    profile_id: UUID,
+    granularity: str = "day",
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """A profile's mood per `day` or `week` from the rollups (the last 30 days or 12 weeks by default)"""
+    controller = DashboardController(db)
+    user_id = UUID(current_user.id)
+    return await controller.mood_trend(user_id, profile_id, granularity, since, until)
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.auth import get_current_user, get_async_read_db, User
+from controllers.history_controller import HistoryController
+from schemas.history import SessionPage, TurnPage
+from uuid import UUID
+from typing import Optional
+
+router = APIRouter(prefix="/history", tags=["history"])
+
+
+@router.get("/profiles/{profile_id}/sessions", response_model=SessionPage)
+async def list_sessions(
+    profile_id: UUID,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """A profile's sessions, newest first; pass `next_cursor` back as `cursor` for older ones"""
+    controller = HistoryController(db)
+    user_id = UUID(current_user.id)
+    return await controller.list_sessions(user_id, profile_id, limit, cursor)
+
+
+@router.get("/sessions/{session_id}/turns", response_model=TurnPage)
+async def list_turns(
+    session_id: UUID,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """A session's turns in time order; pass `next_cursor` back as `cursor` for later ones"""
+    controller = HistoryController(db)
+    user_id = UUID(current_user.id)
+    return await controller.list_turns(user_id, session_id, limit, cursor)
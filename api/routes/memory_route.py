@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.auth import get_current_user, get_async_read_db, User
+from controllers.memory_controller import MemoryController
+from schemas.memory import RecallRequest, RecallResponse
+from uuid import UUID
+
+router = APIRouter(prefix="/memory", tags=["memory"])
+
+
+@router.post("/recall", response_model=RecallResponse)
+async def recall_memories(
+    recall_request: RecallRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Top-k past chat turns of a profile most similar to the given embedding"""
+    controller = MemoryController(db)
+    user_id = UUID(current_user.id)
+    return await controller.recall(user_id, recall_request)
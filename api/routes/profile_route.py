@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from database.db import get_db
-from core.auth import get_current_user, User
+from fastapi import APIRouter, Depends, Header, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.async_db import get_async_db
+from core.auth import get_current_user, get_async_read_db, User
 from controllers.profile_controller import ProfileController
 from schemas.profile import (
     ProfileUpdate,
@@ -9,6 +9,7 @@ from schemas.profile import (
     ProfileStatusResponse
 )
 from uuid import UUID
+from typing import Optional
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
@@ -16,7 +17,7 @@ router = APIRouter(prefix="/profile", tags=["profile"])
 @router.get("/check", response_model=ProfileStatusResponse)
 async def check_profile_status(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Check if user's profile exists and is complete"""
     controller = ProfileController(db)
@@ -26,33 +27,37 @@ async def check_profile_status(
 
 @router.get("/", response_model=ProfileResponse)
 async def get_profile(
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db),
+    if_none_match: Optional[str] = Header(None)
 ):
-    """Get current user's profile"""
+    """Get current user's profile (supports If-None-Match)"""
     controller = ProfileController(db)
     user_id = UUID(current_user.id)
-    return await controller.get_profile(user_id)
+    return await controller.get_profile(user_id, response, if_none_match)
 
 
 @router.put("/", response_model=ProfileResponse)
 async def update_profile(
     profile_data: ProfileUpdate,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    if_match: Optional[str] = Header(None)
 ):
-    """Update current user's profile"""
+    """Update current user's profile (supports If-Match)"""
     controller = ProfileController(db)
     user_id = UUID(current_user.id)
-    return await controller.update_profile(user_id, profile_data)
+    return await controller.update_profile(user_id, profile_data, response, if_match)
 
 
-@router.delete("/")
+@router.delete("/", status_code=status.HTTP_202_ACCEPTED)
 async def delete_profile(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Delete current user's profile"""
+    """Queue current user's profile and all its data for deletion by the purge worker"""
     controller = ProfileController(db)
     user_id = UUID(current_user.id)
     return await controller.delete_profile(user_id)
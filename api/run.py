@@ -41,6 +41,56 @@ class ScriptRunner:
                     'python run.py server',
                     'python run.py server --prod'
                 ]
+            },
+            'benchmark': {
+                'file': 'benchmark.py',
+                'description': 'Run database micro-benchmarks',
+                'examples': [
+                    'python run.py benchmark rls --iterations 500',
+                    'python run.py benchmark recall --ef-search 10 40 100',
+                    'python run.py benchmark ingest --turns 5000 --batch-size 100'
+                ]
+            },
+            'partitions': {
+                'file': 'partitions.py',
+                'description': 'Create upcoming chat_turns partitions and drop expired ones',
+                'examples': [
+                    'python run.py partitions maintain',
+                    'python run.py partitions retention --dry-run'
+                ]
+            },
+            'purge': {
+                'file': 'purge.py',
+                'description': 'Delete purged profiles and chat past per-user retention in batches',
+                'examples': [
+                    'python run.py purge run --max-runtime 600',
+                    'python run.py purge enqueue --profile-id <uuid>'
+                ]
+            },
+            'embeddings': {
+                'file': 'embeddings.py',
+                'description': 'Backfill half-precision chat turn embeddings and compact float32 ones',
+                'examples': [
+                    'python run.py embeddings status',
+                    'python run.py embeddings backfill --batch-size 1000',
+                    'python run.py embeddings embed --limit 10000'
+                ]
+            },
+            'outbox': {
+                'file': 'outbox.py',
+                'description': 'Inspect and replay the write-behind outbox',
+                'examples': [
+                    'python run.py outbox status',
+                    'python run.py outbox flush'
+                ]
+            },
+            'rollups': {
+                'file': 'rollups.py',
+                'description': 'Rebuild and check the dashboard mood rollups',
+                'examples': [
+                    'python run.py rollups rebuild',
+                    'python run.py rollups verify --profiles 100'
+                ]
             }
         }
 
@@ -0,0 +1,60 @@
+from pydantic import BaseModel, Field, AwareDatetime
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from uuid import UUID
+
+# Most turns accepted in one batch request
+MAX_TURNS_PER_BATCH = 500
+
+
+class ChatTurnCreate(BaseModel):
+    speaker: str = Field(..., min_length=1)
+    message: str
+    audio_url: Optional[str] = None
+    # When the turn was said, with a UTC offset; defaults to the time the batch is received
+    timestamp: Optional[AwareDatetime] = None
+
+
+class ChatTurnBatch(BaseModel):
+    turns: List[ChatTurnCreate] = Field(..., min_length=1, max_length=MAX_TURNS_PER_BATCH)
+
+
+class IngestedTurn(BaseModel):
+    id: UUID
+    timestamp: datetime
+
+
+class ChatTurnBatchResponse(BaseModel):
+    session_id: UUID
+    # Turns in the order they were written (by timestamp)
+    turns: List[IngestedTurn]
+    # Recorded in the write-behind outbox; in the database shortly
+    queued: bool = False
+
+
+class ActivityResultCreate(BaseModel):
+    # Reuse the id of an earlier result to replace it (e.g. when the activity ends)
+    id: Optional[UUID] = None
+    activity_id: UUID
+    start_time: AwareDatetime
+    end_time: Optional[AwareDatetime] = None
+    score: Optional[int] = None
+    results: Dict[str, Any] = Field(default_factory=dict)
+
+
+class ActivityResultResponse(BaseModel):
+    id: UUID
+    session_id: UUID
+    queued: bool = False
+
+
+class MoodUpdate(BaseModel):
+    mood_score: int = Field(..., ge=1, le=10)
+    mood_notes: Optional[str] = None
+
+
+class MoodResponse(BaseModel):
+    session_id: UUID
+    mood_score: int
+    mood_notes: Optional[str]
+    queued: bool = False
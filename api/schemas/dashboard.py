@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import date
+from uuid import UUID
+
+
+class TimeOfDayMood(BaseModel):
+    time_of_day: str
+    sessions: int
+    average_mood: Optional[float]
+
+
+class MoodTrendPoint(BaseModel):
+    period_start: date
+    sessions: int
+    # Sessions with a mood score; average_mood is None when there are none
+    rated_sessions: int
+    average_mood: Optional[float]
+    total_duration: int  # in minutes
+    average_duration: Optional[float]
+    by_time_of_day: List[TimeOfDayMood]
+
+
+class MoodTrend(BaseModel):
+    profile_id: UUID
+    granularity: str
+    since: date
+    until: date
+    # Oldest first; periods without closed sessions are left out
+    points: List[MoodTrendPoint]
@@ -0,0 +1,41 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+from uuid import UUID
+
+
+class SessionSummary(BaseModel):
+    id: UUID
+    start_time: datetime
+    end_time: Optional[datetime]
+    duration: Optional[int]
+    mood_score: Optional[int]
+    time_of_day: Optional[str]
+    has_activity: Optional[bool]
+    activity_type: Optional[str]
+    activity_name: Optional[str]
+    topics: List[str]
+
+
+class SessionPage(BaseModel):
+    sessions: List[SessionSummary]
+    # Pass back as `cursor` for the next (older) page; None on the last page
+    next_cursor: Optional[str]
+
+
+class HistoryTurn(BaseModel):
+    id: UUID
+    timestamp: datetime
+    speaker: str
+    message: str
+    audio_url: Optional[str]
+
+    class Config:
+        from_attributes = True
+
+
+class TurnPage(BaseModel):
+    session_id: UUID
+    turns: List[HistoryTurn]
+    # Pass back as `cursor` for the next (later) page; None on the last page
+    next_cursor: Optional[str]
@@ -0,0 +1,42 @@
+from pydantic import BaseModel, Field
+from database.models import EMBEDDING_DIMENSIONS
+from typing import Optional, List
+from datetime import datetime
+from uuid import UUID
+
+
+class RecallRequest(BaseModel):
+    profile_id: UUID
+    embedding: List[float] = Field(
+        ..., min_length=EMBEDDING_DIMENSIONS, max_length=EMBEDDING_DIMENSIONS)
+    k: int = Field(10, ge=1, le=50)
+    # HNSW candidate list size; defaults to RECALL_EF_SEARCH
+    ef_search: Optional[int] = Field(None, ge=1, le=1000)
+    # Only search turns at or after this time (skips older partitions)
+    since: Optional[datetime] = None
+    # Compare against every turn instead of using the index
+    exact: bool = False
+
+
+class RecalledTurn(BaseModel):
+    id: UUID
+    session_id: UUID
+    timestamp: datetime
+    speaker: str
+    message: str
+    distance: float
+
+    class Config:
+        from_attributes = True
+
+
+class RecallResponse(BaseModel):
+    turns: List[RecalledTurn]
+    ef_search: Optional[int]
+    exact: bool
+    # Why the search was exact: "requested", or "index_short" when the index
+    # returned fewer turns than the profile has
+    exact_reason: Optional[str] = None
+    # Embedding storage mode searched, and whether index candidates were re-ranked
+    storage: str
+    reranked: bool
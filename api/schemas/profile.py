@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any
-from datetime import date
+from datetime import date, datetime
 from uuid import UUID
 
 
@@ -16,6 +16,8 @@ class ProfileUpdate(BaseModel):
     preferred_speech_speed: Optional[float] = Field(None, ge=0.5, le=2.0)
     preferred_avatar_type: Optional[str] = None
     accessibility_preferences: Optional[AccessibilityPreferences] = None
+    # Days of chat history to keep (older turns are purged); null keeps it all
+    chat_retention_days: Optional[int] = Field(None, ge=1)
 
 
 class ProfileResponse(BaseModel):
@@ -25,6 +27,8 @@ class ProfileResponse(BaseModel):
     preferred_avatar_type: str
     accessibility_preferences: Dict[str, Any]
     caregiver_id: Optional[UUID]
+    chat_retention_days: Optional[int] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,859 @@
+#!/usr/bin/env python
+"""
+Database micro-benchmarks for the GRACE API.
+Each benchmark compares the current implementation against the previous one
+on the database configured by DATABASE_URL.
+
+Usage:
+    python scripts/benchmark.py rls --iterations 500
+    python scripts/benchmark.py rls-plans --profiles 1000 --verbose
+    python scripts/benchmark.py recall --profiles 50 --turns-per-profile 400
+    python scripts/benchmark.py embeddings --rerank-factor 4
+    python scripts/benchmark.py ingest --turns 5000 --batch-size 100
+    python scripts/benchmark.py rollups --profiles 1000 --sessions-per-profile 1000
+    python scripts/benchmark.py --help
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from typing import Callable, Dict, List
+
+# Make the api packages importable when run as scripts/benchmark.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summarize timings (in seconds) as milliseconds."""
+    ordered = sorted(samples)
+    p95_index = max(int(len(ordered) * 0.95) - 1, 0)
+    return {
+        'mean': statistics.mean(ordered) * 1000,
+        'p50': statistics.median(ordered) * 1000,
+        'p95': ordered[p95_index] * 1000,
+    }
+
+
+def print_results(title: str, rows: List[Dict]):
+    """Print benchmark rows as an aligned table."""
+    print(f"\n{'='*72}")
+    print(title)
+    print('='*72)
+    print(f"{'variant':<32}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'stmts':>10}")
+    for row in rows:
+        print(f"{row['label']:<32}{row['mean']:>10.3f}{row['p50']:>10.3f}"
+              f"{row['p95']:>10.3f}{row['statements']:>10.1f}")
+
+
+class StatementCounter:
+    """Counts statements sent to the server through an engine."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def time_requests(label: str, request: Callable[[], None], iterations: int,
+                  counter: StatementCounter, warmup: int = 20) -> Dict:
+    """Run a request function repeatedly and collect timings and statement counts."""
+    for _ in range(warmup):
+        request()
+
+    counter.count = 0
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        request()
+        samples.append(time.perf_counter() - start)
+
+    row = summarize(samples)
+    row['label'] = label
+    row['statements'] = counter.count / iterations
+    return row
+
+
+# ---------------------------------------------------------------------------
+# rls: RLS context setup round trips
+# ---------------------------------------------------------------------------
+
+def _legacy_rls_context(db, user_id: str, role: str):
+    """The RLS setup used before claims and role were combined."""
+    from sqlalchemy import text
+
+    db.execute(text("SELECT set_config('request.jwt.claims', :claims, true)"),
+               {"claims": f'{{"sub": "{user_id}", "role": "{role}"}}'})
+    db.execute(text("SELECT set_config('role', :role, true)"),
+               {"role": role})
+
+
+def _single_statement_rls_context(db, user_id: str, role: str):
+    from database.rls import rls_context_statement
+
+    statement, params = rls_context_statement(user_id, role)
+    db.execute(statement, params)
+
+
+def bench_rls(args) -> int:
+    """Compare the two-statement RLS setup with the single-statement one."""
+    from sqlalchemy import text
+    from database.db import engine, SessionLocal
+
+    counter = StatementCounter(engine)
+    user_id = str(uuid.uuid4())
+
+    def make_request(setup):
+        def request():
+            db = SessionLocal()
+            try:
+                setup(db, user_id, "authenticated")
+                # Stand-in for the request's real query
+                db.execute(text("SELECT 1"))
+            finally:
+                db.close()
+        return request
+
+    rows = [
+        time_requests("legacy (claims + role)", make_request(_legacy_rls_context),
+                      args.iterations, counter),
+        time_requests("single statement", make_request(_single_statement_rls_context),
+                      args.iterations, counter),
+    ]
+    print_results(f"RLS context setup + 1 query ({args.iterations} iterations)", rows)
+
+    saved = rows[0]['mean'] - rows[1]['mean']
+    print(f"\nRound trips saved per request: {rows[0]['statements'] - rows[1]['statements']:.0f}")
+    print(f"Mean latency saved per request: {saved:.3f} ms")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# rls-plans: query plans under the original vs index-friendly RLS policies
+# ---------------------------------------------------------------------------
+
+_UID = "(select auth.uid())"
+_ROLE = "(select auth.role())"
+
+# Policies consulted by the benchmark queries: (table, name, original, rewritten)
+RLS_PLAN_POLICIES = [
+    ("profiles", "Users can view own profile",
+     "auth.uid()::text = id::text", f"id = {_UID}"),
+    ("profiles", "Caregivers can view managed profiles",
+     "EXISTS (SELECT 1 FROM caregivers c WHERE c.id = profiles.caregiver_id"
+     " AND auth.uid()::text = c.id::text)",
+     f"caregiver_id = {_UID}"),
+    ("sessions", "Users can view own sessions",
+     "auth.uid()::text = profile_id::text", f"profile_id = {_UID}"),
+    ("sessions", "Caregivers can view managed sessions",
+     "EXISTS (SELECT 1 FROM profiles p JOIN caregivers c ON p.caregiver_id = c.id"
+     " WHERE p.id = sessions.profile_id AND auth.uid()::text = c.id::text)",
+     f"profile_id IN (SELECT p.id FROM profiles p WHERE p.caregiver_id = {_UID})"),
+    ("chat_turns", "Users can view own chat turns",
+     "EXISTS (SELECT 1 FROM sessions s WHERE s.id = chat_turns.session_id"
+     " AND auth.uid()::text = s.profile_id::text)",
+     f"profile_id = {_UID}"),
+    ("chat_turns", "Caregivers can view managed chat turns",
+     "EXISTS (SELECT 1 FROM sessions s JOIN profiles p ON s.profile_id = p.id"
+     " JOIN caregivers c ON p.caregiver_id = c.id"
+     " WHERE s.id = chat_turns.session_id AND auth.uid()::text = c.id::text)",
+     f"profile_id IN (SELECT p.id FROM profiles p WHERE p.caregiver_id = {_UID})"),
+] + [
+    (table, "Service role bypass", "auth.role() = 'service_role'", f"{_ROLE} = 'service_role'")
+    for table in ("profiles", "sessions", "chat_turns")
+]
+
+# (table, indexed columns) dropped for the original variant
+RLS_PLAN_INDEXES = [
+    ("sessions", "profile_id"),
+    ("chat_turns", "session_id"),
+    ("profiles", "caregiver_id"),
+    ("chat_turns", "profile_id, timestamp"),
+]
+
+# (label, who runs it, query)
+RLS_PLAN_QUERIES = [
+    ("own profile", "user", "SELECT * FROM profiles"),
+    ("own sessions", "user", "SELECT * FROM sessions ORDER BY start_time DESC LIMIT 20"),
+    ("own chat turns", "user", "SELECT count(*) FROM chat_turns"),
+    ("recent chat history", "user", "SELECT * FROM chat_turns ORDER BY timestamp DESC LIMIT 50"),
+    ("managed profiles", "caregiver", "SELECT * FROM profiles"),
+    ("managed chat turns", "caregiver", "SELECT count(*) FROM chat_turns"),
+]
+
+
+def _seed_rls_data(db, args):
+    """Seed caregivers, profiles, sessions and chat turns; return (user_id, caregiver_id)."""
+    from sqlalchemy import text
+
+    params = {'caregivers': max(args.profiles // args.profiles_per_caregiver, 1),
+              'profiles': args.profiles, 'sessions': args.sessions_per_profile,
+              'turns': args.turns_per_session}
+    statements = [
+        """CREATE TEMP TABLE bench_caregivers ON COMMIT DROP AS
+           SELECT gen_random_uuid() AS id, g AS n FROM generate_series(1, :caregivers) g""",
+        """INSERT INTO caregivers (id, name, email)
+           SELECT id, 'Benchmark caregiver ' || n, 'rls-bench-' || id || '@example.com'
+           FROM bench_caregivers""",
+        """CREATE TEMP TABLE bench_profiles ON COMMIT DROP AS
+           SELECT gen_random_uuid() AS id, g AS n FROM generate_series(1, :profiles) g""",
+        """INSERT INTO profiles (id, caregiver_id)
+           SELECT p.id, c.id FROM bench_profiles p
+           JOIN bench_caregivers c ON c.n = 1 + (p.n - 1) % :caregivers""",
+        # Sessions start within the current month so every seeded chat turn
+        # lands in an existing chat_turns partition
+        """INSERT INTO sessions (id, profile_id, start_time)
+           SELECT gen_random_uuid(), p.id, date_trunc('month', now()) + g * interval '1 minute'
+           FROM bench_profiles p CROSS JOIN generate_series(1, :sessions) g""",
+        """INSERT INTO chat_turns (id, session_id, timestamp, speaker, message)
+           SELECT gen_random_uuid(), s.id, s.start_time + g * interval '1 second',
+                  'user', 'benchmark message ' || g
+           FROM sessions s JOIN bench_profiles p ON p.id = s.profile_id
+           CROSS JOIN generate_series(1, :turns) g""",
+        "ANALYZE caregivers, profiles, sessions, chat_turns",
+    ]
+    for statement in statements:
+        db.execute(text(statement), params)
+
+    row = db.execute(text(
+        "SELECT p.id, c.id FROM bench_profiles p JOIN bench_caregivers c ON c.n = 1 WHERE p.n = 1"
+    )).one()
+    return str(row[0]), str(row[1])
+
+
+def _apply_rls_variant(db, rewritten: bool):
+    """Install the original or rewritten policies (and indexes) inside the open transaction."""
+    from sqlalchemy import text
+
+    for table, name, original, new in RLS_PLAN_POLICIES:
+        db.execute(text(f'DROP POLICY IF EXISTS "{name}" ON {table}'))
+        db.execute(text(
+            f'CREATE POLICY "{name}" ON {table} FOR {"ALL" if name == "Service role bypass" else "SELECT"}'
+            f' USING ({new if rewritten else original})'))
+    for table, columns in RLS_PLAN_INDEXES:
+        index_name = f"ix_{table}_" + "_".join(column.strip() for column in columns.split(","))
+        if rewritten:
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({columns})"))
+        else:
+            db.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+    db.execute(text("ANALYZE caregivers, profiles, sessions, chat_turns"))
+
+
+def _plan_nodes(plan: Dict) -> List[str]:
+    """Node types of a JSON plan, depth first, with the relation scanned where there is one."""
+    node = plan['Node Type']
+    if 'Relation Name' in plan:
+        node += f" on {plan['Relation Name']}"
+    nodes = [node]
+    for child in plan.get('Plans', []):
+        nodes.extend(_plan_nodes(child))
+    return nodes
+
+
+def _explain_as(db, user_id: str, query: str) -> Dict:
+    from sqlalchemy import text
+    from database.rls import rls_context_statement
+
+    statement, params = rls_context_statement(user_id, "authenticated")
+    db.execute(statement, params)
+    try:
+        return db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}")).scalar()[0]
+    finally:
+        db.execute(text("RESET ROLE"))
+
+
+def bench_rls_plans(args) -> int:
+    """EXPLAIN ANALYZE typical queries under the original and rewritten RLS policies."""
+    from database.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        user_id, caregiver_id = _seed_rls_data(db, args)
+        principals = {'user': user_id, 'caregiver': caregiver_id}
+
+        results = []
+        for variant, rewritten in (("original", False), ("rewritten", True)):
+            _apply_rls_variant(db, rewritten)
+            for label, who, query in RLS_PLAN_QUERIES:
+                best = None
+                for _ in range(args.iterations):
+                    explained = _explain_as(db, principals[who], query)
+                    if best is None or explained['Execution Time'] < best['Execution Time']:
+                        best = explained
+                plan = best['Plan']
+                results.append({
+                    'query': label, 'variant': variant,
+                    'ms': best['Execution Time'],
+                    'buffers': plan.get('Shared Hit Blocks', 0) + plan.get('Shared Read Blocks', 0),
+                    'nodes': _plan_nodes(plan),
+                })
+    finally:
+        # Seeded rows, policy swaps and index changes are all discarded
+        db.rollback()
+        db.close()
+
+    print(f"\n{'='*72}")
+    print(f"RLS query plans: {args.profiles} profiles, {args.sessions_per_profile} sessions each, "
+          f"{args.turns_per_session} turns per session (best of {args.iterations})")
+    print('='*72)
+    print(f"{'query':<22}{'policies':<12}{'exec ms':>10}{'buffers':>10}")
+    for row in results:
+        print(f"{row['query']:<22}{row['variant']:<12}{row['ms']:>10.3f}{row['buffers']:>10}")
+        if args.verbose:
+            for node in row['nodes']:
+                print(f"{'':<34}{node}")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# recall: HNSW memory recall vs brute-force nearest neighbours
+# ---------------------------------------------------------------------------
+
+
+def _seed_recall_corpus(db, args) -> List:
+    """
+    Seed profiles with embedded chat turns and return (profile_id, embedding)
+    query pairs. Turns are noisy copies of a few shared topic vectors, which is
+    closer to real conversation embeddings than uniform noise.
+    """
+    from sqlalchemy import text
+    from pgvector.sqlalchemy import Vector
+    from database.models import EMBEDDING_DIMENSIONS
+
+    params = {'profiles': args.profiles, 'turns': args.turns_per_profile,
+              'topics': args.topics, 'dimensions': EMBEDDING_DIMENSIONS, 'noise': args.noise,
+              'queries': args.queries}
+    statements = [
+        """CREATE TEMP TABLE bench_profiles ON COMMIT DROP AS
+           SELECT gen_random_uuid() AS id, g AS n FROM generate_series(1, :profiles) g""",
+        "INSERT INTO profiles (id) SELECT id FROM bench_profiles",
+        # One session per profile, in the current month's partition
+        """INSERT INTO sessions (id, profile_id, start_time)
+           SELECT gen_random_uuid(), id, date_trunc('month', now()) FROM bench_profiles""",
+        """CREATE TEMP TABLE bench_topics ON COMMIT DROP AS
+           SELECT t AS topic,
+                  ARRAY(SELECT random() - 0.5 FROM generate_series(1, :dimensions) WHERE t > 0) AS centre
+           FROM generate_series(1, :topics) t""",
+        """INSERT INTO chat_turns (id, session_id, timestamp, speaker, message, embedding)
+           SELECT gen_random_uuid(), s.id, s.start_time + g * interval '1 second', 'user',
+                  'benchmark message ' || g,
+                  (SELECT array_agg(c + (random() - 0.5) * :noise ORDER BY d)
+                   FROM unnest(tp.centre) WITH ORDINALITY AS u(c, d))::vector
+           FROM sessions s JOIN bench_profiles p ON p.id = s.profile_id
+           CROSS JOIN generate_series(1, :turns) g
+           JOIN bench_topics tp ON tp.topic = 1 + (p.n * 7919 + g * 104729) % :topics""",
+        f"""UPDATE chat_turns SET embedding_half = embedding::halfvec({EMBEDDING_DIMENSIONS})
+           WHERE profile_id IN (SELECT id FROM bench_profiles)""",
+        "ANALYZE profiles, sessions, chat_turns",
+    ]
+    for statement in statements:
+        db.execute(text(statement), params)
+
+    return db.execute(text("""
+        SELECT t.profile_id, t.embedding FROM chat_turns t
+        JOIN bench_profiles p ON p.id = t.profile_id
+        ORDER BY random() LIMIT :queries
+    """).columns(embedding=Vector(EMBEDDING_DIMENSIONS)), params).all()
+
+
+def _recall_plan(db, query) -> str:
+    """The index (or scan) the planner picked for a recall query."""
+    from sqlalchemy import text
+    from sqlalchemy.dialects import postgresql
+
+    compiled = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()[0]['Plan']
+    nodes = _plan_nodes(plan)
+    index_nodes = [node for node in nodes if 'Index' in node]
+    return (index_nodes or nodes)[-1]
+
+
+def bench_recall(args) -> int:
+    """Latency and recall@k of HNSW recall at several ef_search values vs exact search."""
+    from database.db import SessionLocal
+    from datastores.memory_datastore import MemoryDatastore, recall_statement, search_settings_statement
+
+    db = SessionLocal()
+    datastore = MemoryDatastore(db)
+    rows = []
+    try:
+        start = time.perf_counter()
+        queries = _seed_recall_corpus(db, args)
+        print(f"Seeded {args.profiles * args.turns_per_profile} turns in "
+              f"{time.perf_counter() - start:.1f} s")
+
+        exact_ids = []
+        samples = []
+        for profile_id, embedding in queries:
+            started = time.perf_counter()
+            result = datastore.recall(profile_id, embedding, args.k, 0, exact=True)
+            samples.append(time.perf_counter() - started)
+            exact_ids.append({row.id for row in result})
+        row = summarize(samples)
+        row.update(label='exact (brute force)', recall=1.0,
+                   plan=_recall_plan(db, recall_statement(queries[0][0], queries[0][1], args.k, exact=True)))
+        rows.append(row)
+
+        for ef_search in args.ef_search:
+            samples = []
+            found = 0
+            for (profile_id, embedding), expected in zip(queries, exact_ids):
+                started = time.perf_counter()
+                result = datastore.recall(profile_id, embedding, args.k, ef_search,
+                                          args.iterative_scan)
+                samples.append(time.perf_counter() - started)
+                found += len({row.id for row in result} & expected)
+            row = summarize(samples)
+            statement, params = search_settings_statement(ef_search, args.iterative_scan)
+            db.execute(statement, params)
+            row.update(label=f"hnsw ef_search={ef_search}",
+                       recall=found / max(sum(len(ids) for ids in exact_ids), 1),
+                       plan=_recall_plan(db, recall_statement(queries[0][0], queries[0][1], args.k)))
+            rows.append(row)
+    finally:
+        # Seeded profiles, sessions and turns are all discarded
+        db.rollback()
+        db.close()
+
+    print(f"\n{'='*72}")
+    print(f"Memory recall: {args.profiles} profiles x {args.turns_per_profile} turns, "
+          f"top {args.k}, {len(queries)} queries")
+    print('='*72)
+    print(f"{'variant':<26}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'recall':>9}  plan")
+    for row in rows:
+        print(f"{row['label']:<26}{row['mean']:>10.3f}{row['p50']:>10.3f}{row['p95']:>10.3f}"
+              f"{row['recall']:>9.3f}  {row['plan']}")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# embeddings: size, recall and latency per embedding storage mode
+# ---------------------------------------------------------------------------
+
+# (label, storage mode, re-rank against float32)
+EMBEDDING_VARIANTS = [
+    ("vector", "vector", False),
+    ("halfvec", "halfvec", False),
+    ("halfvec + float32 re-rank", "halfvec", True),
+    ("binary + halfvec re-rank", "binary", False),
+    ("binary + float32 re-rank", "binary", True),
+]
+
+
+def _embedding_sizes(db) -> Dict[str, Dict[str, float]]:
+    """
+    Average column bytes per turn and HNSW index size per storage mode,
+    measured on a copy of the seeded embeddings so other data doesn't count.
+    """
+    from sqlalchemy import text
+    from database.models import EMBEDDING_DIMENSIONS
+
+    db.execute(text("""
+        CREATE TEMP TABLE bench_embeddings ON COMMIT DROP AS
+        SELECT embedding, embedding_half FROM chat_turns
+        WHERE profile_id IN (SELECT id FROM bench_profiles)
+    """))
+    indexes = {
+        'vector': "hnsw (embedding vector_cosine_ops)",
+        'halfvec': "hnsw (embedding_half halfvec_cosine_ops)",
+        'binary': f"hnsw ((binary_quantize(embedding_half)::bit({EMBEDDING_DIMENSIONS})) bit_hamming_ops)",
+    }
+    column_bytes = db.execute(text("""
+        SELECT avg(pg_column_size(embedding)), avg(pg_column_size(embedding_half))
+        FROM bench_embeddings
+    """)).one()
+
+    sizes = {}
+    for storage, method in indexes.items():
+        db.execute(text(f"CREATE INDEX bench_embeddings_{storage} ON bench_embeddings USING {method}"))
+        index_bytes = db.execute(text(
+            f"SELECT pg_relation_size('bench_embeddings_{storage}')")).scalar()
+        sizes[storage] = {
+            'column_bytes': float(column_bytes[0] if storage == 'vector' else column_bytes[1]),
+            'index_mb': index_bytes / (1024 * 1024),
+        }
+    return sizes
+
+
+def bench_embeddings(args) -> int:
+    """Size, recall@k and latency of each embedding storage mode vs exact float32 search."""
+    from database.db import SessionLocal
+    from datastores.memory_datastore import (
+        MemoryDatastore, recall_statement, search_settings_statement, reranks)
+
+    db = SessionLocal()
+    datastore = MemoryDatastore(db)
+    rows = []
+    try:
+        start = time.perf_counter()
+        queries = _seed_recall_corpus(db, args)
+        print(f"Seeded {args.profiles * args.turns_per_profile} turns in "
+              f"{time.perf_counter() - start:.1f} s")
+        sizes = _embedding_sizes(db)
+
+        # Ground truth: exact search over the float32 embeddings
+        exact_ids = [{row.id for row in datastore.recall(profile_id, embedding, args.k, 0, exact=True)}
+                     for profile_id, embedding in queries]
+
+        for label, storage, full_precision in EMBEDDING_VARIANTS:
+            rerank_candidates = args.k * args.rerank_factor if reranks(storage, full_precision) else 0
+            ef_search = max(args.ef_search, args.k, rerank_candidates)
+
+            def recall(profile_id, embedding):
+                return datastore.recall(profile_id, embedding, args.k, ef_search,
+                                        args.iterative_scan, storage=storage,
+                                        rerank_candidates=rerank_candidates,
+                                        full_precision=full_precision)
+
+            for profile_id, embedding in queries[:5]:
+                recall(profile_id, embedding)
+
+            samples = []
+            found = 0
+            for (profile_id, embedding), expected in zip(queries, exact_ids):
+                started = time.perf_counter()
+                result = recall(profile_id, embedding)
+                samples.append(time.perf_counter() - started)
+                found += len({row.id for row in result} & expected)
+
+            row = summarize(samples)
+            statement, params = search_settings_statement(ef_search, args.iterative_scan)
+            db.execute(statement, params)
+            row.update(label=label, **sizes[storage],
+                       recall=found / max(sum(len(ids) for ids in exact_ids), 1),
+                       plan=_recall_plan(db, recall_statement(
+                           queries[0][0], queries[0][1], args.k, storage=storage,
+                           rerank_candidates=rerank_candidates, full_precision=full_precision)))
+            rows.append(row)
+    finally:
+        # Seeded rows and the size-measurement copy are discarded
+        db.rollback()
+        db.close()
+
+    print(f"\n{'='*96}")
+    print(f"Embedding storage: {args.profiles} profiles x {args.turns_per_profile} turns, "
+          f"top {args.k}, ef_search {args.ef_search}, re-rank x{args.rerank_factor}, "
+          f"{len(queries)} queries")
+    print('='*96)
+    print(f"{'variant':<28}{'B/turn':>8}{'index MB':>10}{'mean ms':>10}{'p50 ms':>10}"
+          f"{'p95 ms':>10}{'recall':>9}  plan")
+    for row in rows:
+        print(f"{row['label']:<28}{row['column_bytes']:>8.0f}{row['index_mb']:>10.1f}"
+              f"{row['mean']:>10.3f}{row['p50']:>10.3f}{row['p95']:>10.3f}{row['recall']:>9.3f}"
+              f"  {row['plan']}")
+    print("\nB/turn is the stored column. Float32 re-rank also needs the float32 column kept.")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# ingest: chat turn ingestion, one INSERT per turn vs bulk
+# ---------------------------------------------------------------------------
+
+
+def _ingest_rows(session_ids: List, turns: int) -> List:
+    """Chat turn rows spread over the sessions, a millisecond apart, in this month"""
+    from datetime import datetime, timedelta, timezone
+    from datastores.chat_datastore import ChatTurnRow
+
+    start = datetime.now(timezone.utc)
+    return [ChatTurnRow(uuid.uuid4(), session_ids[n % len(session_ids)],
+                        start + timedelta(milliseconds=n), 'user' if n % 2 else 'assistant',
+                        f"benchmark message {n} " + "lorem ipsum " * 10)
+            for n in range(turns)]
+
+
+def bench_ingest(args) -> int:
+    """Rows per second writing chat turns one INSERT at a time, as one multi-row INSERT, and with COPY."""
+    from sqlalchemy import text
+    from database.db import engine, SessionLocal
+    from datastores.chat_datastore import ChatDatastore
+
+    counter = StatementCounter(engine)
+    db = SessionLocal()
+    datastore = ChatDatastore(db)
+    profile_id = uuid.uuid4()
+    session_ids = [uuid.uuid4() for _ in range(args.sessions)]
+
+    def single(rows):
+        for row in rows:
+            datastore.insert_turn(row)
+        return 0
+
+    def multi_row(rows):
+        for row in rows:
+            datastore.add(row)
+        datastore.flush()
+        return 0
+
+    def copy(rows):
+        datastore.copy_turns(rows)
+        # COPY goes through the raw cursor, which the counter doesn't see
+        return 1
+
+    variants = [("single INSERT per turn", single), ("multi-row INSERT", multi_row), ("COPY", copy)]
+    results = []
+    try:
+        db.execute(text("INSERT INTO profiles (id) VALUES (:id)"), {"id": profile_id})
+        db.execute(text("""
+            INSERT INTO sessions (id, profile_id, start_time)
+            SELECT s, :profile_id, now() FROM unnest(CAST(:ids AS uuid[])) s
+        """), {"profile_id": profile_id, "ids": session_ids})
+        db.commit()
+
+        for label, write in variants:
+            rows = _ingest_rows(session_ids, args.turns)
+            batches = [rows[n:n + args.batch_size] for n in range(0, len(rows), args.batch_size)]
+            counter.count = 0
+            extra_statements = 0
+            samples = []
+            start = time.perf_counter()
+            for batch in batches:
+                started = time.perf_counter()
+                extra_statements += write(batch)
+                samples.append(time.perf_counter() - started)
+            elapsed = time.perf_counter() - start
+
+            row = summarize(samples)
+            row.update(label=label, rows_per_second=len(rows) / elapsed,
+                       statements=(counter.count + extra_statements) / len(batches))
+            results.append(row)
+    finally:
+        db.rollback()
+        # The variants commit, so their rows are deleted rather than rolled back
+        db.execute(text("DELETE FROM chat_turns WHERE profile_id = :id"), {"id": profile_id})
+        db.execute(text("DELETE FROM sessions WHERE profile_id = :id"), {"id": profile_id})
+        db.execute(text("DELETE FROM profiles WHERE id = :id"), {"id": profile_id})
+        db.commit()
+        db.close()
+
+    print(f"\n{'='*80}")
+    print(f"Chat turn ingestion: {args.turns} turns in batches of {args.batch_size} "
+          f"across {args.sessions} sessions")
+    print('='*80)
+    print(f"{'variant':<26}{'rows/s':>10}{'batch mean ms':>15}{'batch p95 ms':>14}{'stmts/batch':>13}")
+    for row in results:
+        print(f"{row['label']:<26}{row['rows_per_second']:>10.0f}{row['mean']:>15.3f}"
+              f"{row['p95']:>14.3f}{row['statements']:>13.1f}")
+    print(f"\nMulti-row INSERT vs single: {results[1]['rows_per_second'] / results[0]['rows_per_second']:.1f}x. "
+          "COPY needs a role that bypasses RLS, so the API uses the multi-row INSERT.")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# rollups: dashboard mood trends from mood_rollups vs aggregating sessions
+# ---------------------------------------------------------------------------
+
+ROLLUPS_TRIGGER = "sessions_maintain_mood_rollups"
+
+
+def _seed_rollup_sessions(db, args) -> List:
+    """Seed profiles with closed sessions spread over the last --days; return the profile ids"""
+    from sqlalchemy import text
+
+    profile_ids = [uuid.uuid4() for _ in range(args.profiles)]
+    db.execute(text("INSERT INTO profiles (id) SELECT unnest(CAST(:ids AS uuid[]))"),
+               {"ids": profile_ids})
+    db.execute(text("""
+        INSERT INTO sessions (id, profile_id, start_time, end_time, duration, mood_score, time_of_day)
+        SELECT gen_random_uuid(), p, t, t + d * interval '1 minute', d, mood, time_of_day
+        FROM (
+            SELECT p, now() - random() * :days * interval '1 day' AS t,
+                   5 + (random() * 55)::int AS d,
+                   CASE WHEN random() < 0.9 THEN 1 + (random() * 9)::int END AS mood,
+                   (ARRAY['Morning', 'Afternoon', 'Evening'])[1 + (random() * 2)::int] AS time_of_day
+            FROM unnest(CAST(:ids AS uuid[])) p
+            CROSS JOIN generate_series(1, :sessions) g
+        ) r
+    """), {"ids": profile_ids, "sessions": args.sessions_per_profile, "days": args.days})
+    return profile_ids
+
+
+def _time_closes(db, profile_ids: List, closes: int) -> List[float]:
+    """Open `closes` sessions, then time closing them one UPDATE at a time"""
+    import random
+    from sqlalchemy import text
+
+    session_ids = [uuid.uuid4() for _ in range(closes)]
+    db.execute(text("""
+        INSERT INTO sessions (id, profile_id, start_time)
+        SELECT s, p, now() - interval '30 minutes'
+        FROM unnest(CAST(:ids AS uuid[]), CAST(:profiles AS uuid[])) AS t (s, p)
+    """), {"ids": session_ids, "profiles": [random.choice(profile_ids) for _ in session_ids]})
+
+    samples = []
+    for session_id in session_ids:
+        start = time.perf_counter()
+        db.execute(text("""
+            UPDATE sessions SET end_time = now(), duration = 30, mood_score = :mood
+            WHERE id = :id
+        """), {"id": session_id, "mood": random.randint(1, 10)})
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_rollups(args) -> int:
+    """Dashboard mood trends read from the rollups vs aggregated from the sessions, and the trigger's write cost."""
+    import random
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import text
+    from database.db import engine, SessionLocal
+    from datastores.rollup_datastore import RollupDatastore, REBUILD_ROLLUPS_STATEMENT
+    from services.dashboard_service import period_start
+
+    counter = StatementCounter(engine)
+    db = SessionLocal()
+    datastore = RollupDatastore(db)
+    results = []
+    try:
+        # Seed with the trigger off, then build the rollups the way a backfill does
+        db.execute(text(f"ALTER TABLE sessions DISABLE TRIGGER {ROLLUPS_TRIGGER}"))
+        start = time.perf_counter()
+        profile_ids = _seed_rollup_sessions(db, args)
+        seed_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        rollup_rows = db.execute(REBUILD_ROLLUPS_STATEMENT, {"profile_ids": profile_ids}).rowcount
+        rebuild_seconds = time.perf_counter() - start
+        db.execute(text("ANALYZE profiles, sessions, mood_rollups"))
+
+        closes_without = summarize(_time_closes(db, profile_ids, args.closes))
+        db.execute(text(f"ALTER TABLE sessions ENABLE TRIGGER {ROLLUPS_TRIGGER}"))
+        closes_with = summarize(_time_closes(db, profile_ids, args.closes))
+
+        today = datetime.now(timezone.utc).date()
+        ranges = [("day", 30), ("week", 12), ("week", 104)]
+        for granularity, periods in ranges:
+            until = period_start(today, granularity)
+            since = until - timedelta(days=(1 if granularity == "day" else 7) * (periods - 1))
+            for label, read in (("rollups", datastore.mood_trend),
+                                ("on the fly", datastore.live_mood_trend)):
+                row = time_requests(
+                    f"{periods} {granularity}s, {label}",
+                    lambda: read(random.choice(profile_ids), granularity, since, until),
+                    args.queries, counter)
+                results.append(row)
+    finally:
+        # Seeded rows, rollups and the trigger switch are all discarded
+        db.rollback()
+        db.close()
+
+    sessions = args.profiles * args.sessions_per_profile
+    print_results(f"Mood trend reads: {sessions} closed sessions over {args.days} days, "
+                  f"{args.profiles} profiles ({args.queries} queries per variant)", results)
+    for rollup, live in zip(results[::2], results[1::2]):
+        print(f"{rollup['label'].split(',')[0]:<10} on the fly / rollups: {live['mean'] / rollup['mean']:.1f}x")
+
+    print(f"\nSeeded {sessions} sessions in {seed_seconds:.1f} s; built {rollup_rows} rollup rows "
+          f"from them in {rebuild_seconds:.1f} s ({sessions / max(rollup_rows, 1):.1f} sessions per row)")
+    print(f"Closing a session ({args.closes} closes): "
+          f"{closes_without['mean']:.3f} ms without the trigger, "
+          f"{closes_with['mean']:.3f} ms with it (p95 {closes_with['p95']:.3f} ms)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run database micro-benchmarks against DATABASE_URL.',
+        epilog='Example: python benchmark.py rls --iterations 500'
+    )
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    rls_parser = subparsers.add_parser(
+        'rls', help='RLS context setup: two statements vs one')
+    rls_parser.add_argument('--iterations', type=int, default=500,
+                            help='Number of simulated requests per variant')
+    rls_parser.set_defaults(func=bench_rls)
+
+    plans_parser = subparsers.add_parser(
+        'rls-plans', help='EXPLAIN ANALYZE under the original vs index-friendly RLS policies')
+    plans_parser.add_argument('--profiles', type=int, default=1000,
+                              help='Number of seeded profiles')
+    plans_parser.add_argument('--profiles-per-caregiver', type=int, default=10,
+                              help='Profiles managed by each seeded caregiver')
+    plans_parser.add_argument('--sessions-per-profile', type=int, default=10,
+                              help='Sessions seeded per profile')
+    plans_parser.add_argument('--turns-per-session', type=int, default=10,
+                              help='Chat turns seeded per session')
+    plans_parser.add_argument('--iterations', type=int, default=3,
+                              help='EXPLAIN ANALYZE runs per query (the fastest is reported)')
+    plans_parser.add_argument('--verbose', action='store_true',
+                              help='Print the plan nodes for every query')
+    plans_parser.set_defaults(func=bench_rls_plans)
+
+    recall_parser = subparsers.add_parser(
+        'recall', help='Memory recall: HNSW at several ef_search values vs brute force')
+    recall_parser.add_argument('--profiles', type=int, default=50,
+                               help='Number of seeded profiles')
+    recall_parser.add_argument('--turns-per-profile', type=int, default=400,
+                               help='Embedded chat turns seeded per profile')
+    recall_parser.add_argument('--topics', type=int, default=100,
+                               help='Topic vectors the turn embeddings cluster around')
+    recall_parser.add_argument('--noise', type=float, default=0.5,
+                               help='Spread of turn embeddings around their topic')
+    recall_parser.add_argument('--queries', type=int, default=200,
+                               help='Recall queries per variant')
+    recall_parser.add_argument('--k', type=int, default=10,
+                               help='Turns returned per query')
+    recall_parser.add_argument('--ef-search', type=int, nargs='+', default=[10, 40, 100, 200],
+                               help='hnsw.ef_search values to compare')
+    recall_parser.add_argument('--iterative-scan', default='',
+                               help='hnsw.iterative_scan mode (pgvector >= 0.8), e.g. relaxed_order')
+    recall_parser.set_defaults(func=bench_recall)
+
+    embeddings_parser = subparsers.add_parser(
+        'embeddings', help='Embedding storage modes: size, recall@k and latency')
+    embeddings_parser.add_argument('--profiles', type=int, default=50,
+                                   help='Number of seeded profiles')
+    embeddings_parser.add_argument('--turns-per-profile', type=int, default=400,
+                                   help='Embedded chat turns seeded per profile')
+    embeddings_parser.add_argument('--topics', type=int, default=100,
+                                   help='Topic vectors the turn embeddings cluster around')
+    embeddings_parser.add_argument('--noise', type=float, default=0.5,
+                                   help='Spread of turn embeddings around their topic')
+    embeddings_parser.add_argument('--queries', type=int, default=200,
+                                   help='Recall queries per variant')
+    embeddings_parser.add_argument('--k', type=int, default=10,
+                                   help='Turns returned per query')
+    embeddings_parser.add_argument('--ef-search', type=int, default=40,
+                                   help='hnsw.ef_search (raised to the re-rank candidate count)')
+    embeddings_parser.add_argument('--rerank-factor', type=int, default=4,
+                                   help='Index candidates per returned turn when re-ranking')
+    embeddings_parser.add_argument('--iterative-scan', default='',
+                                   help='hnsw.iterative_scan mode (pgvector >= 0.8), e.g. relaxed_order')
+    embeddings_parser.set_defaults(func=bench_embeddings)
+
+    ingest_parser = subparsers.add_parser(
+        'ingest', help='Chat turn ingestion: single INSERTs vs multi-row INSERT vs COPY')
+    ingest_parser.add_argument('--turns', type=int, default=5000,
+                               help='Chat turns written per variant')
+    ingest_parser.add_argument('--batch-size', type=int, default=100,
+                               help='Turns per bulk write (one conversation batch)')
+    ingest_parser.add_argument('--sessions', type=int, default=10,
+                               help='Sessions the turns are spread over')
+    ingest_parser.set_defaults(func=bench_ingest)
+
+    rollups_parser = subparsers.add_parser(
+        'rollups', help='Dashboard mood trends: rollup tables vs on-the-fly aggregation')
+    rollups_parser.add_argument('--profiles', type=int, default=1000,
+                                help='Number of seeded profiles')
+    rollups_parser.add_argument('--sessions-per-profile', type=int, default=1000,
+                                help='Closed sessions seeded per profile')
+    rollups_parser.add_argument('--days', type=int, default=730,
+                                help='Days of history the sessions are spread over')
+    rollups_parser.add_argument('--queries', type=int, default=200,
+                                help='Trend reads per variant')
+    rollups_parser.add_argument('--closes', type=int, default=500,
+                                help='Sessions closed with and without the rollup trigger')
+    rollups_parser.set_defaults(func=bench_rollups)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""
+Embed chat turns and move their embeddings between storage modes.
+
+Usage:
+    python scripts/embeddings.py status
+    python scripts/embeddings.py backfill --batch-size 1000
+    python scripts/embeddings.py compact
+    python scripts/embeddings.py embed --limit 10000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Make the api packages importable when run as scripts/embeddings.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _megabytes(size: int) -> str:
+    return f"{size / (1024 * 1024):,.1f} MB"
+
+
+def rewrite_command(db, args) -> int:
+    from database.partitions import list_partitions
+    from datastores.embedding_datastore import EmbeddingDatastore, BACKFILL_HALFVEC, COMPACT_FLOAT32
+
+    rewrite = BACKFILL_HALFVEC if args.command == 'backfill' else COMPACT_FLOAT32
+    datastore = EmbeddingDatastore(db)
+    partitions = list_partitions(db.connection())
+    db.commit()
+
+    total = 0
+    start = time.perf_counter()
+    for partition in partitions:
+        changed_in_partition = 0
+        after = None
+        while True:
+            changed, after = datastore.rewrite_batch(partition.name, rewrite, args.batch_size, after)
+            changed_in_partition += changed
+            if after is None:
+                break
+            time.sleep(args.pause_ms / 1000)
+        if changed_in_partition:
+            print(f"   {partition.name:<24} {changed_in_partition} row(s)")
+        total += changed_in_partition
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed else 0.0
+    print(f"✅ {rewrite.name}: {total} row(s) in {elapsed:.1f} s ({rate:.0f} rows/s)")
+    print("ℹ️  Rows locked by live writes were skipped; run again to pick them up")
+    if rewrite is COMPACT_FLOAT32 and total:
+        print("ℹ️  VACUUM chat_turns so the freed space is reused")
+    return 0
+
+
+def status_command(db, args) -> int:
+    from datastores.embedding_datastore import EmbeddingDatastore
+    from core.config import settings
+
+    stats = EmbeddingDatastore(db).storage_stats()
+    print(f"chat_turns total size: {_megabytes(stats['table_bytes'])}")
+    print(f"EMBEDDING_STORAGE: {settings.EMBEDDING_STORAGE}\n")
+    print(f"{'storage':<10}{'rows':>12}{'column':>14}{'bytes/row':>11}{'index':>14}")
+    for storage in ('vector', 'halfvec', 'binary'):
+        row = stats[storage]
+        per_row = row['column_bytes'] / row['rows'] if row['rows'] else 0
+        print(f"{storage:<10}{row['rows']:>12}{_megabytes(row['column_bytes']):>14}"
+              f"{per_row:>11.0f}{_megabytes(row['index_bytes']):>14}")
+    return 0
+
+
+async def _embed_missing(limit: int):
+    from database.async_db import async_engine
+    from services.embedding_pipeline import create_embedding_pipeline
+
+    pipeline = create_embedding_pipeline()
+    await pipeline.start(sweep=False)
+    try:
+        while pipeline.stats()['turns_embedded'] < limit:
+            embedded_before = pipeline.stats()['turns_embedded']
+            if not await pipeline.sweep():
+                break
+            await pipeline.drain()
+            # Every batch of this pass failed; retrying would loop forever
+            if pipeline.stats()['turns_embedded'] == embedded_before:
+                break
+    finally:
+        await pipeline.stop()
+        await async_engine.dispose()
+    return pipeline.stats()
+
+
+def embed_command(db, args) -> int:
+    start = time.perf_counter()
+    stats = asyncio.run(_embed_missing(args.limit))
+    elapsed = time.perf_counter() - start
+
+    print(f"{'embedder':<18}{stats['embedder']}")
+    for key in ('turns_embedded', 'batches', 'failed_batches', 'avg_batch_size',
+                'avg_embed_ms', 'avg_write_ms', 'turns_per_second'):
+        print(f"{key:<18}{stats[key]}")
+    print(f"\n✅ Embedded {stats['turns_embedded']} turn(s) in {elapsed:.1f} s")
+    return 1 if stats['failed_batches'] else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Embed chat turns and move embeddings between storage modes.',
+        epilog='Example: python embeddings.py backfill'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('status', help='Embedding counts and sizes per storage mode').set_defaults(
+        func=status_command)
+
+    for name, help_text in (
+        ('backfill', 'Copy float32 embeddings into embedding_half'),
+        ('compact', 'Clear float32 embeddings that have a half-precision copy'),
+    ):
+        command_parser = subparsers.add_parser(name, help=help_text)
+        command_parser.set_defaults(func=rewrite_command)
+        command_parser.add_argument('--batch-size', type=int, default=1000,
+                                    help='Rows updated per transaction')
+        command_parser.add_argument('--pause-ms', type=int, default=50,
+                                    help='Pause between batches')
+
+    embed_parser = subparsers.add_parser(
+        'embed', help='Embed chat turns that have no embedding, with the configured EMBEDDER')
+    embed_parser.set_defaults(func=embed_command)
+    embed_parser.add_argument('--limit', type=int, default=100000,
+                              help='Stop after roughly this many turns')
+
+    args = parser.parse_args()
+
+    from database.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        sys.exit(args.func(db, args))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Inspect and replay the write-behind outbox in OUTBOX_DIR.
+
+Usage:
+    python scripts/outbox.py status
+    python scripts/outbox.py flush
+    python scripts/outbox.py retry-failed
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Make the api packages importable when run as scripts/outbox.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def status_command(args) -> int:
+    from core.config import settings
+    from services.outbox_flusher import outbox_flusher
+
+    stats = outbox_flusher.outbox.stats()
+    print(f"OUTBOX_DIR: {os.path.abspath(settings.OUTBOX_DIR)} (fsync: {stats['fsync_policy']})\n")
+    for key in ('pending_segments', 'pending_bytes', 'oldest_pending_seconds', 'failed_segments'):
+        print(f"{key:<24}{stats[key]}")
+    return 0
+
+
+async def _flush():
+    from database.async_db import async_engine
+    from services.outbox_flusher import outbox_flusher
+
+    try:
+        return await outbox_flusher.flush(), outbox_flusher.stats()
+    finally:
+        await async_engine.dispose()
+
+
+def flush_command(args) -> int:
+    start = time.perf_counter()
+    written, stats = asyncio.run(_flush())
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ Wrote {written} record(s) in {stats['batches']} batch(es), {elapsed:.1f} s")
+    if stats['rejected_records']:
+        print(f"⚠️  {stats['rejected_records']} record(s) rejected by the database, "
+              f"moved to failed/: {stats['last_error']}")
+    if stats['pending_segments']:
+        print(f"ℹ️  {stats['pending_segments']} segment(s) still pending: "
+              "being written by a running worker, or claimed by another flusher")
+    return 1 if stats['rejected_records'] else 0
+
+
+def retry_failed_command(args) -> int:
+    from services.outbox_flusher import outbox_flusher
+
+    outbox = outbox_flusher.outbox
+    try:
+        names = sorted(os.listdir(outbox.failed_directory))
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        os.replace(os.path.join(outbox.failed_directory, name), os.path.join(outbox.directory, name))
+    print(f"✅ Moved {len(names)} file(s) of failed records back; the next flush retries them")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Inspect and replay the write-behind outbox.',
+        epilog='Example: python outbox.py flush'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('status', help='Pending and failed segments').set_defaults(
+        func=status_command)
+    subparsers.add_parser(
+        'flush', help='Write every unclaimed segment to the database, e.g. after a crash'
+    ).set_defaults(func=flush_command)
+    subparsers.add_parser(
+        'retry-failed', help='Move records the database rejected back into the outbox'
+    ).set_defaults(func=retry_failed_command)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
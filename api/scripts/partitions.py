@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Partition maintenance for chat_turns, which is range-partitioned by month.
+
+Usage:
+    python scripts/partitions.py list
+    python scripts/partitions.py create --months-ahead 3
+    python scripts/partitions.py retention --retention-months 12 --dry-run
+    python scripts/partitions.py maintain
+"""
+
+import argparse
+import os
+import sys
+
+# Make the api packages importable when run as scripts/partitions.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _check_default_partition(conn) -> int:
+    """Report rows in the DEFAULT partition; 1 if there are any"""
+    from database.partitions import (
+        default_partition_rows, default_partition_name, CHAT_TURNS_TABLE, DEFAULT_PARTITION_COUNT_LIMIT)
+
+    name = default_partition_name(CHAT_TURNS_TABLE)
+    rows = default_partition_rows(conn)
+    if rows is None:
+        print(f"⚠️  {name} is missing; `create` adds it")
+        return 1
+    if rows:
+        more = "+" if rows >= DEFAULT_PARTITION_COUNT_LIMIT else ""
+        print(f"⚠️  {name} holds {rows}{more} row(s) outside every monthly partition. "
+              "Retention never drops them, and they block creating their month's partition.")
+        return 1
+    print(f"   {name:<24} empty")
+    return 0
+
+
+def list_command(conn, args) -> int:
+    from database.partitions import list_partitions
+
+    partitions = list_partitions(conn)
+    if not partitions:
+        print("chat_turns has no partitions (is the partitioning migration applied?)")
+        return 1
+    for partition in partitions:
+        print(f"   {partition.name:<24} {partition.start} to {partition.end}")
+    return _check_default_partition(conn)
+
+
+def create_command(conn, args) -> int:
+    from database.partitions import ensure_partitions
+
+    created = ensure_partitions(conn, months_ahead=args.months_ahead)
+    if created:
+        print(f"✅ Created {len(created)} partition(s): {', '.join(created)}")
+    else:
+        print("✅ All upcoming partitions already exist")
+    return 0
+
+
+def retention_command(conn, args) -> int:
+    from database.partitions import drop_expired_partitions, expired_partitions, list_partitions
+    from core.config import settings
+
+    retention_months = (settings.CHAT_RETENTION_MONTHS
+                        if args.retention_months is None else args.retention_months)
+    if retention_months <= 0:
+        print("ℹ️  Retention is disabled (retention months = 0)")
+        return 0
+
+    if args.dry_run:
+        expired = expired_partitions(list_partitions(conn), retention_months)
+        print(f"Would drop {len(expired)} partition(s) older than {retention_months} months:")
+        for partition in expired:
+            print(f"   {partition.name:<24} {partition.start} to {partition.end}")
+        return 0
+
+    dropped = drop_expired_partitions(conn, retention_months=retention_months)
+    print(f"✅ Dropped {len(dropped)} expired partition(s)"
+          + (f": {', '.join(dropped)}" if dropped else ""))
+    return 0
+
+
+def maintain_command(conn, args) -> int:
+    # Exits 1 when the DEFAULT partition has rows, so cron reports it
+    return (create_command(conn, args) or retention_command(conn, args)
+            or _check_default_partition(conn))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Create upcoming chat_turns partitions and drop expired ones.',
+        epilog='Example: python partitions.py maintain'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('list', help='List chat_turns partitions').set_defaults(func=list_command)
+
+    for name, func, help_text in (
+        ('create', create_command, 'Create partitions for the coming months'),
+        ('retention', retention_command, 'Detach and drop partitions past the retention window'),
+        ('maintain', maintain_command, 'Run create and then retention (for a daily cron job)'),
+    ):
+        command_parser = subparsers.add_parser(name, help=help_text)
+        command_parser.set_defaults(func=func)
+        if name in ('create', 'maintain'):
+            command_parser.add_argument('--months-ahead', type=int, default=None,
+                                        help='Months to create beyond the current one '
+                                             '(default: CHAT_PARTITION_MONTHS_AHEAD)')
+        if name in ('retention', 'maintain'):
+            command_parser.add_argument('--retention-months', type=int, default=None,
+                                        help='Months kept before the current one '
+                                             '(default: CHAT_RETENTION_MONTHS, 0 keeps everything)')
+            command_parser.add_argument('--dry-run', action='store_true',
+                                        help='Only list the partitions that would be dropped')
+
+    args = parser.parse_args()
+
+    from database.db import engine
+    from database.partitions import maintenance_connection
+
+    with maintenance_connection(engine) as conn:
+        sys.exit(args.func(conn, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Batched purge worker for deleted profiles and per-user chat retention.
+
+Usage:
+    python scripts/purge.py run --max-runtime 600
+    python scripts/purge.py enqueue --profile-id <uuid>
+    python scripts/purge.py status
+"""
+
+import argparse
+import os
+import sys
+import uuid
+
+# Make the api packages importable when run as scripts/purge.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run_command(db, args) -> int:
+    from services.purge_service import PurgeService
+
+    service = PurgeService(db, batch_size=args.batch_size,
+                           batch_timeout_ms=args.batch_timeout_ms, max_runtime=args.max_runtime)
+    results = service.run()
+    if not results:
+        print("✅ Nothing to purge")
+        return 0
+
+    print(f"{'job':<50} {'table':<20} {'rows':>9} {'batches':>8} {'timeouts':>9} "
+          f"{'rows/s':>10}  outcome")
+    for result in results:
+        print(f"{result.job:<50} {result.table:<20} {result.rows:>9} {result.batches:>8} "
+              f"{result.timeouts:>9} {result.rows_per_second:>10.1f}  {result.outcome}")
+
+    total_rows = sum(result.rows for result in results)
+    total_seconds = sum(result.seconds for result in results)
+    rate = total_rows / total_seconds if total_seconds else 0.0
+    print(f"\nDeleted {total_rows} row(s) in {total_seconds:.2f} s of batch time ({rate:.1f} rows/s)")
+    unfinished = [result for result in results if result.outcome != "done"]
+    if unfinished:
+        print(f"ℹ️  {len(unfinished)} target(s) unfinished; the next run resumes from their checkpoints")
+    return 0
+
+
+def enqueue_command(db, args) -> int:
+    from services.purge_service import PurgeService
+
+    PurgeService(db).request_profile_purge(args.profile_id)
+    print(f"✅ Queued profile {args.profile_id} for purging")
+    return 0
+
+
+def status_command(db, args) -> int:
+    from datastores.purge_datastore import PurgeDatastore
+
+    datastore = PurgeDatastore(db)
+    pending = datastore.pending_profile_purges()
+    print(f"Pending profile purges: {len(pending)}")
+    for profile_id in pending:
+        print(f"   {profile_id}")
+
+    checkpoints = datastore.checkpoints()
+    print(f"\nCheckpoints: {len(checkpoints)}")
+    for checkpoint in checkpoints:
+        state = "done" if checkpoint.done else f"cursor {checkpoint.cursor}"
+        print(f"   {checkpoint.job:<50} {checkpoint.target:<20} "
+              f"{checkpoint.rows_deleted:>9} rows  {state}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Delete purged profiles and chat past per-user retention in small batches.',
+        epilog='Example: python purge.py run --max-runtime 600'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Process pending purges and per-user retention')
+    run_parser.set_defaults(func=run_command)
+    run_parser.add_argument('--batch-size', type=int, default=None,
+                            help='Rows per batch (default: PURGE_BATCH_SIZE)')
+    run_parser.add_argument('--batch-timeout-ms', type=int, default=None,
+                            help='Statement timeout per batch (default: PURGE_BATCH_TIMEOUT_MS)')
+    run_parser.add_argument('--max-runtime', type=float, default=None,
+                            help='Stop starting new batches after this many seconds')
+
+    enqueue_parser = subparsers.add_parser('enqueue', help='Queue a profile for deletion')
+    enqueue_parser.set_defaults(func=enqueue_command)
+    enqueue_parser.add_argument('--profile-id', type=uuid.UUID, required=True,
+                                help='Profile whose data (and row) will be deleted')
+
+    subparsers.add_parser('status', help='Show pending purges and checkpoints').set_defaults(
+        func=status_command)
+
+    args = parser.parse_args()
+
+    from database.db import SessionLocal
+
+    # The owner connection bypasses RLS, which the worker needs to reach every profile
+    db = SessionLocal()
+    try:
+        sys.exit(args.func(db, args))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Rebuild and check the mood rollups behind the caregiver dashboard.
+
+Usage:
+    python scripts/rollups.py rebuild
+    python scripts/rollups.py rebuild --profile-id <uuid>
+    python scripts/rollups.py verify --profiles 100
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Make the api packages importable when run as scripts/rollups.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def rebuild_command(db, args) -> int:
+    from datastores.rollup_datastore import RollupDatastore
+
+    datastore = RollupDatastore(db)
+    start = time.perf_counter()
+    profiles = rows = 0
+
+    batch = args.profile_id or datastore.profile_ids_after(None, args.batch_size)
+    while batch:
+        # One short transaction per batch, so session writes wait for at most one batch
+        rows += datastore.rebuild(batch)
+        profiles += len(batch)
+        print(f"   {profiles} profile(s), {rows} rollup row(s)", end="\r")
+        batch = [] if args.profile_id else datastore.profile_ids_after(batch[-1], args.batch_size)
+
+    print(f"✅ Rebuilt {rows} rollup row(s) for {profiles} profile(s) "
+          f"in {time.perf_counter() - start:.1f} s")
+    return 0
+
+
+def verify_command(db, args) -> int:
+    from sqlalchemy import text
+    from datastores.rollup_datastore import RollupDatastore, GRANULARITIES
+    from services.dashboard_service import period_start
+
+    datastore = RollupDatastore(db)
+    profile_ids = args.profile_id or [row[0] for row in db.execute(
+        text("SELECT id FROM profiles ORDER BY random() LIMIT :limit"), {"limit": args.profiles})]
+    today = datetime.now(timezone.utc).date()
+
+    drifted = []
+    for profile_id in profile_ids:
+        for granularity in GRANULARITIES:
+            until = period_start(today, granularity)
+            since = period_start(today - timedelta(days=args.days), granularity)
+            stored = [tuple(row) for row in datastore.mood_trend(profile_id, granularity, since, until)]
+            live = [tuple(row) for row in datastore.live_mood_trend(profile_id, granularity, since, until)]
+            if stored != live:
+                drifted.append((profile_id, granularity))
+    db.rollback()
+
+    if not drifted:
+        print(f"✅ Rollups match the sessions for {len(profile_ids)} profile(s) "
+              f"over the last {args.days} days")
+        return 0
+    print(f"⚠️  {len(drifted)} rollup series differ from the sessions:")
+    for profile_id, granularity in drifted:
+        print(f"   {profile_id} ({granularity})")
+    print("Fix with: python run.py rollups rebuild --profile-id <uuid>")
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Rebuild and check the mood rollups behind the caregiver dashboard.',
+        epilog='Example: python rollups.py rebuild --batch-size 500'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    rebuild_parser = subparsers.add_parser(
+        'rebuild', help='Recompute rollups from the sessions, e.g. to backfill or repair them')
+    rebuild_parser.set_defaults(func=rebuild_command)
+    rebuild_parser.add_argument('--profile-id', type=uuid.UUID, action='append',
+                                help='Only rebuild this profile (repeatable; default: every profile)')
+    rebuild_parser.add_argument('--batch-size', type=int, default=500,
+                                help='Profiles rebuilt per transaction')
+
+    verify_parser = subparsers.add_parser(
+        'verify', help='Compare rollups with an on-the-fly aggregation of the sessions')
+    verify_parser.set_defaults(func=verify_command)
+    verify_parser.add_argument('--profile-id', type=uuid.UUID, action='append',
+                               help='Check this profile (repeatable; default: a random sample)')
+    verify_parser.add_argument('--profiles', type=int, default=100,
+                               help='Size of the random sample of profiles')
+    verify_parser.add_argument('--days', type=int, default=365,
+                               help='How far back to compare')
+
+    args = parser.parse_args()
+
+    from database.db import SessionLocal
+
+    # The owner connection bypasses RLS, so every profile's sessions are visible
+    db = SessionLocal()
+    try:
+        sys.exit(args.func(db, args))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.cache import LayeredCache, create_cache_backend
+from core.config import settings
+from database.models import Profile
+from database.routing import is_replica_session
+from datastores.profile_datastore import ProfileDatastore
+from datastores.async_profile_datastore import AsyncProfileDatastore
+from typing import Optional, Iterable, Dict, Any, FrozenSet, Set, Union
+from uuid import UUID
+
+# Session.info keys: mappings already loaded by this session (i.e. this
+# request), and users whose mapping changes when the transaction commits
+_REQUEST_CACHE_KEY = "accessible_profile_ids"
+_PENDING_INVALIDATIONS_KEY = "access_index_pending_invalidations"
+
+
+def _normalize_id(value: Union[str, UUID]) -> Optional[str]:
+    """Canonical string form of a UUID, or None if it isn't one"""
+    try:
+        return str(value if isinstance(value, UUID) else UUID(str(value)))
+    except ValueError:
+        return None
+
+
+class AccessIndex:
+    """
+    user ID -> IDs of the profiles the user can access (their own profile and
+    every profile they manage as caregiver), so access checks are set lookups.
+
+    A mapping is loaded with one narrow query, then remembered on the session
+    for the rest of the request and in a LayeredCache across requests.
+    Mappings read from a replica are not cached across requests, since the
+    replica may not have seen a revocation yet. Changes to
+    profiles.caregiver_id made through the ORM invalidate the affected users
+    when the transaction commits; bulk UPDATEs that bypass the ORM must call
+    invalidate() themselves, or wait out the (short) TTLs in the settings.
+    """
+
+    def __init__(self, cache: Optional[LayeredCache]):
+        self.cache = cache
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache is not None
+
+    @staticmethod
+    def _request_cache(db: Union[Session, AsyncSession]) -> Dict[str, FrozenSet[str]]:
+        return db.info.setdefault(_REQUEST_CACHE_KEY, {})
+
+    def get(self, db: Session, user_id: Union[str, UUID]) -> FrozenSet[str]:
+        """IDs of every profile the user can access"""
+        key = _normalize_id(user_id)
+        if key is None:
+            return frozenset()
+
+        request_cache = self._request_cache(db)
+        ids = request_cache.get(key)
+        if ids is not None:
+            return ids
+
+        cached = self.cache.get(key) if self.cache else None
+        if cached is None:
+            cached = [str(profile_id) for profile_id in
+                      ProfileDatastore(db).get_accessible_ids(UUID(key))]
+            if self.cache and not is_replica_session(db):
+                self.cache.set(key, cached)
+
+        ids = request_cache[key] = frozenset(cached)
+        return ids
+
+    async def aget(self, db: AsyncSession, user_id: Union[str, UUID]) -> FrozenSet[str]:
+        """IDs of every profile the user can access"""
+        key = _normalize_id(user_id)
+        if key is None:
+            return frozenset()
+
+        request_cache = self._request_cache(db)
+        ids = request_cache.get(key)
+        if ids is not None:
+            return ids
+
+        cached = await self.cache.aget(key) if self.cache else None
+        if cached is None:
+            cached = [str(profile_id) for profile_id in
+                      await AsyncProfileDatastore(db).get_accessible_ids(UUID(key))]
+            if self.cache and not is_replica_session(db):
+                await self.cache.aset(key, cached)
+
+        ids = request_cache[key] = frozenset(cached)
+        return ids
+
+    @staticmethod
+    def check_many(accessible_ids: FrozenSet[str],
+                   profile_ids: Iterable[Union[str, UUID]]) -> Dict[str, bool]:
+        """profile ID -> whether it is in accessible_ids, for many IDs at once"""
+        return {str(profile_id): _normalize_id(profile_id) in accessible_ids
+                for profile_id in profile_ids}
+
+    def invalidate(self, user_id: Union[str, UUID]):
+        key = _normalize_id(user_id)
+        if self.cache and key is not None:
+            self.cache.invalidate(key)
+
+    async def ainvalidate(self, user_id: Union[str, UUID]):
+        key = _normalize_id(user_id)
+        if self.cache and key is not None:
+            await self.cache.ainvalidate(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats() if self.cache else {"enabled": False}
+
+
+access_index = AccessIndex(
+    LayeredCache(
+        namespace="access",
+        max_entries=settings.ACCESS_INDEX_MAX_ENTRIES,
+        ttl=settings.ACCESS_INDEX_TTL_SECONDS,
+        backend=create_cache_backend(settings.CACHE_BACKEND_URL),
+        shared_ttl=settings.ACCESS_INDEX_SHARED_TTL_SECONDS,
+    ) if settings.ACCESS_INDEX_ENABLED else None
+)
+
+
+# Invalidation. Registered with active_history so the previous caregiver is
+# loaded when caregiver_id is reassigned and can be invalidated too.
+@event.listens_for(Profile.caregiver_id, "set", active_history=True)
+def _load_previous_caregiver(target, value, oldvalue, initiator):
+    pass
+
+
+def _affected_users(profile: Profile, include_history: bool) -> Set[str]:
+    users = {profile.id}
+    if include_history:
+        history = inspect(profile).attrs.caregiver_id.history
+        if not history.has_changes():
+            return set()
+        users.update(history.added)
+        users.update(history.deleted)
+    else:
+        users.add(profile.caregiver_id)
+    return {str(user_id) for user_id in users if user_id is not None}
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_access_changes(session, flush_context, instances):
+    affected: Set[str] = set()
+    for obj in session.new | session.deleted:
+        if isinstance(obj, Profile):
+            affected |= _affected_users(obj, include_history=False)
+    for obj in session.dirty:
+        if isinstance(obj, Profile):
+            affected |= _affected_users(obj, include_history=True)
+
+    if affected:
+        session.info.setdefault(_PENDING_INVALIDATIONS_KEY, set()).update(affected)
+        # Later checks in this transaction must see the change
+        session.info.pop(_REQUEST_CACHE_KEY, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_access_changes(session):
+    affected = session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
+    if not affected:
+        return
+    session.info.pop(_REQUEST_CACHE_KEY, None)
+    for user_id in affected:
+        access_index.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_access_changes(session):
+    session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
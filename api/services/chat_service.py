@@ -0,0 +1,120 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from database.partitions import chat_turn_window
+from database.routing import replica_router
+from datastores.async_chat_datastore import AsyncChatDatastore
+from datastores.chat_datastore import ChatTurnRow, SessionActivityRow, SessionMoodRow, ordered_turns
+from services.embedding_pipeline import embedding_pipeline
+from services.outbox_flusher import outbox_flusher, OutboxRow
+from schemas.chat import (
+    ChatTurnBatch, ChatTurnBatchResponse, IngestedTurn, ActivityResultCreate,
+    ActivityResultResponse, MoodUpdate, MoodResponse)
+from sqlalchemy.engine import Row
+from typing import Optional, List
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+import uuid
+
+
+def batch_rows(session_id: UUID, batch: ChatTurnBatch, received_at: datetime,
+               session_start: datetime) -> List[ChatTurnRow]:
+    """
+    Rows for a batch of turns. Turns without a timestamp get the time the
+    batch was received (or the session start, if the client's clock put
+    that later), a microsecond apart in request order, so they stay in the
+    order they were sent.
+    """
+    default_time = max(received_at, session_start)
+    return [
+        ChatTurnRow(uuid.uuid4(), session_id,
+                    (turn.timestamp.astimezone(timezone.utc) if turn.timestamp
+                     else default_time + timedelta(microseconds=index)),
+                    turn.speaker, turn.message, turn.audio_url)
+        for index, turn in enumerate(batch.turns)
+    ]
+
+
+def check_turn_times(rows: List[ChatTurnRow], received_at: datetime, session_start: datetime):
+    """
+    Raise ValueError if a turn's timestamp is outside the chat_turn_window,
+    so the batch is refused up front rather than failing in the database
+    (or after being queued in the outbox), or before its session started,
+    where the transcript's partition bound would never find it.
+    """
+    oldest, newest = chat_turn_window(received_at)
+    for row in rows:
+        if row.timestamp < session_start:
+            raise ValueError(f"Turn timestamp {row.timestamp.isoformat()} is before the "
+                             f"session started ({session_start.isoformat()})")
+        if row.timestamp < oldest:
+            raise ValueError(f"Turn timestamp {row.timestamp.isoformat()} is older than "
+                             f"the oldest month accepted ({oldest.date()})")
+        if row.timestamp > newest:
+            raise ValueError(f"Turn timestamp {row.timestamp.isoformat()} is in the future")
+
+
+class AsyncChatService:
+    """Service layer for chat turns - conversation writes, direct or through the outbox"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.chat_datastore = AsyncChatDatastore(db)
+
+    async def session_bounds(self, session_id: UUID) -> Optional[Row]:
+        """(profile_id, start_time) of a session, or None if there is no such session"""
+        return await self.chat_datastore.get_session_bounds(session_id)
+
+    async def _save(self, user_id: UUID, rows: List[OutboxRow]) -> bool:
+        """
+        Write rows to the outbox when it is enabled (returning as soon as the
+        append completes), otherwise straight to the database. Returns True
+        if they were queued in the outbox.
+        """
+        replica_router.mark_write(str(user_id))
+        if settings.OUTBOX_ENABLED:
+            await outbox_flusher.append(rows)
+            return True
+
+        for row in rows:
+            if isinstance(row, ChatTurnRow):
+                self.chat_datastore.add(row)
+            elif isinstance(row, SessionActivityRow):
+                self.chat_datastore.add_activity(row)
+            else:
+                self.chat_datastore.set_mood(row)
+        turns = await self.chat_datastore.flush()
+        if embedding_pipeline.running:
+            for turn in turns:
+                embedding_pipeline.enqueue(turn.id, turn.timestamp, turn.message)
+        return False
+
+    async def ingest_turns(self, user_id: UUID, session_id: UUID, session_start: datetime,
+                           batch: ChatTurnBatch) -> ChatTurnBatchResponse:
+        """
+        Save a batch of turns in timestamp order, in one statement or one
+        outbox append. Raises ValueError for a timestamp the table can't take.
+        """
+        received_at = datetime.now(timezone.utc)
+        rows = ordered_turns(batch_rows(session_id, batch, received_at, session_start))
+        check_turn_times(rows, received_at, session_start)
+        queued = await self._save(user_id, rows)
+        return ChatTurnBatchResponse(
+            session_id=session_id,
+            turns=[IngestedTurn(id=row.id, timestamp=row.timestamp) for row in rows],
+            queued=queued,
+        )
+
+    async def record_activity(self, user_id: UUID, session_id: UUID,
+                              result: ActivityResultCreate) -> ActivityResultResponse:
+        """Save an activity result; an existing id replaces that result"""
+        row = SessionActivityRow(result.id or uuid.uuid4(), session_id, result.activity_id,
+                                 result.start_time, result.end_time, result.score, result.results)
+        queued = await self._save(user_id, [row])
+        return ActivityResultResponse(id=row.id, session_id=session_id, queued=queued)
+
+    async def update_mood(self, user_id: UUID, session_id: UUID, mood: MoodUpdate) -> MoodResponse:
+        """Set the session's mood score and notes, unless a mood received later is already stored"""
+        row = SessionMoodRow(session_id, mood.mood_score, mood.mood_notes, datetime.now(timezone.utc))
+        queued = await self._save(user_id, [row])
+        return MoodResponse(session_id=session_id, mood_score=mood.mood_score,
+                            mood_notes=mood.mood_notes, queued=queued)
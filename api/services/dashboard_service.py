@@ -0,0 +1,80 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import Row
+from datastores.async_rollup_datastore import AsyncRollupDatastore
+from datastores.rollup_datastore import GRANULARITIES
+from schemas.dashboard import TimeOfDayMood, MoodTrendPoint, MoodTrend
+from typing import Optional, List
+from datetime import date, datetime, timedelta, timezone
+from itertools import groupby
+from uuid import UUID
+
+# Periods shown when the caller doesn't give a start
+DEFAULT_PERIODS = {"day": 30, "week": 12}
+
+# Longest range one request may read
+MAX_PERIODS = {"day": 366, "week": 104}
+
+
+def period_start(day: date, granularity: str) -> date:
+    """Start of the period `day` falls in: the day itself, or the Monday of its week"""
+    return day if granularity == "day" else day - timedelta(days=day.weekday())
+
+
+def _average(total: int, count: int) -> Optional[float]:
+    return round(total / count, 2) if count else None
+
+
+def trend_points(rows: List[Row]) -> List[MoodTrendPoint]:
+    """Fold rollup rows (ordered by period, one per time of day) into one point per period"""
+    points = []
+    for start, period_rows in groupby(rows, key=lambda row: row.period_start):
+        period_rows = list(period_rows)
+        rated = sum(row.rated_sessions for row in period_rows)
+        timed = sum(row.timed_sessions for row in period_rows)
+        duration = sum(row.duration_sum for row in period_rows)
+        points.append(MoodTrendPoint(
+            period_start=start,
+            sessions=sum(row.sessions for row in period_rows),
+            rated_sessions=rated,
+            average_mood=_average(sum(row.mood_sum for row in period_rows), rated),
+            total_duration=duration,
+            average_duration=_average(duration, timed),
+            by_time_of_day=[
+                TimeOfDayMood(time_of_day=row.time_of_day, sessions=row.sessions,
+                              average_mood=_average(row.mood_sum, row.rated_sessions))
+                for row in period_rows
+            ],
+        ))
+    return points
+
+
+class AsyncDashboardService:
+    """
+    Service layer for the caregiver dashboard. Mood trends read the
+    mood_rollups rows a trigger on sessions keeps current, so a trend costs
+    one row per period and time of day however many sessions it covers.
+    Raises ValueError for an unknown granularity or an invalid range.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.rollup_datastore = AsyncRollupDatastore(db)
+
+    async def mood_trend(self, profile_id: UUID, granularity: str,
+                         since: Optional[date] = None, until: Optional[date] = None) -> MoodTrend:
+        """A profile's mood, session count and duration per day or week, oldest first"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+
+        step = timedelta(days=1 if granularity == "day" else 7)
+        until = period_start(until or datetime.now(timezone.utc).date(), granularity)
+        since = (period_start(since, granularity) if since
+                 else until - step * (DEFAULT_PERIODS[granularity] - 1))
+        if since > until:
+            raise ValueError("since must not be after until")
+        if (until - since) // step >= MAX_PERIODS[granularity]:
+            raise ValueError(f"at most {MAX_PERIODS[granularity]} {granularity}s per request")
+
+        rows = await self.rollup_datastore.mood_trend(profile_id, granularity, since, until)
+        return MoodTrend(profile_id=profile_id, granularity=granularity,
+                         since=since, until=until, points=trend_points(rows))
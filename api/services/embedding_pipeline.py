@@ -0,0 +1,211 @@
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from core.config import settings
+from core.embedder import Embedder, load_embedder
+from database.async_db import AsyncSessionLocal
+from database.models import EMBEDDING_DIMENSIONS
+from datastores.async_embedding_datastore import AsyncEmbeddingDatastore
+from datastores.embedding_datastore import embedding_columns
+from typing import Optional, List, NamedTuple, Set, Dict, Any
+from datetime import datetime
+from uuid import UUID
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PendingTurn(NamedTuple):
+    """A chat turn waiting to be embedded"""
+    id: UUID
+    timestamp: datetime
+    message: str
+    queued_at: float
+
+
+class EmbeddingPipeline:
+    """
+    Embeds chat turns in the background so the conversation path never waits
+    for the embedding model.
+
+    Turns are queued in memory and sent to the embedder in micro-batches: a
+    batch goes out when it has `batch_size` turns or its oldest turn has
+    waited `max_batch_age` seconds. Each batch is written back with a single
+    UPDATE. The queue is bounded; turns that don't fit (or whose batch fails,
+    or that were queued by a process that exited) still have no embedding,
+    and a periodic sweep queues them again. The sweep claims the turns it
+    queues for `claim_lease` seconds, so sweeps in other workers skip them.
+    """
+
+    def __init__(self, embedder: Embedder, session_factory: async_sessionmaker,
+                 columns: List[str], batch_size: int = 64, max_batch_age: float = 0.2,
+                 queue_max: int = 10000, sweep_interval: float = 60.0, sweep_limit: int = 1000,
+                 claim_lease: float = 600.0):
+        self.embedder = embedder
+        self.session_factory = session_factory
+        self.columns = columns
+        self.batch_size = batch_size
+        self.max_batch_age = max_batch_age
+        self.sweep_interval = sweep_interval
+        self.sweep_limit = sweep_limit
+        self.claim_lease = claim_lease
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_max)
+        # Queued or in-flight turn IDs, so the sweep doesn't queue them twice
+        self._pending: Set[UUID] = set()
+        self._tasks: List[asyncio.Task] = []
+
+        self._queued = 0
+        self._dropped = 0
+        self._swept = 0
+        self._batches = 0
+        self._failed_batches = 0
+        self._embedded = 0
+        self._last_batch_size = 0
+        self._embed_seconds = 0.0
+        self._write_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def enqueue(self, turn_id: UUID, timestamp: datetime, message: str) -> bool:
+        """Queue a turn for embedding without waiting. Returns False if it wasn't queued."""
+        if turn_id in self._pending:
+            return False
+        try:
+            self._queue.put_nowait(PendingTurn(turn_id, timestamp, message, time.monotonic()))
+        except asyncio.QueueFull:
+            # Left without an embedding; the sweep picks it up later
+            self._dropped += 1
+            return False
+        self._pending.add(turn_id)
+        self._queued += 1
+        return True
+
+    async def start(self, sweep: bool = True):
+        """Start the batching worker (and the periodic sweep) on the running loop"""
+        if self.running:
+            return
+        self._tasks.append(asyncio.create_task(self._run()))
+        if sweep:
+            self._tasks.append(asyncio.create_task(self._sweep_forever()))
+
+    async def stop(self):
+        """Stop the background tasks. Turns still queued are found by the next sweep."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def drain(self):
+        """Wait until every queued turn has been processed"""
+        await self._queue.join()
+
+    async def sweep(self) -> int:
+        """Claim and queue turns that have no embedding yet. Returns how many were queued."""
+        room = self._queue.maxsize - self._queue.qsize()
+        if room <= 0:
+            return 0
+        async with self.session_factory() as db:
+            rows = await AsyncEmbeddingDatastore(db).claim_missing(
+                min(self.sweep_limit, room), self.claim_lease)
+        queued = sum(self.enqueue(row.id, row.timestamp, row.message) for row in rows)
+        self._swept += queued
+        return queued
+
+    async def _sweep_forever(self):
+        while True:
+            try:
+                queued = await self.sweep()
+                if queued:
+                    logger.info(f"Queued {queued} chat turns missing embeddings")
+            except Exception as e:
+                logger.warning(f"Embedding sweep failed: {e}")
+            await asyncio.sleep(self.sweep_interval)
+
+    async def _next_batch(self) -> List[PendingTurn]:
+        """Up to batch_size turns, waiting at most until the oldest is max_batch_age old"""
+        batch = [await self._queue.get()]
+        deadline = batch[0].queued_at + self.max_batch_age
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._process(batch)
+            finally:
+                for turn in batch:
+                    self._pending.discard(turn.id)
+                    self._queue.task_done()
+
+    async def _process(self, batch: List[PendingTurn]):
+        start = time.perf_counter()
+        try:
+            embeddings = await self.embedder.embed([turn.message for turn in batch])
+            embedded = time.perf_counter()
+            async with self.session_factory() as db:
+                await AsyncEmbeddingDatastore(db).write_embeddings(
+                    [(turn.id, turn.timestamp, embedding)
+                     for turn, embedding in zip(batch, embeddings)],
+                    self.columns)
+        except Exception as e:
+            self._failed_batches += 1
+            logger.warning(f"Embedding batch of {len(batch)} turns failed: {e}")
+            return
+
+        self._batches += 1
+        self._embedded += len(batch)
+        self._last_batch_size = len(batch)
+        self._embed_seconds += embedded - start
+        self._write_seconds += time.perf_counter() - embedded
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, batch sizes and throughput for this worker"""
+        busy = self._embed_seconds + self._write_seconds
+        return {
+            "running": self.running,
+            "embedder": type(self.embedder).__name__,
+            "queue_depth": self._queue.qsize(),
+            "queued": self._queued,
+            "swept": self._swept,
+            "dropped": self._dropped,
+            "batches": self._batches,
+            "failed_batches": self._failed_batches,
+            "turns_embedded": self._embedded,
+            "last_batch_size": self._last_batch_size,
+            "avg_batch_size": round(self._embedded / self._batches, 1) if self._batches else 0.0,
+            "avg_embed_ms": round(self._embed_seconds * 1000 / self._batches, 2) if self._batches else 0.0,
+            "avg_write_ms": round(self._write_seconds * 1000 / self._batches, 2) if self._batches else 0.0,
+            # Turns per second of time spent embedding and writing
+            "turns_per_second": round(self._embedded / busy, 1) if busy else 0.0,
+        }
+
+
+def create_embedding_pipeline(embedder: Optional[Embedder] = None) -> EmbeddingPipeline:
+    """A pipeline configured from settings, writing to the primary database"""
+    return EmbeddingPipeline(
+        embedder or load_embedder(settings.EMBEDDER, EMBEDDING_DIMENSIONS),
+        AsyncSessionLocal,
+        embedding_columns(settings.EMBEDDING_STORAGE, settings.RECALL_FULL_PRECISION_RERANK),
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+        max_batch_age=settings.EMBEDDING_BATCH_MAX_AGE_MS / 1000,
+        queue_max=settings.EMBEDDING_QUEUE_MAX,
+        sweep_interval=settings.EMBEDDING_SWEEP_INTERVAL_SECONDS,
+        sweep_limit=settings.EMBEDDING_SWEEP_LIMIT,
+        claim_lease=settings.EMBEDDING_CLAIM_LEASE_SECONDS,
+    )
+
+
+embedding_pipeline = create_embedding_pipeline()
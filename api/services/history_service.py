@@ -0,0 +1,65 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import Row
+from core.pagination import encode_cursor, decode_cursor
+from datastores.async_history_datastore import AsyncHistoryDatastore
+from schemas.history import SessionSummary, SessionPage, HistoryTurn, TurnPage
+from typing import Optional
+from datetime import datetime
+from uuid import UUID
+
+
+class AsyncHistoryService:
+    """
+    Service layer for session and chat history. Pages are keyset-paginated:
+    the cursor is the (time, id) of the last row returned, so every page
+    costs the same number of queries however deep it is.
+    Raises ValueError for a cursor that wasn't issued by this service.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.history_datastore = AsyncHistoryDatastore(db)
+
+    async def session_bounds(self, session_id: UUID) -> Optional[Row]:
+        """(profile_id, start_time) of a session, or None if there is no such session"""
+        return await self.history_datastore.get_session_bounds(session_id)
+
+    async def list_sessions(self, profile_id: UUID, limit: int,
+                            cursor: Optional[str] = None) -> SessionPage:
+        """A page of the profile's sessions, newest first"""
+        before = decode_cursor(cursor) if cursor else None
+        # One extra row tells whether there is another page
+        sessions = await self.history_datastore.session_page(profile_id, limit + 1, before)
+        page = sessions[:limit]
+        return SessionPage(
+            sessions=[
+                SessionSummary(
+                    id=session.id,
+                    start_time=session.start_time,
+                    end_time=session.end_time,
+                    duration=session.duration,
+                    mood_score=session.mood_score,
+                    time_of_day=session.time_of_day,
+                    has_activity=session.has_activity,
+                    activity_type=session.activity_type,
+                    activity_name=session.activity.name if session.activity else None,
+                    topics=sorted(topic.name for topic in session.topics),
+                )
+                for session in page
+            ],
+            next_cursor=(encode_cursor(page[-1].start_time, page[-1].id)
+                         if len(sessions) > limit else None),
+        )
+
+    async def list_turns(self, session_id: UUID, session_start: datetime, limit: int,
+                         cursor: Optional[str] = None) -> TurnPage:
+        """A page of the session's turns, oldest first"""
+        after = decode_cursor(cursor) if cursor else None
+        turns = await self.history_datastore.turn_page(session_id, session_start, limit + 1, after)
+        page = turns[:limit]
+        return TurnPage(
+            session_id=session_id,
+            turns=[HistoryTurn.model_validate(turn) for turn in page],
+            next_cursor=(encode_cursor(page[-1].timestamp, page[-1].id)
+                         if len(turns) > limit else None),
+        )
@@ -0,0 +1,67 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from datastores.async_memory_datastore import AsyncMemoryDatastore
+from datastores.memory_datastore import reranks
+from schemas.memory import RecallRequest, RecalledTurn, RecallResponse
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMemoryService:
+    """Service layer for memory recall - finds past chat turns similar to a query embedding"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.memory_datastore = AsyncMemoryDatastore(db)
+
+    async def recall(self, request: RecallRequest) -> RecallResponse:
+        """
+        Top-k most similar past turns of the profile. The HNSW index filters
+        by profile after the graph search, so a small ef_search can come back
+        with fewer than k turns (iterative scans make that rare). A short
+        result is checked against a count of the profile's searchable turns
+        (capped at k), and only repeated exactly if the index missed some;
+        both are cheap because the profile filter uses its own index. A
+        relaxed_order scan can return turns slightly out of order, so they
+        are sorted by distance.
+        """
+        storage = settings.EMBEDDING_STORAGE
+        full_precision = settings.RECALL_FULL_PRECISION_RERANK
+        rerank_candidates = (request.k * settings.RECALL_RERANK_FACTOR
+                             if reranks(storage, full_precision) else 0)
+        # The index can't return more candidates than ef_search
+        ef_search = None if request.exact else max(
+            request.ef_search or settings.RECALL_EF_SEARCH, request.k, rerank_candidates)
+
+        rows = []
+        if not request.exact:
+            rows = await self.memory_datastore.recall(
+                request.profile_id, request.embedding, request.k, ef_search,
+                settings.RECALL_ITERATIVE_SCAN, request.since, storage=storage,
+                rerank_candidates=rerank_candidates, full_precision=full_precision)
+            rows.sort(key=lambda row: row.distance)
+        exact_reason = "requested" if request.exact else None
+        if not request.exact and len(rows) < request.k:
+            searchable = await self.memory_datastore.count_searchable(
+                request.profile_id, request.k, request.since, storage, full_precision)
+            # A profile with fewer than k turns has them all already
+            if searchable > len(rows):
+                exact_reason = "index_short"
+                logger.debug(f"HNSW recall returned {len(rows)} of {searchable} turns "
+                             f"(ef_search={ef_search}); falling back to exact search")
+        exact = exact_reason is not None
+        if exact:
+            rows = await self.memory_datastore.recall(
+                request.profile_id, request.embedding, request.k, ef_search,
+                since=request.since, exact=True, storage=storage, full_precision=full_precision)
+
+        return RecallResponse(
+            turns=[RecalledTurn.model_validate(row) for row in rows],
+            # No index search produced the turns an exact search served
+            ef_search=None if exact else ef_search,
+            exact=exact,
+            exact_reason=exact_reason,
+            storage=storage,
+            reranked=bool(rerank_candidates) and not exact,
+        )
@@ -0,0 +1,253 @@
+from sqlalchemy.exc import IntegrityError, DataError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from core.config import settings
+from core.outbox import Outbox, Segment
+from database.async_db import AsyncSessionLocal
+from datastores.async_chat_datastore import AsyncChatDatastore
+from datastores.chat_datastore import ChatTurnRow, SessionActivityRow, SessionMoodRow
+from services.embedding_pipeline import embedding_pipeline
+from typing import List, Dict, Any, Tuple, Union
+from datetime import datetime
+from uuid import UUID
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+OutboxRow = Union[ChatTurnRow, SessionActivityRow, SessionMoodRow]
+
+# Record kind -> row type
+OUTBOX_ROW_TYPES = {
+    "chat_turn": ChatTurnRow,
+    "session_activity": SessionActivityRow,
+    "session_mood": SessionMoodRow,
+}
+_RECORD_KINDS = {row_type: kind for kind, row_type in OUTBOX_ROW_TYPES.items()}
+_UUID_FIELDS = {"id", "session_id", "activity_id"}
+_TIME_FIELDS = {"timestamp", "start_time", "end_time", "received_at"}
+
+# The database will never accept these batches as they are
+_PERMANENT_ERRORS = (IntegrityError, DataError, KeyError, ValueError, TypeError)
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_record(row: OutboxRow) -> Dict[str, Any]:
+    """Outbox record (JSON-ready) for a row"""
+    return {"kind": _RECORD_KINDS[type(row)],
+            "row": {field: _encode(value) for field, value in row._asdict().items()}}
+
+
+def decode_record(record: Dict[str, Any]) -> OutboxRow:
+    """Row for an outbox record"""
+    values = {}
+    for field, value in record["row"].items():
+        if value is not None and field in _UUID_FIELDS:
+            value = UUID(value)
+        elif value is not None and field in _TIME_FIELDS:
+            value = datetime.fromisoformat(value)
+        values[field] = value
+    return OUTBOX_ROW_TYPES[record["kind"]](**values)
+
+
+class OutboxFlusher:
+    """
+    Drains the outbox into chat_turns, session_activities and sessions.
+
+    Every flush seals the current segment and writes sealed segments, oldest
+    first, in transactions of about `batch_size` records. A segment is deleted
+    only after its transaction commits. A crash in between means the segment
+    is written again on the next start, which the statements allow: turns
+    already present are skipped, and activity results and moods are
+    overwritten with the same values. When the database is unreachable, the
+    segments stay on disk and the flusher retries in order. When it rejects
+    a batch, the batch is split until the records at fault are isolated;
+    only those go to the outbox's failed/ directory, so one bad record
+    doesn't cost the other writes (other users' included) in its segment.
+    """
+
+    def __init__(self, outbox: Outbox, session_factory: async_sessionmaker,
+                 batch_size: int = 500, flush_interval: float = 0.25, fsync_interval: float = 0.1):
+        self.outbox = outbox
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self._tasks: List[asyncio.Task] = []
+
+        self._batches = 0
+        self._failed_batches = 0
+        self._rejected = 0
+        self._written = 0
+        self._write_seconds = 0.0
+        self._last_error = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def append(self, rows: List[OutboxRow]):
+        """Record writes in the outbox; they reach the database on a later flush"""
+        await self.outbox.append([encode_record(row) for row in rows])
+
+    async def start(self):
+        """Replay anything left from a previous run, then flush (and fsync) periodically"""
+        if self.running:
+            return
+        self._tasks.append(asyncio.create_task(self._flush_forever()))
+        if self.outbox.fsync_policy == "interval":
+            self._tasks.append(asyncio.create_task(self._sync_forever()))
+
+    async def stop(self):
+        """Stop the background tasks, then write out what is left if the database allows"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"Outbox not fully flushed on shutdown, it will be replayed: {e}")
+        self.outbox.close()
+
+    async def flush(self) -> int:
+        """
+        Seal the current segment and write every sealed segment to the
+        database. Returns the records written. Raises if the database fails
+        for a reason other than rejecting the data.
+        """
+        self.outbox.rotate()
+        segments = await asyncio.to_thread(self.outbox.claim)
+        written = 0
+        try:
+            while segments:
+                batch: List[Tuple[Segment, List[Dict[str, Any]]]] = []
+                records = 0
+                while segments and records < self.batch_size:
+                    segment = segments.pop(0)
+                    batch.append((segment, await asyncio.to_thread(self.outbox.read, segment)))
+                    records += len(batch[-1][1])
+                written += await self._write_batch(batch)
+        finally:
+            for segment in segments:
+                self.outbox.release(segment)
+        return written
+
+    async def _write_batch(self, batch: List[Tuple[Segment, List[Dict[str, Any]]]]) -> int:
+        """
+        Write a batch of segments, then delete them. Records the database
+        rejects are moved to failed/ and the rest are written. Segments are
+        released for a retry if the database fails for another reason.
+        """
+        records = [(segment, record) for segment, segment_records in batch for record in segment_records]
+        start = time.perf_counter()
+        try:
+            written, rejected = await self._write_isolating(records)
+        except BaseException as e:
+            for segment, _ in batch:
+                self.outbox.release(segment)
+            if not isinstance(e, asyncio.CancelledError):
+                self._failed_batches += 1
+                self._last_error = str(e)
+            raise
+
+        for segment, _ in batch:
+            segment_rejected = [record for rejected_segment, record in rejected
+                                if rejected_segment is segment]
+            if segment_rejected:
+                self.outbox.quarantine_records(segment, segment_rejected)
+            self.outbox.complete(segment)
+        self._batches += 1
+        self._written += written
+        self._rejected += len(rejected)
+        self._write_seconds += time.perf_counter() - start
+        return written
+
+    async def _write_isolating(self, records: List[Tuple[Segment, Dict[str, Any]]]
+                               ) -> Tuple[int, List[Tuple[Segment, Dict[str, Any]]]]:
+        """
+        Write records in one transaction. If the database rejects them, write
+        each half on its own, down to single records. Returns the number
+        written and the rejected (segment, record) pairs. Halves that already
+        committed are written again if a later half fails transiently, which
+        the statements allow.
+        """
+        try:
+            await self._write([decode_record(record) for _, record in records])
+            return len(records), []
+        except _PERMANENT_ERRORS as e:
+            if len(records) == 1:
+                segment, record = records[0]
+                self._last_error = str(e)
+                logger.error(f"Outbox record from {segment.path} was rejected and moved to failed/: "
+                             f"{record.get('kind')} {e}")
+                return 0, records
+            middle = len(records) // 2
+            first_written, first_rejected = await self._write_isolating(records[:middle])
+            second_written, second_rejected = await self._write_isolating(records[middle:])
+            return first_written + second_written, first_rejected + second_rejected
+
+    async def _write(self, rows: List[OutboxRow]):
+        async with self.session_factory() as db:
+            datastore = AsyncChatDatastore(db)
+            for row in rows:
+                if isinstance(row, ChatTurnRow):
+                    datastore.add(row)
+                elif isinstance(row, SessionActivityRow):
+                    datastore.add_activity(row)
+                else:
+                    datastore.set_mood(row)
+            turns = await datastore.flush()
+        if embedding_pipeline.running:
+            for turn in turns:
+                embedding_pipeline.enqueue(turn.id, turn.timestamp, turn.message)
+
+    async def _flush_forever(self):
+        while True:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Outbox flush failed, retrying: {e}")
+            await asyncio.sleep(self.flush_interval)
+
+    async def _sync_forever(self):
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            try:
+                await asyncio.to_thread(self.outbox.sync)
+            except Exception as e:
+                logger.error(f"Outbox fsync failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Outbox backlog and this worker's flush counters"""
+        return {
+            "running": self.running,
+            **self.outbox.stats(),
+            "batches": self._batches,
+            "failed_batches": self._failed_batches,
+            "rejected_records": self._rejected,
+            "records_written": self._written,
+            "avg_batch_ms": round(self._write_seconds * 1000 / self._batches, 2) if self._batches else 0.0,
+            "last_error": self._last_error,
+        }
+
+
+def create_outbox_flusher() -> OutboxFlusher:
+    """A flusher for the outbox in OUTBOX_DIR, writing to the primary database"""
+    return OutboxFlusher(
+        Outbox(settings.OUTBOX_DIR, settings.OUTBOX_FSYNC),
+        AsyncSessionLocal,
+        batch_size=settings.OUTBOX_BATCH_SIZE,
+        flush_interval=settings.OUTBOX_FLUSH_INTERVAL_MS / 1000,
+        fsync_interval=settings.OUTBOX_FSYNC_INTERVAL_MS / 1000,
+    )
+
+
+outbox_flusher = create_outbox_flusher()
@@ -0,0 +1,93 @@
+from core.cache import LayeredCache, create_cache_backend
+from core.config import settings
+from schemas.profile import ProfileResponse
+from typing import Optional, Sequence, Tuple, Dict, Any
+from uuid import UUID
+
+
+class ProfileCache:
+    """
+    Read-through cache of ProfileResponse payloads keyed by user ID.
+
+    set() stores the profile written by an update. fill() stores one that was
+    read, unless the cached copy has a later updated_at, so a read that
+    raced an update doesn't replace the newer profile. That check peeks at
+    the cache, so it isn't counted as a lookup in the hit/miss stats.
+    """
+
+    def __init__(self, cache: Optional[LayeredCache]):
+        self.cache = cache
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache is not None
+
+    @staticmethod
+    def _dump(profile: ProfileResponse) -> Dict[str, Any]:
+        return profile.model_dump(mode="json")
+
+    @staticmethod
+    def _is_older(profile: ProfileResponse, payload: Optional[Dict[str, Any]]) -> bool:
+        """Check if a cached payload is newer than the profile about to replace it"""
+        if payload is None or payload.get("updated_at") is None or profile.updated_at is None:
+            return False
+        return ProfileResponse.model_validate(payload).updated_at > profile.updated_at
+
+    @staticmethod
+    def status_of(payload: Dict[str, Any], required_fields: Sequence[str]) -> Tuple[bool, bool]:
+        """(exists, complete) for a cached profile payload"""
+        return True, all(payload.get(field) is not None for field in required_fields)
+
+    def get(self, user_id: UUID) -> Optional[ProfileResponse]:
+        payload = self.cache.get(user_id) if self.cache else None
+        return None if payload is None else ProfileResponse.model_validate(payload)
+
+    def get_status(self, user_id: UUID, required_fields: Sequence[str]) -> Optional[Tuple[bool, bool]]:
+        payload = self.cache.get(user_id) if self.cache else None
+        return None if payload is None else self.status_of(payload, required_fields)
+
+    def set(self, user_id: UUID, profile: ProfileResponse):
+        if self.cache:
+            self.cache.set(user_id, self._dump(profile))
+
+    def fill(self, user_id: UUID, profile: ProfileResponse):
+        if self.cache and not self._is_older(profile, self.cache.peek(user_id)):
+            self.cache.set(user_id, self._dump(profile))
+
+    def invalidate(self, user_id: UUID):
+        if self.cache:
+            self.cache.invalidate(user_id)
+
+    async def aget(self, user_id: UUID) -> Optional[ProfileResponse]:
+        payload = await self.cache.aget(user_id) if self.cache else None
+        return None if payload is None else ProfileResponse.model_validate(payload)
+
+    async def aget_status(self, user_id: UUID, required_fields: Sequence[str]) -> Optional[Tuple[bool, bool]]:
+        payload = await self.cache.aget(user_id) if self.cache else None
+        return None if payload is None else self.status_of(payload, required_fields)
+
+    async def aset(self, user_id: UUID, profile: ProfileResponse):
+        if self.cache:
+            await self.cache.aset(user_id, self._dump(profile))
+
+    async def afill(self, user_id: UUID, profile: ProfileResponse):
+        if self.cache and not self._is_older(profile, await self.cache.apeek(user_id)):
+            await self.cache.aset(user_id, self._dump(profile))
+
+    async def ainvalidate(self, user_id: UUID):
+        if self.cache:
+            await self.cache.ainvalidate(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats() if self.cache else {"enabled": False}
+
+
+profile_cache = ProfileCache(
+    LayeredCache(
+        namespace="profile",
+        max_entries=settings.PROFILE_CACHE_MAX_ENTRIES,
+        ttl=settings.PROFILE_CACHE_TTL_SECONDS,
+        backend=create_cache_backend(settings.CACHE_BACKEND_URL),
+        shared_ttl=settings.PROFILE_CACHE_SHARED_TTL_SECONDS,
+    ) if settings.PROFILE_CACHE_ENABLED else None
+)
@@ -1,10 +1,44 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from database.models import Profile
+from database.routing import replica_router, is_replica_session
 from datastores.profile_datastore import ProfileDatastore
-from schemas.profile import ProfileUpdate
-from typing import Optional
+from datastores.async_profile_datastore import AsyncProfileDatastore
+from datastores.async_purge_datastore import AsyncPurgeDatastore
+from services.purge_service import PurgeService
+from services.profile_cache import profile_cache
+from services.access_index import access_index
+from schemas.profile import ProfileUpdate, ProfileResponse
+from sqlalchemy.engine import Row
+from typing import Optional, Tuple, Dict, Any, Sequence
+from datetime import datetime
 from uuid import UUID
 
+# Fields that must be set before a profile counts as complete. The status
+# check turns this list into a single SQL expression, so new rules only need
+# to be added here. They must also be ProfileResponse fields so the status
+# can be answered from a cached profile.
+REQUIRED_PROFILE_FIELDS = ['dob']
+
+
+# Columns returned by a partial update, mapped straight into ProfileResponse
+PROFILE_RESPONSE_COLUMNS = [getattr(Profile, field)
+                            for field in ProfileResponse.model_fields]
+
+
+class ProfileVersionMismatch(Exception):
+    """The profile exists but no longer has the version the client expected"""
+
+
+def profile_update_values(profile_data: ProfileUpdate) -> Dict[str, Any]:
+    """Column values for the fields that were explicitly set on the request"""
+    return profile_data.model_dump(exclude_unset=True)
+
+
+def to_profile_response(row: Row) -> ProfileResponse:
+    """Build the API response from a row of PROFILE_RESPONSE_COLUMNS"""
+    return ProfileResponse.model_validate(dict(row._mapping))
+
 
 class ProfileService:
     """Service layer for Profile - handles business logic"""
@@ -13,26 +47,45 @@ class ProfileService:
         self.db = db
         self.profile_datastore = ProfileDatastore(db)
 
-    def get_profile(self, user_id: UUID) -> Optional[Profile]:
-        """Get a profile by user ID"""
-        return self.profile_datastore.get_by_id(user_id)
+    def get_profile(self, user_id: UUID) -> Optional[ProfileResponse]:
+        """
+        Get a profile by user ID, served from the profile cache when possible.
+        Only profiles read from the primary are added to the cache.
+        """
+        cached = profile_cache.get(user_id)
+        if cached is not None:
+            return cached
 
-    def update_profile(self, user_id: UUID, profile_data: ProfileUpdate) -> Optional[Profile]:
-        """Update an existing profile"""
-        db_profile = self.get_profile(user_id)
+        db_profile = self.profile_datastore.get_by_id(user_id)
         if not db_profile:
             return None
 
-        update_data = profile_data.model_dump(exclude_unset=True)
+        profile = ProfileResponse.model_validate(db_profile)
+        # A replica may not have replayed the latest update yet
+        if not is_replica_session(self.db):
+            profile_cache.fill(user_id, profile)
+        return profile
 
-        # Handle accessibility preferences separately
-        if 'accessibility_preferences' in update_data:
-            update_data['accessibility_preferences'] = update_data['accessibility_preferences']
-
-        for field, value in update_data.items():
-            setattr(db_profile, field, value)
+    def update_profile(self, user_id: UUID, profile_data: ProfileUpdate,
+                       expected_versions: Optional[Sequence[datetime]] = None) -> Optional[ProfileResponse]:
+        """
+        Update an existing profile with a single UPDATE ... RETURNING.
+        With expected_versions, only update if updated_at is still one of them;
+        raises ProfileVersionMismatch if the profile has changed since.
+        """
+        row = self.profile_datastore.update_fields(
+            user_id, profile_update_values(profile_data), PROFILE_RESPONSE_COLUMNS, expected_versions)
+        if row is None:
+            if expected_versions is not None and self.profile_datastore.exists(user_id):
+                # Whatever this worker cached is older than the client's copy
+                profile_cache.invalidate(user_id)
+                raise ProfileVersionMismatch()
+            return None
 
-        return self.profile_datastore.update(db_profile)
+        replica_router.mark_write(str(user_id))
+        profile = to_profile_response(row)
+        profile_cache.set(user_id, profile)
+        return profile
 
     def profile_exists(self, user_id: UUID) -> bool:
         """Check if a profile exists for the user"""
@@ -40,22 +93,111 @@ class ProfileService:
 
     def is_profile_complete(self, user_id: UUID) -> bool:
         """Check if a profile is complete (has all required fields)"""
-        profile = self.get_profile(user_id)
-        if not profile:
-            return False
+        return self.get_profile_status(user_id)[1]
 
-        # Check if required fields are present
-        required_fields = ['dob']
-        for field in required_fields:
-            if getattr(profile, field) is None:
-                return False
+    def get_profile_status(self, user_id: UUID) -> Tuple[bool, bool]:
+        """Return (exists, complete) for the user's profile from the cache or a single query"""
+        cached = profile_cache.get_status(user_id, REQUIRED_PROFILE_FIELDS)
+        if cached is not None:
+            return cached
 
-        return True
+        complete = self.profile_datastore.get_status(
+            user_id, REQUIRED_PROFILE_FIELDS)
+        return complete is not None, bool(complete)
 
     def delete_profile(self, user_id: UUID) -> bool:
-        """Delete a profile"""
-        db_profile = self.get_profile(user_id)
+        """
+        Queue the profile and all its data for deletion by the purge worker.
+        From then on the profile reads as missing, even before it is purged.
+        Returns False if there is no such profile.
+        """
+        if not self.profile_datastore.exists(user_id):
+            return False
+
+        PurgeService(self.db).request_profile_purge(user_id)
+        replica_router.mark_write(str(user_id))
+        profile_cache.invalidate(user_id)
+        access_index.invalidate(user_id)
+        return True
+
+
+class AsyncProfileService:
+    """Async service layer for Profile - same business logic as ProfileService on an AsyncSession"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.profile_datastore = AsyncProfileDatastore(db)
+
+    async def get_profile(self, user_id: UUID) -> Optional[ProfileResponse]:
+        """
+        Get a profile by user ID, served from the profile cache when possible.
+        Only profiles read from the primary are added to the cache.
+        """
+        cached = await profile_cache.aget(user_id)
+        if cached is not None:
+            return cached
+
+        db_profile = await self.profile_datastore.get_by_id(user_id)
         if not db_profile:
+            return None
+
+        profile = ProfileResponse.model_validate(db_profile)
+        # A replica may not have replayed the latest update yet
+        if not is_replica_session(self.db):
+            await profile_cache.afill(user_id, profile)
+        return profile
+
+    async def update_profile(self, user_id: UUID, profile_data: ProfileUpdate,
+                             expected_versions: Optional[Sequence[datetime]] = None) -> Optional[ProfileResponse]:
+        """
+        Update an existing profile with a single UPDATE ... RETURNING.
+        With expected_versions, only update if updated_at is still one of them;
+        raises ProfileVersionMismatch if the profile has changed since.
+        """
+        row = await self.profile_datastore.update_fields(
+            user_id, profile_update_values(profile_data), PROFILE_RESPONSE_COLUMNS, expected_versions)
+        if row is None:
+            if expected_versions is not None and await self.profile_datastore.exists(user_id):
+                # Whatever this worker cached is older than the client's copy
+                await profile_cache.ainvalidate(user_id)
+                raise ProfileVersionMismatch()
+            return None
+
+        replica_router.mark_write(str(user_id))
+        profile = to_profile_response(row)
+        await profile_cache.aset(user_id, profile)
+        return profile
+
+    async def profile_exists(self, user_id: UUID) -> bool:
+        """Check if a profile exists for the user"""
+        return await self.profile_datastore.exists(user_id)
+
+    async def is_profile_complete(self, user_id: UUID) -> bool:
+        """Check if a profile is complete (has all required fields)"""
+        return (await self.get_profile_status(user_id))[1]
+
+    async def get_profile_status(self, user_id: UUID) -> Tuple[bool, bool]:
+        """Return (exists, complete) for the user's profile from the cache or a single query"""
+        cached = await profile_cache.aget_status(user_id, REQUIRED_PROFILE_FIELDS)
+        if cached is not None:
+            return cached
+
+        complete = await self.profile_datastore.get_status(
+            user_id, REQUIRED_PROFILE_FIELDS)
+        return complete is not None, bool(complete)
+
+    async def delete_profile(self, user_id: UUID) -> bool:
+        """
+        Queue the profile and all its data for deletion by the purge worker
+        (the same request PurgeService.request_profile_purge makes).
+        From then on the profile reads as missing, even before it is purged.
+        Returns False if there is no such profile.
+        """
+        if not await self.profile_datastore.exists(user_id):
             return False
 
-        return self.profile_datastore.delete(db_profile)
+        await AsyncPurgeDatastore(self.db).enqueue_profile_purge(user_id)
+        replica_router.mark_write(str(user_id))
+        await profile_cache.ainvalidate(user_id)
+        await access_index.ainvalidate(user_id)
+        return True
@@ -0,0 +1,175 @@
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from core.config import settings
+from datastores.purge_datastore import (
+    PurgeDatastore, PurgeTarget, PROFILE_PURGE_TARGETS, RETENTION_PURGE_TARGET)
+from services.access_index import access_index
+from services.profile_cache import profile_cache
+from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Postgres errors raised when a batch exceeds its time budget:
+# query_canceled (statement_timeout) and lock_not_available (lock_timeout)
+_BUDGET_EXCEEDED_CODES = {"57014", "55P03"}
+
+
+class TargetResult:
+    """Rows deleted from one table by one job during this run"""
+
+    # Outcomes: "done", "blocked" (only locked rows left, retried next run),
+    # "timeout" (batches kept exceeding their budget) or "stopped" (out of run time)
+    def __init__(self, job: str, table: str):
+        self.job = job
+        self.table = table
+        self.rows = 0
+        self.batches = 0
+        self.timeouts = 0
+        self.seconds = 0.0
+        self.outcome = "stopped"
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "job": self.job,
+            "table": self.table,
+            "rows": self.rows,
+            "batches": self.batches,
+            "timeouts": self.timeouts,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "outcome": self.outcome,
+        }
+
+
+class PurgeService:
+    """
+    Row-level purges that don't map onto dropping whole partitions: profile
+    deletion and per-user chat retention.
+
+    Rows are deleted in keyset-ordered batches of bounded size. Each batch is
+    its own transaction with a statement and lock timeout, and skips rows
+    locked by the live conversation path. A batch that exceeds its budget is
+    rolled back and retried at half the size. Progress is checkpointed with
+    every batch, so an interrupted run resumes where it stopped.
+    """
+
+    def __init__(self, db: Session, batch_size: Optional[int] = None,
+                 batch_timeout_ms: Optional[int] = None, max_runtime: Optional[float] = None):
+        self.db = db
+        self.purge_datastore = PurgeDatastore(db)
+        self.max_batch_size = batch_size or settings.PURGE_BATCH_SIZE
+        self.min_batch_size = min(settings.PURGE_MIN_BATCH_SIZE, self.max_batch_size)
+        self.batch_timeout_ms = batch_timeout_ms or settings.PURGE_BATCH_TIMEOUT_MS
+        self.max_runtime = max_runtime
+        self.results: List[TargetResult] = []
+        self._started = time.monotonic()
+
+    def _out_of_time(self) -> bool:
+        return self.max_runtime is not None and time.monotonic() - self._started >= self.max_runtime
+
+    def request_profile_purge(self, profile_id: UUID):
+        """Queue a profile for deletion of all its data"""
+        self.purge_datastore.enqueue_profile_purge(profile_id)
+
+    def run(self) -> List[TargetResult]:
+        """Process pending profile purges, then per-user retention"""
+        self._started = time.monotonic()
+        for profile_id in self.purge_datastore.pending_profile_purges():
+            if self._out_of_time():
+                break
+            self.purge_profile(profile_id)
+
+        for profile_id, retention_days in self.purge_datastore.profiles_with_retention():
+            if self._out_of_time():
+                break
+            self.purge_expired_chat(profile_id, retention_days)
+        return self.results
+
+    def purge_profile(self, profile_id: UUID) -> bool:
+        """Delete all of a profile's data, then the profile. Returns True when finished."""
+        job = f"profile:{profile_id}"
+        params = {"profile_id": profile_id}
+        for target in PROFILE_PURGE_TARGETS:
+            if not self._purge_target(job, target, params):
+                return False
+
+        caregiver_id = self.purge_datastore.complete_profile_purge(profile_id)
+        self.purge_datastore.clear_checkpoints(job)
+        profile_cache.invalidate(profile_id)
+        access_index.invalidate(profile_id)
+        if caregiver_id is not None:
+            access_index.invalidate(caregiver_id)
+        logger.info(f"Purged profile {profile_id}")
+        return True
+
+    def purge_expired_chat(self, profile_id: UUID, retention_days: int) -> bool:
+        """Delete a profile's chat turns older than its retention setting"""
+        job = f"retention:{profile_id}"
+        cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        finished = self._purge_target(
+            job, RETENTION_PURGE_TARGET, {"profile_id": profile_id, "cutoff": cutoff})
+        if finished:
+            self.purge_datastore.clear_checkpoints(job)
+        return finished
+
+    def _purge_target(self, job: str, target: PurgeTarget, params: Dict[str, Any]) -> bool:
+        """Delete every row of one target in batches. Returns True when none are left."""
+        result = TargetResult(job, target.table)
+        self.results.append(result)
+
+        checkpoint = self.purge_datastore.get_checkpoint(job, target.table)
+        if checkpoint is not None and checkpoint.done:
+            result.outcome = "done"
+            return True
+        cursor = checkpoint.cursor if checkpoint is not None else None
+
+        batch_size = self.max_batch_size
+        while not self._out_of_time():
+            start = time.perf_counter()
+            try:
+                deleted = self.purge_datastore.delete_batch(
+                    job, target, params, cursor, batch_size,
+                    self.batch_timeout_ms, settings.PURGE_LOCK_TIMEOUT_MS)
+            except DBAPIError as e:
+                if getattr(e.orig, "pgcode", None) not in _BUDGET_EXCEEDED_CODES:
+                    raise
+                result.seconds += time.perf_counter() - start
+                result.timeouts += 1
+                if batch_size <= self.min_batch_size:
+                    result.outcome = "timeout"
+                    logger.warning(f"{job}: {target.table} batches exceed "
+                                   f"{self.batch_timeout_ms} ms even at {batch_size} rows")
+                    return False
+                batch_size = max(batch_size // 2, self.min_batch_size)
+                continue
+            elapsed = time.perf_counter() - start
+
+            result.seconds += elapsed
+            result.batches += 1
+            result.rows += len(deleted)
+
+            if not deleted:
+                if self.purge_datastore.has_remaining(target, params):
+                    # Only rows locked by live traffic are left; next run starts over
+                    self.purge_datastore.restart_target(job, target)
+                    result.outcome = "blocked"
+                    return False
+                self.purge_datastore.finish_target(job, target)
+                result.outcome = "done"
+                return True
+
+            cursor = [str(value) for value in max(deleted)]
+            # Grow back towards the configured size while batches stay well in budget
+            if batch_size < self.max_batch_size and elapsed * 1000 < self.batch_timeout_ms / 4:
+                batch_size = min(batch_size * 2, self.max_batch_size)
+            time.sleep(settings.PURGE_BATCH_PAUSE_MS / 1000)
+
+        return False
@@ -0,0 +1,148 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import core.cache
+from core.cache import CacheBackend, InMemoryCacheBackend, LayeredCache, TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(core.cache, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+class FailingBackend(CacheBackend):
+    def get(self, key):
+        raise ConnectionError("backend down")
+
+    def set(self, key, value, ttl):
+        raise ConnectionError("backend down")
+
+    def delete(self, key):
+        raise ConnectionError("backend down")
+
+
+def test_ttl_cache_expires_entries(clock):
+    cache = TTLCache(max_entries=10, ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=20)
+
+    clock.now += 5
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.metrics.snapshot()["expirations"] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used(clock):
+    cache = TTLCache(max_entries=2, ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.metrics.snapshot()["evictions"] == 1
+
+
+def test_cache_backend_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+
+def test_layered_cache_counts_hits_and_misses(clock):
+    cache = LayeredCache("test", max_entries=10, ttl=5)
+
+    assert cache.get("a") is None
+    cache.set("a", {"n": 1})
+    assert cache.get("a") == {"n": 1}
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["local_entries"]) == (1, 1, 1)
+
+
+def test_layered_cache_reads_through_the_shared_backend(clock):
+    backend = InMemoryCacheBackend()
+    writer = LayeredCache("test", max_entries=10, ttl=5, backend=backend, shared_ttl=60)
+    reader = LayeredCache("test", max_entries=10, ttl=5, backend=backend, shared_ttl=60)
+    writer.set("a", {"n": 1})
+
+    assert reader.get("a") == {"n": 1}
+    assert reader.get("a") == {"n": 1}
+    stats = reader.stats()
+    assert (stats["shared_hits"], stats["hits"], stats["misses"]) == (1, 1, 0)
+
+    # The local copy expires first and is refilled from the backend
+    clock.now += 5
+    assert reader.get("a") == {"n": 1}
+    assert reader.stats()["shared_hits"] == 2
+
+
+def test_layered_cache_invalidates_both_layers(clock):
+    backend = InMemoryCacheBackend()
+    first = LayeredCache("test", max_entries=10, ttl=5, backend=backend)
+    second = LayeredCache("test", max_entries=10, ttl=5, backend=backend)
+    first.set("a", 1)
+
+    first.invalidate("a")
+
+    assert first.get("a") is None
+    assert backend.get("test:a") is None
+    assert asyncio.run(second.aget("a")) is None
+    assert first.stats()["invalidations"] == 1
+
+
+def test_other_workers_keep_their_local_copy_until_it_expires(clock):
+    backend = InMemoryCacheBackend()
+    first = LayeredCache("test", max_entries=10, ttl=5, backend=backend, shared_ttl=60)
+    second = LayeredCache("test", max_entries=10, ttl=5, backend=backend, shared_ttl=60)
+    first.set("a", 1)
+    assert second.get("a") == 1
+
+    asyncio.run(first.ainvalidate("a"))
+    assert second.get("a") == 1
+    clock.now += 5
+    assert second.get("a") is None
+
+
+def test_layered_cache_namespaces_keys():
+    backend = InMemoryCacheBackend()
+    LayeredCache("one", max_entries=10, ttl=5, backend=backend).set("a", 1)
+
+    assert LayeredCache("two", max_entries=10, ttl=5, backend=backend).get("a") is None
+    assert backend.get("one:a") == "1"
+
+
+def test_layered_cache_treats_backend_errors_as_misses():
+    cache = LayeredCache("test", max_entries=10, ttl=5, backend=FailingBackend())
+
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    cache.invalidate("a")
+
+    stats = cache.stats()
+    assert stats["backend_errors"] == 3
+    assert stats["misses"] == 1
+
+
+def test_peek_does_not_count_a_lookup():
+    cache = LayeredCache("test", max_entries=10, ttl=5, backend=InMemoryCacheBackend())
+    cache.set("a", 1)
+    cache.local.clear()
+
+    assert cache.peek("a") == 1
+    assert asyncio.run(cache.apeek("b")) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["shared_hits"], stats["misses"]) == (0, 0, 0)
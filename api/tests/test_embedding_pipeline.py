@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from core.embedder import HashingEmbedder
+from services.embedding_pipeline import EmbeddingPipeline
+
+TIMESTAMP = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+class RecordingPipeline(EmbeddingPipeline):
+    """Embeds with the real embedder but keeps each batch instead of writing it"""
+
+    def __init__(self, **options):
+        super().__init__(HashingEmbedder(8), session_factory=None, columns=[], **options)
+        self.batches = []
+
+    async def _process(self, batch):
+        embeddings = await self.embedder.embed([turn.message for turn in batch])
+        self.batches.append(list(zip((turn.id for turn in batch), embeddings)))
+
+
+def _run(pipeline: RecordingPipeline, messages):
+    """Queue the messages at once and wait until every batch has been processed"""
+    async def scenario():
+        await pipeline.start(sweep=False)
+        for message in messages:
+            pipeline.enqueue(uuid4(), TIMESTAMP, message)
+        await asyncio.wait_for(pipeline.drain(), timeout=5)
+        await pipeline.stop()
+    asyncio.run(scenario())
+
+
+def test_full_batches_go_out_without_waiting():
+    pipeline = RecordingPipeline(batch_size=2, max_batch_age=60)
+
+    _run(pipeline, ["a", "b", "c", "d"])
+
+    assert [len(batch) for batch in pipeline.batches] == [2, 2]
+
+
+def test_partial_batch_goes_out_when_its_oldest_turn_is_old_enough():
+    pipeline = RecordingPipeline(batch_size=64, max_batch_age=0.05)
+
+    _run(pipeline, ["a", "b", "c"])
+
+    assert [len(batch) for batch in pipeline.batches] == [3]
+
+
+def test_every_turn_gets_one_embedding_of_the_right_size():
+    pipeline = RecordingPipeline(batch_size=2, max_batch_age=0.01)
+
+    _run(pipeline, ["one", "two", "three"])
+
+    vectors = [vector for batch in pipeline.batches for _, vector in batch]
+    assert len(vectors) == 3
+    assert all(len(vector) == 8 for vector in vectors)
+
+
+def test_turn_is_not_queued_twice():
+    pipeline = RecordingPipeline()
+    turn_id = uuid4()
+
+    assert pipeline.enqueue(turn_id, TIMESTAMP, "a")
+    assert not pipeline.enqueue(turn_id, TIMESTAMP, "a")
+    assert pipeline.stats()["queue_depth"] == 1
+
+
+def test_turns_that_dont_fit_are_dropped():
+    pipeline = RecordingPipeline(queue_max=2)
+
+    queued = [pipeline.enqueue(uuid4(), TIMESTAMP, "a") for _ in range(3)]
+
+    assert queued == [True, True, False]
+    assert pipeline.stats()["dropped"] == 1
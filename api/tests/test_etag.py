@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from core.etag import if_match_tags, make_etag, none_match, parse_etag
+
+UPDATED_AT = datetime(2026, 10, 18, 13, 47, 5, 902516, tzinfo=timezone.utc)
+
+
+def test_etag_round_trips_to_the_exact_version():
+    resource_id = uuid4()
+
+    assert parse_etag(make_etag(resource_id, UPDATED_AT)) == (resource_id, UPDATED_AT)
+
+
+def test_naive_timestamps_are_taken_as_utc():
+    resource_id = uuid4()
+
+    assert make_etag(resource_id, UPDATED_AT.replace(tzinfo=None)) == make_etag(resource_id, UPDATED_AT)
+
+
+def test_etag_changes_with_the_version():
+    resource_id = uuid4()
+
+    assert make_etag(resource_id, UPDATED_AT) != make_etag(
+        resource_id, UPDATED_AT.replace(microsecond=902517))
+
+
+@pytest.mark.parametrize("etag", ['W/"abc-1"', "abc-1", '"abc"', '"zz-1"', '""', '"'])
+def test_parse_etag_rejects_other_tags(etag):
+    assert parse_etag(etag) is None
+
+
+def test_none_match_uses_weak_comparison():
+    etag = make_etag(uuid4(), UPDATED_AT)
+
+    assert none_match(etag, etag)
+    assert none_match(f'"other", W/{etag}', etag)
+    assert none_match("*", etag)
+    assert not none_match('"other"', etag)
+    assert not none_match(None, etag)
+
+
+def test_if_match_tags():
+    assert if_match_tags(None) is None
+    assert if_match_tags("*") is None
+    assert if_match_tags('"a", "b"') == ['"a"', '"b"']
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwk, jwt
+
+from core.jwks import JWKSKeyStore, UnknownSigningKey
+
+
+def _signing_key():
+    """(private PEM, public JWK without a kid) for a fresh ES256 key"""
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo).decode()
+    return private_pem, jwk.construct(public_pem, "ES256").to_dict()
+
+
+def _write_jwks(path, **keys):
+    path.write_text(json.dumps({"keys": [dict(key, kid=kid) for kid, key in keys.items()]}))
+
+
+@pytest.fixture
+def keys():
+    return {kid: _signing_key() for kid in ("first", "second")}
+
+
+def _store(path, **options) -> JWKSKeyStore:
+    options.setdefault("algorithms", ["ES256"])
+    return JWKSKeyStore(str(path), **options)
+
+
+def test_get_key_verifies_tokens_signed_with_that_kid(tmp_path, keys):
+    path = tmp_path / "jwks.json"
+    _write_jwks(path, first=keys["first"][1])
+    store = _store(path)
+    store.load()
+
+    token = jwt.encode({"sub": "user"}, keys["first"][0], algorithm="ES256", headers={"kid": "first"})
+
+    key = store.get_key(jwt.get_unverified_header(token)["kid"])
+    assert jwt.decode(token, key, algorithms=["ES256"]) == {"sub": "user"}
+    assert store.status()["kids"] == ["first"]
+
+
+def test_unknown_kid_is_rejected_until_the_refresh_arrives(tmp_path, keys):
+    path = tmp_path / "jwks.json"
+    _write_jwks(path, first=keys["first"][1])
+    store = _store(path, refresh_interval=0)
+    store.load()
+
+    # The identity provider rotates to a new key
+    _write_jwks(path, first=keys["first"][1], second=keys["second"][1])
+    with pytest.raises(UnknownSigningKey):
+        store.get_key("second")
+    store._refresh_thread.join()
+
+    assert store.get_key("second") is not None
+    status = store.status()
+    assert (status["unknown_kid_lookups"], status["refreshes"]) == (1, 2)
+
+
+def test_refreshes_are_rate_limited(tmp_path, keys):
+    path = tmp_path / "jwks.json"
+    _write_jwks(path, first=keys["first"][1])
+    store = _store(path, refresh_interval=3600)
+    store.load()
+
+    for kid in ("missing", "other", None):
+        with pytest.raises(UnknownSigningKey):
+            store.get_key(kid)
+
+    assert store._refresh_thread is None
+    assert store.status()["refreshes"] == 1
+
+
+def test_disk_copy_is_used_when_the_endpoint_is_unreachable(tmp_path, keys):
+    path = tmp_path / "jwks.json"
+    cache_path = tmp_path / "jwks-cache.json"
+    _write_jwks(path, first=keys["first"][1])
+    _store(path, cache_path=str(cache_path)).load()
+
+    path.unlink()
+    store = _store(path, cache_path=str(cache_path))
+    store.load()
+
+    assert store.get_key("first") is not None
+    status = store.status()
+    assert (status["source"], status["refresh_failures"]) == ("disk_cache", 1)
+
+
+def test_only_allowed_signing_keys_are_loaded(tmp_path, keys):
+    path = tmp_path / "jwks.json"
+    _write_jwks(path,
+                signing=keys["first"][1],
+                encryption=dict(keys["second"][1], use="enc"),
+                other_alg=dict(keys["second"][1], alg="ES384"))
+    store = _store(path)
+    store.load()
+
+    assert store.status()["kids"] == ["signing"]
@@ -0,0 +1,71 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+from database.models import EMBEDDING_DIMENSIONS
+from schemas.memory import RecallRequest
+from services.memory_service import AsyncMemoryService
+
+
+def _turn(distance: float):
+    return SimpleNamespace(id=uuid4(), session_id=uuid4(), timestamp=datetime.now(timezone.utc),
+                           speaker="user", message="hello", distance=distance)
+
+
+class FakeMemoryDatastore:
+    """The profile's searchable turns; the index search returns only `index_hits` of them"""
+
+    def __init__(self, turns, index_hits):
+        self.turns = turns
+        self.index_hits = index_hits
+        self.exact_searches = 0
+
+    async def recall(self, profile_id, embedding, k, ef_search, iterative_scan="", since=None,
+                     exact=False, storage="vector", rerank_candidates=0, full_precision=False):
+        if exact:
+            self.exact_searches += 1
+            return self.turns[:k]
+        return self.turns[:min(k, self.index_hits)]
+
+    async def count_searchable(self, profile_id, limit, since=None, storage="vector",
+                               full_precision=False):
+        return min(limit, len(self.turns))
+
+
+def _recall(datastore: FakeMemoryDatastore, k: int = 10, exact: bool = False):
+    service = AsyncMemoryService(db=None)
+    service.memory_datastore = datastore
+    request = RecallRequest(profile_id=uuid4(), embedding=[0.0] * EMBEDDING_DIMENSIONS,
+                            k=k, exact=exact)
+    return asyncio.run(service.recall(request))
+
+
+def test_profile_with_fewer_than_k_turns_keeps_the_index_result():
+    datastore = FakeMemoryDatastore([_turn(0.1), _turn(0.2), _turn(0.3)], index_hits=3)
+
+    response = _recall(datastore)
+
+    assert len(response.turns) == 3
+    assert (response.exact, response.exact_reason) == (False, None)
+    assert response.ef_search is not None
+    assert datastore.exact_searches == 0
+
+
+def test_short_index_result_falls_back_to_exact_search():
+    datastore = FakeMemoryDatastore([_turn(i / 10) for i in range(5)], index_hits=2)
+
+    response = _recall(datastore)
+
+    assert len(response.turns) == 5
+    assert (response.exact, response.exact_reason, response.ef_search) == (True, "index_short", None)
+    assert datastore.exact_searches == 1
+
+
+def test_requested_exact_search_skips_the_index():
+    datastore = FakeMemoryDatastore([_turn(0.1)], index_hits=0)
+
+    response = _recall(datastore, exact=True)
+
+    assert (response.exact, response.exact_reason) == (True, "requested")
+    assert datastore.exact_searches == 1
@@ -0,0 +1,93 @@
+import asyncio
+import fcntl
+import os
+
+from core.outbox import Outbox
+
+
+def _segment(outbox: Outbox, *records) -> str:
+    """Append records as one sealed segment and return its path"""
+    asyncio.run(outbox.append(list(records)))
+    path = outbox._path
+    outbox.rotate()
+    return path
+
+
+def test_claim_takes_sealed_segments_oldest_first(tmp_path):
+    outbox = Outbox(str(tmp_path), "never")
+    paths = [_segment(outbox, {"n": n}) for n in range(3)]
+
+    claimed = outbox.claim()
+
+    assert [segment.path for segment in claimed] == paths
+    assert [outbox.read(segment) for segment in claimed] == [[{"n": 0}], [{"n": 1}], [{"n": 2}]]
+
+
+def test_claim_stops_at_a_segment_locked_elsewhere(tmp_path):
+    outbox = Outbox(str(tmp_path), "never")
+    first, locked, last = [_segment(outbox, {"n": n}) for n in range(3)]
+
+    # Another flusher holds the middle segment; the ones after it wait so
+    # records are still written in order
+    fd = os.open(locked, os.O_RDONLY)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        assert [segment.path for segment in outbox.claim()] == [first]
+    finally:
+        os.close(fd)
+
+
+def test_claim_skips_the_segment_being_written(tmp_path):
+    outbox = Outbox(str(tmp_path), "never")
+    sealed = _segment(outbox, {"n": 0})
+    asyncio.run(outbox.append([{"n": 1}]))
+
+    assert [segment.path for segment in outbox.claim()] == [sealed]
+
+
+def test_claimed_segment_is_not_claimed_again(tmp_path):
+    outbox = Outbox(str(tmp_path), "never")
+    _segment(outbox, {"n": 0})
+
+    claimed = outbox.claim()
+    assert Outbox(str(tmp_path), "never").claim() == []
+    outbox.release(claimed[0])
+    assert len(Outbox(str(tmp_path), "never").claim()) == 1
+
+
+def test_read_drops_a_torn_trailing_line(tmp_path):
+    outbox = Outbox(str(tmp_path), "never")
+    path = _segment(outbox, {"n": 0}, {"n": 1})
+    with open(path, "ab") as segment_file:
+        segment_file.write(b'{"n":2')
+
+    [segment] = outbox.claim()
+
+    assert outbox.read(segment) == [{"n": 0}, {"n": 1}]
+    assert outbox.stats()["corrupt_records"] == 1
+
+
+def test_read_skips_corrupt_lines(tmp_path):
+    outbox = Outbox(str(tmp_path), "never")
+    path = _segment(outbox, {"n": 0})
+    with open(path, "ab") as segment_file:
+        segment_file.write(b'not json\n{"n":1}\n')
+
+    [segment] = outbox.claim()
+
+    assert outbox.read(segment) == [{"n": 0}, {"n": 1}]
+
+
+def test_quarantine_keeps_records_under_the_segment_name(tmp_path):
+    outbox = Outbox(str(tmp_path), "never")
+    path = _segment(outbox, {"n": 0}, {"n": 1})
+    [segment] = outbox.claim()
+
+    outbox.quarantine_records(segment, [{"n": 1}])
+    outbox.complete(segment)
+
+    assert not os.path.exists(path)
+    with open(os.path.join(outbox.failed_directory, os.path.basename(path))) as failed_file:
+        assert failed_file.read() == '{"n":1}\n'
+    assert outbox.stats()["pending_segments"] == 0
+    assert outbox.stats()["failed_segments"] == 1
@@ -0,0 +1,128 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from core.outbox import Outbox
+from datastores.chat_datastore import ChatTurnRow
+from services.outbox_flusher import OutboxFlusher
+
+SESSION_ID = uuid4()
+
+
+def _turn(message: str) -> ChatTurnRow:
+    return ChatTurnRow(uuid4(), SESSION_ID, datetime(2026, 10, 1, tzinfo=timezone.utc), "user", message)
+
+
+class FakeFlusher(OutboxFlusher):
+    """
+    Writes into a dict instead of the database. Like the real statements,
+    writing a turn that is already there changes nothing. Turns whose
+    message is in `rejected` fail the whole transaction, as a constraint
+    violation would; `unavailable` fails every write like a lost connection.
+    """
+
+    def __init__(self, outbox: Outbox, batch_size: int = 500):
+        super().__init__(outbox, session_factory=None, batch_size=batch_size)
+        self.turns = {}
+        self.transactions = 0
+        self.rejected = set()
+        self.unavailable = False
+
+    async def _write(self, rows):
+        self.transactions += 1
+        if self.unavailable:
+            raise ConnectionError("database unreachable")
+        if any(row.message in self.rejected for row in rows):
+            raise ValueError("rejected by the database")
+        for row in rows:
+            self.turns.setdefault(row.id, row)
+
+
+def _pending(outbox: Outbox):
+    return outbox.stats()["pending_segments"]
+
+
+def test_flush_writes_and_deletes_segments(tmp_path):
+    flusher = FakeFlusher(Outbox(str(tmp_path), "never"))
+    turns = [_turn("a"), _turn("b")]
+    asyncio.run(flusher.append(turns))
+
+    assert asyncio.run(flusher.flush()) == 2
+    assert list(flusher.turns.values()) == turns
+    assert _pending(flusher.outbox) == 0
+
+
+def test_replaying_a_committed_segment_writes_nothing_new(tmp_path, monkeypatch):
+    outbox = Outbox(str(tmp_path), "never")
+    flusher = FakeFlusher(outbox)
+    turns = [_turn("a"), _turn("b")]
+    asyncio.run(flusher.append(turns))
+
+    # The process dies after the commit but before the segment is deleted
+    monkeypatch.setattr(outbox, "complete", outbox.release)
+    asyncio.run(flusher.flush())
+    assert _pending(outbox) == 1
+
+    restarted = FakeFlusher(Outbox(str(tmp_path), "never"))
+    restarted.turns = dict(flusher.turns)
+    assert asyncio.run(restarted.flush()) == 2
+    assert list(restarted.turns.values()) == turns
+    assert _pending(restarted.outbox) == 0
+
+
+def test_torn_trailing_record_is_dropped(tmp_path):
+    outbox = Outbox(str(tmp_path), "never")
+    flusher = FakeFlusher(outbox)
+    turn = _turn("a")
+    asyncio.run(flusher.append([turn]))
+    path = outbox._path
+    # A crash in the middle of the next append
+    with open(path, "ab") as segment_file:
+        segment_file.write(b'{"kind":"chat_turn","row":{"id":')
+
+    assert asyncio.run(flusher.flush()) == 1
+    assert list(flusher.turns.values()) == [turn]
+    assert not os.path.exists(path)
+
+
+def test_rejected_record_is_isolated_and_the_rest_commit(tmp_path):
+    outbox = Outbox(str(tmp_path), "never")
+    flusher = FakeFlusher(outbox)
+    flusher.rejected = {"bad"}
+    good = [_turn("a"), _turn("b"), _turn("c")]
+    asyncio.run(flusher.append(good[:2] + [_turn("bad")]))
+    path = outbox._path
+    outbox.rotate()
+    asyncio.run(flusher.append(good[2:]))
+
+    assert asyncio.run(flusher.flush()) == 3
+    assert sorted(row.message for row in flusher.turns.values()) == ["a", "b", "c"]
+    assert _pending(outbox) == 0
+
+    with open(os.path.join(outbox.failed_directory, os.path.basename(path))) as failed_file:
+        [failed] = failed_file.read().splitlines()
+    assert '"message":"bad"' in failed
+    stats = flusher.stats()
+    assert stats["rejected_records"] == 1
+    assert stats["failed_segments"] == 1
+
+
+def test_segments_stay_queued_while_the_database_is_down(tmp_path):
+    flusher = FakeFlusher(Outbox(str(tmp_path), "never"), batch_size=1)
+    asyncio.run(flusher.append([_turn("a")]))
+    flusher.outbox.rotate()
+    asyncio.run(flusher.append([_turn("b")]))
+    flusher.unavailable = True
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(flusher.flush())
+    assert _pending(flusher.outbox) == 2
+    assert flusher.stats()["failed_batches"] == 1
+
+    flusher.unavailable = False
+    assert asyncio.run(flusher.flush()) == 2
+    assert sorted(row.message for row in flusher.turns.values()) == ["a", "b"]
+    assert _pending(flusher.outbox) == 0
@@ -0,0 +1,106 @@
+from datetime import date
+
+from database.partitions import (
+    add_months, create_partition_statements, default_partition_name, drop_expired_partitions,
+    CHAT_TURNS_TABLE)
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalar(self):
+        return self.rows[0][0] if self.rows else None
+
+
+class FakeConnection:
+    """
+    Stands in for a Postgres connection to a partitioned chat_turns: answers
+    the catalog queries partition maintenance runs and records the DDL it
+    issues instead of executing it.
+    """
+
+    def __init__(self, months, with_default=True):
+        self.partitions = {
+            f"{CHAT_TURNS_TABLE}_p{month:%Y_%m}":
+                f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{add_months(month, 1)} 00:00:00+00')"
+            for month in months
+        }
+        if with_default:
+            self.partitions[default_partition_name(CHAT_TURNS_TABLE)] = "DEFAULT"
+        self.ddl = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "pg_inherits" in sql:
+            return _Result(list(self.partitions.items()))
+        if "to_regclass" in sql:
+            return _Result([(params["name"] in self.partitions,)])
+        self.ddl.append(" ".join(sql.split()))
+        if sql.startswith("DROP TABLE"):
+            self.partitions.pop(sql.split()[-1])
+        elif sql.startswith("CREATE TABLE"):
+            self.partitions[sql.split()[5]] = sql.split(f"OF {CHAT_TURNS_TABLE} ", 1)[1]
+        return _Result([])
+
+
+def _months(first: date, count: int):
+    return [add_months(first, offset) for offset in range(count)]
+
+
+def test_retention_with_default_partition_detaches_without_concurrently():
+    conn = FakeConnection(_months(date(2025, 1, 1), 6))
+
+    dropped = drop_expired_partitions(conn, retention_months=3, today=date(2025, 6, 15))
+
+    assert dropped == ["chat_turns_p2025_01", "chat_turns_p2025_02"]
+    assert conn.ddl == [
+        "ALTER TABLE chat_turns DETACH PARTITION chat_turns_p2025_01",
+        "DROP TABLE chat_turns_p2025_01",
+        "ALTER TABLE chat_turns DETACH PARTITION chat_turns_p2025_02",
+        "DROP TABLE chat_turns_p2025_02",
+    ]
+    assert "chat_turns_default" in conn.partitions
+
+
+def test_retention_without_default_partition_detaches_concurrently():
+    conn = FakeConnection(_months(date(2025, 1, 1), 6), with_default=False)
+
+    drop_expired_partitions(conn, retention_months=3, today=date(2025, 6, 15))
+
+    assert conn.ddl[0] == "ALTER TABLE chat_turns DETACH PARTITION chat_turns_p2025_01 CONCURRENTLY"
+
+
+def test_retention_keeps_the_retention_window():
+    conn = FakeConnection(_months(date(2025, 3, 1), 4))
+
+    assert drop_expired_partitions(conn, retention_months=3, today=date(2025, 6, 15)) == []
+    assert conn.ddl == []
+
+
+def test_partition_bounds_are_utc_months():
+    statements = create_partition_statements(CHAT_TURNS_TABLE, date(2025, 12, 9))
+
+    assert statements[0] == (
+        "CREATE TABLE IF NOT EXISTS chat_turns_p2025_12 PARTITION OF chat_turns "
+        "FOR VALUES FROM ('2025-12-01 00:00:00+00') TO ('2026-01-01 00:00:00+00')")
+
+
+def test_ensure_partitions_covers_the_accepted_window(monkeypatch):
+    from datetime import datetime, timezone
+    from core.config import settings
+    from database.partitions import chat_turn_window, ensure_partitions
+
+    monkeypatch.setattr(settings, "CHAT_RETENTION_MONTHS", 3)
+    conn = FakeConnection([date(2025, 6, 1)])
+
+    ensure_partitions(conn, months_ahead=1, today=date(2025, 6, 15))
+
+    oldest, _ = chat_turn_window(datetime(2025, 6, 15, 12, tzinfo=timezone.utc))
+    assert oldest == datetime(2025, 3, 1, tzinfo=timezone.utc)
+    created = sorted(name for name in conn.partitions if name != "chat_turns_default")
+    assert created == ["chat_turns_p2025_03", "chat_turns_p2025_04", "chat_turns_p2025_05",
+                       "chat_turns_p2025_06", "chat_turns_p2025_07"]
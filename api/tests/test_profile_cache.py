@@ -0,0 +1,47 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from core.cache import LayeredCache, InMemoryCacheBackend
+from schemas.profile import ProfileResponse
+from services.profile_cache import ProfileCache
+
+UPDATED_AT = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def _profile(user_id, updated_at=UPDATED_AT) -> ProfileResponse:
+    return ProfileResponse(id=user_id, dob=None, preferred_speech_speed=1.0,
+                           preferred_avatar_type="3D", accessibility_preferences={},
+                           caregiver_id=None, updated_at=updated_at)
+
+
+def _cache() -> ProfileCache:
+    return ProfileCache(LayeredCache("profile", max_entries=10, ttl=60,
+                                     backend=InMemoryCacheBackend()))
+
+
+def _lookups(cache: ProfileCache):
+    stats = cache.stats()
+    return stats["hits"], stats["shared_hits"], stats["misses"]
+
+
+def test_fill_is_not_counted_as_a_lookup():
+    cache = _cache()
+    user_id = uuid4()
+
+    cache.fill(user_id, _profile(user_id))
+    asyncio.run(cache.afill(user_id, _profile(user_id)))
+
+    assert _lookups(cache) == (0, 0, 0)
+
+
+def test_fill_keeps_a_newer_cached_profile():
+    cache = _cache()
+    user_id = uuid4()
+    newer = UPDATED_AT + timedelta(seconds=1)
+    cache.set(user_id, _profile(user_id, newer))
+
+    cache.fill(user_id, _profile(user_id))
+    asyncio.run(cache.afill(user_id, _profile(user_id)))
+
+    assert cache.get(user_id).updated_at == newer
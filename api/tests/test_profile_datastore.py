@@ -0,0 +1,24 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from database.models import Profile
+from datastores.profile_datastore import (
+    accessible_profile_ids_statement, partial_update_statement, profile_statement)
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.parametrize("statement", [
+    profile_statement(uuid4()),
+    accessible_profile_ids_statement(uuid4()),
+    partial_update_statement(uuid4(), {"dob": None}, [Profile.id]),
+    partial_update_statement(uuid4(), {}, [Profile.id]),
+], ids=["get", "access", "update", "read-only update"])
+def test_profile_statements_skip_pending_purges(statement):
+    sql = _sql(statement)
+    assert "NOT (EXISTS" in sql
+    assert "purge_requests.completed_at IS NULL" in sql
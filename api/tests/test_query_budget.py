@@ -0,0 +1,23 @@
+import pytest
+
+from database.instrumentation import query_budget, QueryBudgetExceeded
+
+
+def test_profile_check_stays_within_one_query(client):
+    # Open a pooled connection first so connection setup isn't counted
+    client.get("/profile/check")
+
+    with query_budget(1) as requests:
+        response = client.get("/profile/check")
+
+    assert response.status_code == 200
+    assert response.json() == {"profile_exists": False, "profile_complete": False}
+    assert [stats.count for stats in requests] == [1]
+
+
+def test_query_budget_fails_when_exceeded(client):
+    client.get("/profile/check")
+
+    with pytest.raises(QueryBudgetExceeded, match="GET /profile/check ran 1 queries"):
+        with query_budget(0):
+            client.get("/profile/check")
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+from jose import JWTError, ExpiredSignatureError
+
+from core.jwks import UnknownSigningKey
+from core.token_cache import TokenVerificationCache
+
+
+class Decoder:
+    """Counts verifications; raises `error` if set, else returns `payload`"""
+
+    def __init__(self, payload=None, error=None):
+        self.payload = payload
+        self.error = error
+        self.calls = 0
+
+    def __call__(self, token):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.payload
+
+
+def _cache(**overrides) -> TokenVerificationCache:
+    options = dict(max_entries=10, max_ttl=60, negative_ttl=30, transient_errors=(UnknownSigningKey,))
+    options.update(overrides)
+    return TokenVerificationCache(**options)
+
+
+def test_verified_token_is_decoded_once():
+    cache = _cache()
+    decode = Decoder({"sub": "user", "exp": time.time() + 600})
+
+    assert cache.verify("token", decode) == decode.payload
+    assert cache.verify("token", decode) == decode.payload
+    assert decode.calls == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_tokens_are_cached_separately():
+    cache = _cache()
+    decode = Decoder({"sub": "user"})
+
+    cache.verify("first", decode)
+    cache.verify("second", decode)
+
+    assert decode.calls == 2
+
+
+def test_expired_token_is_not_cached():
+    cache = _cache()
+    decode = Decoder({"sub": "user", "exp": time.time() - 1})
+
+    cache.verify("token", decode)
+    cache.verify("token", decode)
+
+    assert decode.calls == 2
+    assert cache.stats()["valid_entries"] == 0
+
+
+def test_rejection_is_remembered_with_its_error_type():
+    cache = _cache()
+    decode = Decoder(error=ExpiredSignatureError("Signature has expired"))
+
+    for _ in range(2):
+        with pytest.raises(ExpiredSignatureError, match="Signature has expired"):
+            cache.verify("token", decode)
+
+    assert decode.calls == 1
+    assert cache.stats()["negative_hits"] == 1
+
+
+def test_unknown_signing_key_is_not_remembered():
+    cache = _cache()
+    decode = Decoder(error=UnknownSigningKey("Unknown signing key: new"))
+
+    with pytest.raises(UnknownSigningKey):
+        cache.verify("token", decode)
+
+    # The key set has been refreshed since
+    decode.error, decode.payload = None, {"sub": "user"}
+    assert cache.verify("token", decode) == {"sub": "user"}
+    assert cache.stats()["rejected_entries"] == 0
+
+
+def test_clear_forgets_every_outcome():
+    cache = _cache()
+    cache.verify("good", Decoder({"sub": "user"}))
+    with pytest.raises(JWTError):
+        cache.verify("bad", Decoder(error=JWTError("bad token")))
+
+    cache.clear()
+
+    stats = cache.stats()
+    assert (stats["valid_entries"], stats["rejected_entries"]) == (0, 0)